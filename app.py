@@ -1,18 +1,22 @@
-from typing import List, Any
+from typing import List, Any, Optional
+import asyncio
 import os
 from jinja2 import Environment, PackageLoader, select_autoescape
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 import yaml
 from pathlib import Path
 import json
 import logging
 import time
 import re
+from contextlib import asynccontextmanager
 
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from pydantic import BaseModel
-from touche_rad.ai.elasticsearch_retriever import ElasticsearchRetriever
+from touche_rad.ai.elasticsearch_retriever import get_shared_retriever
+from touche_rad.ai.evidence_cache import EvidenceCache
+from touche_rad.ai.evidence_store import PrecomputedRetriever, with_evidence_store
 import cachetools
 
 MAX_RETRIES = 5
@@ -20,6 +24,9 @@ MAX_RETRIES = 5
 load_dotenv()
 env = Environment(loader=PackageLoader("app"), autoescape=select_autoescape())
 logger = logging.getLogger(__name__)
+# "static" reuses the evidence for the opening message on every turn, while
+# "incremental" also retrieves for the newest user turn and merges the results
+EVIDENCE_MODE = os.environ.get("EVIDENCE_MODE", "static")
 
 
 class Message(BaseModel):
@@ -29,6 +36,8 @@ class Message(BaseModel):
 
 class Request(BaseModel):
     messages: List[Message]
+    # the debate topic, when the caller knows it; GenIRSim only sends messages
+    topic: Optional[str] = None
 
 
 class Topic(BaseModel):
@@ -94,13 +103,29 @@ class EvalResponse(BaseModel):
     manner: EvalScore
 
 
-app = FastAPI()
+# serve precomputed topic evidence when EVIDENCE_STORE_PATH is set
+retriever = with_evidence_store(get_shared_retriever())
+evidence_cache = EvidenceCache()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # release the pooled async connections on shutdown
+    await retriever.aclose()
+
+
+app = FastAPI(lifespan=lifespan)
 
-retriever = ElasticsearchRetriever()
 client = OpenAI(
     base_url="https://openrouter.ai/api/v1",
     api_key=os.getenv("OPENROUTER_API_KEY"),
 )
+# /respond awaits completions so concurrent debates do not block the event loop
+async_client = AsyncOpenAI(
+    base_url="https://openrouter.ai/api/v1",
+    api_key=os.getenv("OPENROUTER_API_KEY"),
+)
 
 
 def strip_markdown_json(text: str) -> str:
@@ -148,10 +173,21 @@ async def respond(request: Request, model_name: str):
     # we're given some odd number of messages that need to be placed into the context appropriately
     logging.info(request)
     # let's generate the prompt that we want to use
-    evidence = retriever.retrieve(
-        request.messages[0].content,
-        mode="text",
-        k=10,
+    user_messages = [m.content for m in request.messages if m.role == "user"]
+    opening = request.messages[0].content
+    # precomputed evidence is looked up by topic, or else matched to the opening
+    topic = (
+        {"topic": request.topic}
+        if request.topic and isinstance(retriever, PrecomputedRetriever)
+        else {}
+    )
+    evidence = await evidence_cache.aget_evidence(
+        opening,
+        retrieve=lambda query: retriever.aretrieve(
+            query, mode="text", k=10, **(topic if query == opening else {})
+        ),
+        latest=user_messages[-1] if user_messages else None,
+        incremental=EVIDENCE_MODE == "incremental",
     )
     # let's generate a yaml document that contains topic, tags, text, and references
     subset = [
@@ -165,7 +201,7 @@ async def respond(request: Request, model_name: str):
     model_fqn = get_model(model_name)
     for attempt in range(MAX_RETRIES):
         try:
-            completion = client.chat.completions.create(
+            completion = await async_client.chat.completions.create(
                 model=model_fqn,
                 messages=request.messages
                 + [
@@ -187,7 +223,7 @@ async def respond(request: Request, model_name: str):
             if attempt == MAX_RETRIES - 1:
                 raise e
             # sleep for a bit before retrying
-            time.sleep(1)
+            await asyncio.sleep(1)
     resp = {"content": content, "arguments": evidence}
     log_data(
         model_name,
@@ -308,8 +344,9 @@ def cached_evaluate(request: GenIREvalRequest, model_name: str) -> EvalResponse:
     return eval_response
 
 
+# a plain function, so FastAPI runs the blocking completion in its thread pool
 @app.post("/evaluate/{model_name}")
-async def evaluate(request: GenIREvalRequest, model_name: str) -> EvalResponse:
+def evaluate(request: GenIREvalRequest, model_name: str) -> EvalResponse:
     return cached_evaluate(request, model_name)
 
 
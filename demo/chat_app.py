@@ -2,7 +2,7 @@
 
 import streamlit as st
 from touche_rad.streamlit import Chat
-from touche_rad.core import DebateManager
+from touche_rad.core import DebateManager, DebateResources
 from touche_rad.ai import TensorZeroClient
 
 st.title("Touche 2025 RAD Demo")
@@ -11,7 +11,16 @@ st.markdown(
     This a demo of the Retrieval Augmented Dabate (RAD) system build by DS@GT CLEF Touche.
     """
 )
-client = TensorZeroClient()
+
+
+@st.cache_resource
+def get_resources() -> DebateResources:
+    # one client, retriever and encoder for every browser session
+    return DebateResources(client=TensorZeroClient()).warm_up()
+
+
 if "manager" not in st.session_state:
-    st.session_state.manager = DebateManager(client=client, strategy_name="rag")
+    st.session_state.manager = DebateManager(
+        strategy_name="rag", resources=get_resources()
+    )
 Chat(msg_callback=st.session_state.manager.handle_user_message).render()
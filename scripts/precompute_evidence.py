@@ -0,0 +1,48 @@
+import argparse
+
+from dotenv import load_dotenv
+
+from touche_rad.ai.elasticsearch_retriever import get_shared_retriever
+from touche_rad.ai.evidence_store import (
+    EvidenceStore,
+    load_dataset_queries,
+    precompute_evidence,
+)
+
+load_dotenv()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Precompute retrieval evidence for the topics and claims of a dataset."
+    )
+    parser.add_argument("datasets", nargs="+", help="sample-config.json style inputs")
+    parser.add_argument("--output", default="evidence.duckdb")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--num-candidates", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=32)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    queries = []
+    for path in args.datasets:
+        queries.extend(load_dataset_queries(path))
+    queries = list(dict.fromkeys(queries))
+    print(f"Found {len(queries)} unique topics and claims")
+
+    store = EvidenceStore(args.output)
+    written = precompute_evidence(
+        get_shared_retriever(),
+        queries,
+        store,
+        k=args.k,
+        num_candidates=args.num_candidates,
+        batch_size=args.batch_size,
+    )
+    print(f"Stored {written} evidence bundles in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
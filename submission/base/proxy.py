@@ -1,6 +1,6 @@
 import logging
 import os
-from typing import Any, List
+from typing import Any, List, Optional
 
 import requests
 from fastapi import FastAPI
@@ -21,6 +21,7 @@ class Message(BaseModel):
 
 class Request(BaseModel):
     messages: list[Message]
+    topic: Optional[str] = None
 
 
 class Topic(BaseModel):
@@ -74,7 +75,9 @@ app = FastAPI()
 
 @app.post("/")
 async def respond(request: Request):
-    resp = requests.post(f"{BASE_URL}/respond/{MODEL_NAME}", json=request.dict())
+    resp = requests.post(
+        f"{BASE_URL}/respond/{MODEL_NAME}", json=request.dict(exclude_none=True)
+    )
     return resp.json()
 
 
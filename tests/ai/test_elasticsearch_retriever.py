@@ -0,0 +1,99 @@
+import asyncio
+import time
+
+from touche_rad.ai.elasticsearch_retriever import (
+    ElasticsearchRetriever,
+    get_shared_retriever,
+)
+
+
+class FakeEncoder:
+    def encode(self, query, prompt_name=None):
+        return [float(len(query))]
+
+
+class FakeAsyncClient:
+    """Stands in for AsyncElasticsearch; every search takes `delay` seconds."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.options_calls = []
+        self.searches = []
+
+    def options(self, **kwargs):
+        self.options_calls.append(kwargs)
+        return self
+
+    async def search(self, **kwargs):
+        self.searches.append(kwargs)
+        await asyncio.sleep(self.delay)
+        return {
+            "hits": {
+                "hits": [
+                    {
+                        "_id": "a1",
+                        "_score": 1.5,
+                        "_source": {"text": "arg", "text_embedding_stella": [0.1]},
+                    }
+                ]
+            }
+        }
+
+
+def make_retriever(delay=0.0, **kwargs):
+    retriever = ElasticsearchRetriever(es_url="http://localhost:9200", **kwargs)
+    retriever._embedding_model = FakeEncoder()
+    retriever._aes_client = FakeAsyncClient(delay)
+    return retriever
+
+
+def test_pool_timeout_and_compression_settings():
+    retriever = ElasticsearchRetriever(
+        es_url="http://localhost:9200",
+        connections_per_node=7,
+        request_timeout=3.5,
+        http_compress=True,
+    )
+    for client in (retriever.es_client, retriever.aes_client):
+        node = client.transport.node_pool.all()[0]
+        assert node.config.connections_per_node == 7
+        assert node.config.http_compress is True
+        assert client._request_timeout == 3.5
+    # the async client is created once and reused
+    assert retriever.aes_client is retriever.aes_client
+    asyncio.run(retriever.aclose())
+    assert retriever._aes_client is None
+
+
+def test_aretrieve():
+    retriever = make_retriever(request_timeout=2.0)
+    hits = asyncio.run(
+        retriever.aretrieve("query", mode="attack", k=3, filters={"topic": "t"})
+    )
+    assert hits == [{"text": "arg", "key": 1, "id": "a1", "score": 1.5}]
+    [search] = retriever._aes_client.searches
+    assert search["size"] == 3
+    assert search["knn"]["field"] == "attacks_embedding_stella"
+    assert search["knn"]["query_vector"] == [5.0]
+    assert search["knn"]["filter"] == [{"term": {"topic": "t"}}]
+    assert retriever._aes_client.options_calls == [{"request_timeout": 2.0}]
+
+
+def test_concurrent_aretrieve_overlaps_round_trips():
+    retriever = make_retriever(delay=0.2)
+
+    async def run():
+        return await asyncio.gather(
+            *(retriever.aretrieve(f"query {i}") for i in range(5))
+        )
+
+    start = time.perf_counter()
+    results = asyncio.run(run())
+    assert len(results) == 5
+    assert time.perf_counter() - start < 0.6
+
+
+def test_get_shared_retriever():
+    first = get_shared_retriever("http://localhost:9200", "index")
+    assert get_shared_retriever("http://localhost:9200", "index") is first
+    assert get_shared_retriever("http://localhost:9200", "other") is not first
@@ -0,0 +1,55 @@
+import asyncio
+
+from touche_rad.ai.evidence_cache import EvidenceCache, merge_evidence
+
+
+def make_retrieve(results):
+    calls = []
+
+    async def retrieve(query):
+        calls.append(query)
+        return [{"id": arg_id, "text": arg_id, "key": 1} for arg_id in results[query]]
+
+    return retrieve, calls
+
+
+def test_merge_evidence_dedupes_by_id():
+    first = [{"id": "a", "key": 1}, {"id": "b", "key": 2}]
+    second = [{"id": "b", "key": 1}, {"id": "c", "key": 2}]
+    merged = merge_evidence(first, second)
+    assert [item["id"] for item in merged] == ["a", "b", "c"]
+    assert [item["key"] for item in merged] == [1, 2, 3]
+    assert merge_evidence(first, second, max_size=2) == merged[:2]
+
+
+def test_evidence_cache_reuses_opening_evidence():
+    cache = EvidenceCache()
+    retrieve, calls = make_retrieve({"claim": ["a", "b"]})
+
+    first = asyncio.run(cache.aget_evidence("claim", retrieve, latest="claim"))
+    second = asyncio.run(cache.aget_evidence("claim", retrieve, latest="reply"))
+    assert first == second
+    assert calls == ["claim"]
+
+
+def test_evidence_cache_incremental():
+    cache = EvidenceCache()
+    retrieve, calls = make_retrieve(
+        {"claim": ["a", "b"], "reply": ["b", "c"], "again": ["d"]}
+    )
+
+    evidence = asyncio.run(
+        cache.aget_evidence("claim", retrieve, latest="claim", incremental=True)
+    )
+    assert [item["id"] for item in evidence] == ["a", "b"]
+
+    evidence = asyncio.run(
+        cache.aget_evidence("claim", retrieve, latest="reply", incremental=True)
+    )
+    assert [item["id"] for item in evidence] == ["b", "c", "a"]
+
+    # the same turn is not retrieved twice
+    asyncio.run(
+        cache.aget_evidence("claim", retrieve, latest="reply", incremental=True)
+    )
+    assert calls == ["claim", "reply"]
@@ -0,0 +1,117 @@
+import asyncio
+import json
+
+import numpy as np
+
+from pathlib import Path
+
+from touche_rad.ai.evidence_store import (
+    EvidenceStore,
+    PrecomputedRetriever,
+    load_dataset_queries,
+    precompute_evidence,
+)
+
+SAMPLE_CONFIG = Path(__file__).parents[2] / "submission" / "sample-config.json"
+
+KEYWORDS = ["pineapple", "tax", "school"]
+
+
+def embed(text):
+    """One dimension per keyword the text mentions."""
+    return np.array([float(word in text.lower()) for word in KEYWORDS] + [0.1])
+
+
+class FakeRetriever:
+    def __init__(self):
+        self.live_queries = []
+        self.encoded = []
+
+    def get_query_embedding(self, query):
+        self.encoded.append(query)
+        return embed(query)
+
+    def get_query_embeddings(self, queries, batch_size=32):
+        return np.stack([embed(q) for q in queries])
+
+    def search_embeddings(self, embeddings, mode="text", k=10, num_candidates=100):
+        return [
+            [{"id": f"{mode}-{int(e.argmax())}-{i}", "text": "arg"} for i in range(k)]
+            for e in embeddings
+        ]
+
+    def retrieve(self, query, mode="text", k=10, **kwargs):
+        self.live_queries.append((query, kwargs.get("query_embedding") is not None))
+        return []
+
+    async def aretrieve(self, query, mode="text", k=10, **kwargs):
+        return self.retrieve(query, mode=mode, k=k, **kwargs)
+
+
+def test_load_dataset_queries(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(
+        json.dumps(
+            [
+                {"simulation": {"topic": {"description": "Pizza?"}}},
+                {"simulation": {"topic": {"description": "Pizza?", "claim": "Yes"}}},
+                {"simulation": {"system": {"description": "not a topic"}}},
+            ]
+        )
+    )
+    assert load_dataset_queries(path) == ["Pizza?", "Yes"]
+
+
+def test_load_dataset_queries_sample_config():
+    assert load_dataset_queries(SAMPLE_CONFIG) == ["Does pineapple belong on pizza?"]
+
+
+def test_precomputed_retriever(tmp_path):
+    path = str(tmp_path / "evidence.duckdb")
+    fake = FakeRetriever()
+    topics = ["Does pineapple belong on pizza?", "Should taxes be raised?"]
+    written = precompute_evidence(fake, topics, EvidenceStore(path), k=5)
+    assert written == 6
+
+    # the table is persisted and reloaded
+    retriever = PrecomputedRetriever(fake, EvidenceStore(path))
+    evidence = retriever.retrieve(topics[1], mode="attack", k=3)
+    assert [item["id"] for item in evidence] == [
+        "attack-1-0",
+        "attack-1-1",
+        "attack-1-2",
+    ]
+    assert asyncio.run(retriever.aretrieve(topics[0], k=5))[0]["id"] == "text-0-0"
+    # a known topic is used as the key, whatever the query says
+    assert retriever.retrieve("Hi", k=5, topic=topics[1])[0]["id"] == "text-1-0"
+    assert fake.live_queries == [] and fake.encoded == []
+
+
+def test_precomputed_retriever_matches_topic(tmp_path):
+    fake = FakeRetriever()
+    store = EvidenceStore(str(tmp_path / "evidence.duckdb"))
+    precompute_evidence(fake, ["Does pineapple belong on pizza?"], store, k=5)
+    retriever = PrecomputedRetriever(fake, store)
+
+    # an opening utterance is matched to the closest precomputed topic
+    opening = "I think pineapple on pizza is great, the sweetness works."
+    assert retriever.retrieve(opening, k=5)[0]["id"] == "text-0-0"
+    assert asyncio.run(retriever.aretrieve(opening, k=5))[0]["id"] == "text-0-0"
+    assert fake.live_queries == []
+
+    # unrelated text, more evidence than stored, or filters go live, reusing
+    # the embedding computed for matching
+    retriever.retrieve("Schools should start later.")
+    retriever.retrieve(opening, k=10)
+    retriever.retrieve(opening, k=5, filters={"topic": "pizza"})
+    assert fake.live_queries == [
+        ("Schools should start later.", True),
+        (opening, True),
+        (opening, False),
+    ]
+
+    # a filter on a precomputed topic alone is answered by its bundle
+    topic_filter = {"topic": "Does pineapple belong on pizza?"}
+    assert retriever.retrieve("Hi", k=5, filters=topic_filter)[0]["id"] == "text-0-0"
+    retriever.retrieve("Hi", k=5, filters={**topic_filter, "stance": "pro"})
+    assert fake.live_queries[3:] == [("Hi", False)]
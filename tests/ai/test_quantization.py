@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from touche_rad.ai.quantization import (
+    QuantizedVectorIndex,
+    fit_int8,
+    hamming_distances,
+    quantize_binary,
+    quantize_int8,
+)
+from touche_rad.ai.vector_index import LocalVectorIndex
+
+
+@pytest.fixture
+def corpus():
+    rng = np.random.default_rng(0)
+    embeddings = rng.normal(size=(500, 32)).astype(np.float32)
+    ids = [str(i) for i in range(len(embeddings))]
+    metadatas = [{"topic_id": str(i % 5)} for i in range(len(embeddings))]
+    return ids, embeddings, metadatas
+
+
+def test_int8_round_trip():
+    embeddings = np.array([[0.0, -1.0], [0.5, 1.0], [1.0, 0.0]], dtype=np.float32)
+    lo, step = fit_int8(embeddings)
+    codes = quantize_int8(embeddings, lo, step)
+    assert codes.dtype == np.int8
+    assert np.allclose(
+        (codes.astype(np.float32) + 128) * step + lo, embeddings, atol=step
+    )
+
+
+def test_hamming_distances():
+    codes = quantize_binary(np.array([[1.0, -1.0, 1.0], [-1.0, -1.0, -1.0]]))
+    query = quantize_binary(np.array([[1.0, 1.0, 1.0]]))[0]
+    assert hamming_distances(codes, query).tolist() == [1, 3]
+
+
+@pytest.mark.parametrize("method", ["int8", "binary"])
+def test_search_matches_exact_after_rescoring(tmp_path, corpus, method):
+    ids, embeddings, metadatas = corpus
+    exact = LocalVectorIndex(dim=32)
+    exact.add(ids, embeddings, metadatas)
+    index = QuantizedVectorIndex.build(
+        ids, embeddings, str(tmp_path), method=method, metadatas=metadatas
+    )
+    assert isinstance(index.vectors, np.memmap)
+    assert index.codes.nbytes < embeddings.nbytes / 3
+    assert index.memory_bytes() < exact.memory_bytes()
+
+    for query in embeddings[:10] + 0.1:
+        hits = index.search(query, k=5, num_candidates=len(ids))
+        expected = exact.search(query, k=5)
+        assert [h["id"] for h in hits] == [h["id"] for h in expected]
+        assert hits[0]["score"] == pytest.approx(expected[0]["score"], abs=1e-5)
+
+    hits = index.search(embeddings[3], k=3, filters={"topic_id": "3"})
+    assert hits[0]["id"] == "3"
+    assert all(h["topic_id"] == "3" for h in hits)
+
+    loaded = QuantizedVectorIndex.load(str(tmp_path))
+    assert loaded.search(embeddings[7], k=1)[0]["id"] == "7"
+
+
+def test_texts_stay_on_disk(tmp_path, corpus):
+    ids, embeddings, metadatas = corpus
+    df = pd.DataFrame(
+        {
+            "id": ids,
+            "embedding": list(embeddings),
+            "text": [f"argument number {i} " * 20 for i in range(len(ids))],
+            "topic_id": [m["topic_id"] for m in metadatas],
+        }
+    )
+    df.to_parquet(tmp_path / "embeddings.parquet")
+    index = QuantizedVectorIndex.from_parquet(
+        str(tmp_path / "embeddings.parquet"), str(tmp_path / "index")
+    )
+    assert index.metadatas[0] == {"topic_id": "0"}
+    hit = index.search(embeddings[7], k=1)[0]
+    assert hit["id"] == "7" and hit["text"] == df["text"][7]
+
+    # ids and metadata are resident, but the texts are not
+    codes = index.codes.nbytes + index.lo.nbytes + index.step.nbytes
+    assert index.memory_bytes() > codes + 50 * len(ids)
+    assert index.memory_bytes() < codes + df["text"].str.len().sum()
+    # the float32 baseline can leave the texts out the same way
+    exact = LocalVectorIndex.from_parquet(
+        str(tmp_path / "embeddings.parquet"), exclude_columns=["text"]
+    )
+    assert "text" not in exact.search(embeddings[7], k=1)[0]
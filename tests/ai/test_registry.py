@@ -0,0 +1,100 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from touche_rad.ai import registry as registry_module
+from touche_rad.ai.elasticsearch_retriever import ElasticsearchRetriever
+from touche_rad.ai.registry import ModelRegistry, sentence_transformer_key
+from touche_rad.ingestion_pipeline.embeddings import ArgumentEmbedder
+
+
+class FakeModel:
+    loads = 0
+
+    def __init__(self, name, device=None, **kwargs):
+        FakeModel.loads += 1
+        self.name = name
+        self.device = device
+
+
+def test_registry_shares_and_unloads(monkeypatch):
+    monkeypatch.setattr(registry_module, "SentenceTransformer", FakeModel)
+    FakeModel.loads = 0
+    registry = ModelRegistry()
+
+    first = registry.get_sentence_transformer("model", device="cpu")
+    second = registry.get_sentence_transformer("model", device="cpu")
+    other = registry.get_sentence_transformer("model", device="cuda")
+    assert first is second
+    assert other is not first
+    assert FakeModel.loads == 2
+
+    key = sentence_transformer_key("model", "cpu")
+    registry.release(key)
+    assert registry.unload(key) is False  # still referenced once
+    registry.release(key)
+    assert registry.unload(key) is True
+    assert key not in registry
+
+    assert registry.unload(sentence_transformer_key("model", "cuda"), force=True)
+    assert len(registry) == 0
+
+
+def test_context_manager_releases(monkeypatch):
+    monkeypatch.setattr(registry_module, "SentenceTransformer", FakeModel)
+    registry = ModelRegistry()
+    with registry.sentence_transformer("model", device="cpu") as model:
+        assert isinstance(model, FakeModel)
+        assert registry.unload(sentence_transformer_key("model", "cpu")) is False
+    assert registry.unload_unused() == 1
+
+
+def test_embedder_releases_model_on_close(monkeypatch):
+    monkeypatch.setattr(registry_module, "SentenceTransformer", FakeModel)
+    monkeypatch.setattr(registry_module, "registry", ModelRegistry())
+    key = sentence_transformer_key("model", "cpu")
+    with ArgumentEmbedder("model", device="cpu"):
+        with ArgumentEmbedder("model", device="cpu") as second:
+            assert key in registry_module.registry
+        assert second.model is None
+        assert registry_module.registry.unload_unused() == 0
+    assert registry_module.registry.unload_unused() == 1
+
+
+def test_loading_does_not_block_other_models():
+    registry = ModelRegistry()
+    registry._get("loaded", lambda: "ready")
+    started, finish = threading.Event(), threading.Event()
+    loads = []
+
+    def slow_load():
+        loads.append(1)
+        started.set()
+        finish.wait(5)
+        return "slow"
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        slow = [executor.submit(registry._get, "slow", slow_load) for _ in range(2)]
+        assert started.wait(5)
+        # the lock is not held while "slow" loads
+        assert executor.submit(registry._get, "loaded", None).result(1) == "ready"
+        finish.set()
+        assert [f.result(5) for f in slow] == ["slow", "slow"]
+    assert loads == [1]
+    assert registry._refcounts["slow"] == 2
+
+
+def test_retriever_takes_one_reference(monkeypatch):
+    class SlowModel(FakeModel):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            time.sleep(0.05)
+
+    monkeypatch.setattr(registry_module, "SentenceTransformer", SlowModel)
+    monkeypatch.setattr(registry_module, "registry", ModelRegistry())
+    retriever = ElasticsearchRetriever(es_url="http://localhost:9200")
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        models = list(executor.map(lambda _: retriever.embedding_model, range(4)))
+    assert all(model is models[0] for model in models)
+    retriever.close()
+    assert registry_module.registry.unload_unused() == 1
@@ -0,0 +1,78 @@
+import json
+import uuid
+
+from tensorzero import ChatInferenceResponse, Text, Usage
+
+from touche_rad.ai.tensorzero import TensorZeroClient
+from touche_rad.core.context import ContextSnapshot
+
+
+class FakeGateway:
+    def __init__(self, text):
+        self.text = text
+        self.requests = []
+
+    def inference(self, function_name, episode_id, input):
+        self.requests.append((function_name, input))
+        return ChatInferenceResponse(
+            inference_id=uuid.uuid4(),
+            episode_id=episode_id,
+            variant_name="fake",
+            content=[Text(text=self.text)],
+            usage=Usage(input_tokens=0, output_tokens=0),
+        )
+
+
+def make_client(text):
+    client = TensorZeroClient(base_url="http://localhost:3000")
+    client._client = FakeGateway(text)
+    return client
+
+
+def score(quantity, quality, relation, manner):
+    return {
+        "quantity_score": quantity,
+        "quality_score": quality,
+        "relation_score": relation,
+        "manner_score": manner,
+    }
+
+
+CTX = ContextSnapshot(
+    debate_id=uuid.uuid4(), user_claim="claim", conversation=("claim", "reply")
+)
+
+
+def test_evaluate_batch_sends_one_inference():
+    client = make_client(
+        json.dumps({"evaluations": [score(1, 0, 1, 1), score(0, 1, 1, 0)]})
+    )
+    results = client.evaluate_batch(CTX, [("user", "rebuttal"), ("system", "answer")])
+    assert results == [[1, 0, 1, 1], [0, 1, 1, 0]]
+
+    [(function_name, input)] = client._client.requests
+    assert function_name == "evaluate_utterances"
+    arguments = input["messages"][0]["content"][0]["arguments"]
+    assert arguments == {
+        "utterances": [
+            {"role": "user", "argument": "rebuttal"},
+            {"role": "system", "argument": "answer"},
+        ],
+        "conversation": ["claim", "reply"],
+        "claim": "claim",
+    }
+
+
+def test_evaluate_batch_reports_wrong_length():
+    client = make_client(json.dumps({"evaluations": [score(1, 1, 1, 1)]}))
+    results = client.evaluate_batch(CTX, [("user", "a"), ("system", "b")])
+    assert len(results) == 2
+    assert all(r.startswith("An error occurred during evaluation") for r in results)
+
+
+def test_evaluate_single_utterance():
+    client = make_client(json.dumps(score(1, 1, 0, 1)))
+    assert client.evaluate(CTX, "system", "answer") == [1, 1, 0, 1]
+    [(function_name, input)] = client._client.requests
+    assert function_name == "evaluate_utterance"
+    assert input["messages"][0]["content"][0]["arguments"]["argument"] == "answer"
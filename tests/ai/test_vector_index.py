@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from touche_rad.ai.elasticsearch_retriever import build_knn_filter
+from touche_rad.ai.vector_index import LocalVectorIndex, MetadataColumns
+
+
+@pytest.fixture
+def index():
+    index = LocalVectorIndex(dim=2)
+    index.add(
+        ["a", "b", "c", "d"],
+        np.array([[1.0, 0.0], [0.9, 0.1], [0.0, 1.0], [0.8, 0.2]]),
+        [
+            {"topic_id": "t1", "stance": "pro"},
+            {"topic_id": "t1", "stance": "con"},
+            {"topic_id": "t2", "stance": "pro"},
+            {"topic_id": "t2", "stance": "con"},
+        ],
+    )
+    return index
+
+
+def test_search_returns_top_k(index):
+    hits = index.search([1.0, 0.0], k=2)
+    assert [hit["id"] for hit in hits] == ["a", "b"]
+    assert [hit["key"] for hit in hits] == [1, 2]
+    assert hits[0]["score"] == pytest.approx(1.0)
+    assert hits[0]["stance"] == "pro"
+
+
+def test_search_with_filters(index):
+    assert len(index.partitions) == 2
+    hits = index.search([1.0, 0.0], k=5, filters={"topic_id": "t2"})
+    assert [hit["id"] for hit in hits] == ["d", "c"]
+    hits = index.search([1.0, 0.0], k=5, filters={"stance": "con"})
+    assert [hit["id"] for hit in hits] == ["b", "d"]
+    hits = index.search([1.0, 0.0], k=5, filters={"topic_id": ["t1"], "stance": "pro"})
+    assert [hit["id"] for hit in hits] == ["a"]
+    assert index.search([1.0, 0.0], filters={"topic_id": "missing"}) == []
+
+
+def test_build_knn_filter():
+    assert build_knn_filter({"topic": "pizza", "stance": ["pro", "con"]}) == [
+        {"term": {"topic": "pizza"}},
+        {"terms": {"stance": ["pro", "con"]}},
+    ]
+
+
+def test_metadata_columns():
+    metadatas = [{"stance": "pro"}, {"stance": "con"}, {}]
+    columns = MetadataColumns(metadatas)
+    assert columns.mask({"stance": "pro"}).tolist() == [True, False, False]
+    assert columns.mask({"stance": ["pro", None]}).tolist() == [True, False, True]
+    assert columns.mask({"stance": []}).tolist() == [False, False, False]
+    # rows appended after a filter are seen by the next one
+    metadatas.append({"stance": "pro"})
+    assert columns.mask({"stance": "pro"}).tolist() == [True, False, False, True]
+
+
+def test_filters_after_add(index):
+    index.search([1.0, 0.0], filters={"stance": "pro"})
+    index.add(["e"], np.array([[1.0, 0.0]]), [{"topic_id": "t1", "stance": "pro"}])
+    hits = index.search([1.0, 0.0], k=5, filters={"stance": "pro"})
+    assert sorted(hit["id"] for hit in hits) == ["a", "c", "e"]
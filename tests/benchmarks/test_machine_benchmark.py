@@ -0,0 +1,11 @@
+from touche_rad.benchmarks.machine import format_report, run_benchmark
+
+
+def test_run_benchmark():
+    rows = run_benchmark(debates=50)
+    assert [row["mode"] for row in rows] == ["transitions", "compiled"]
+    assert all(row["messages"] == 200 for row in rows)
+    transitions, compiled = rows
+    assert compiled["bytes_per_debate"] < transitions["bytes_per_debate"]
+    report = format_report(rows)
+    assert "| compiled | 50 |" in report
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from touche_rad.ai.quantization import QuantizedVectorIndex
+from touche_rad.ai.vector_index import LocalVectorIndex
+from touche_rad.benchmarks.quantization import (
+    Float32Backend,
+    QuantizedBackend,
+    format_report,
+    run_benchmark,
+)
+
+
+def test_run_benchmark(tmp_path):
+    rng = np.random.default_rng(0)
+    embeddings = rng.normal(size=(300, 128)).astype(np.float32)
+    ids = [str(i) for i in range(len(embeddings))]
+    exact = LocalVectorIndex(dim=128)
+    exact.add(ids, embeddings)
+    backends = [
+        Float32Backend(exact),
+        QuantizedBackend(
+            QuantizedVectorIndex.build(ids, embeddings, str(tmp_path), "binary"), exact
+        ),
+    ]
+
+    rows = run_benchmark(backends, embeddings[:20], ks=[5], num_candidates=[5, 300])
+    assert [(r["backend"], r["num_candidates"]) for r in rows] == [
+        ("float32", 5),
+        ("binary", 5),
+        ("binary", 300),
+    ]
+    assert rows[0]["recall"] == 1.0
+    assert rows[2]["recall"] == 1.0
+    # both count the same ids, so they differ by the vectors the codes replace
+    saved_mb = (embeddings.nbytes - embeddings.nbytes / 32) / 2**20
+    assert rows[0]["memory_mb"] - rows[1]["memory_mb"] == pytest.approx(
+        saved_mb, rel=0.05
+    )
+    assert "| binary |" in format_report(rows)
@@ -0,0 +1,76 @@
+import numpy as np
+
+from touche_rad.benchmarks.retrieval import (
+    cheapest_settings,
+    format_report,
+    parse_args,
+    recall_at_k,
+    run_sweep,
+)
+
+
+class FakeBackend:
+    """Approximate search that only sees the first `num_candidates` documents."""
+
+    name = "fake"
+
+    def __init__(self, docs):
+        self.docs = docs
+
+    def _top(self, query, k, docs):
+        scores = docs @ query
+        return [str(i) for i in np.argsort(-scores)[:k]]
+
+    def search(self, query, k, num_candidates):
+        return self._top(query, k, self.docs[:num_candidates])
+
+    def exact(self, query, k):
+        return self._top(query, k, self.docs)
+
+
+def test_recall_at_k():
+    assert recall_at_k(["a", "b", "c"], ["a", "c", "d"], 3) == 2 / 3
+    assert recall_at_k(["a", "b"], ["b", "a"], 2) == 1.0
+    assert np.isnan(recall_at_k([], [], 5))
+
+
+def test_parse_filters():
+    args = parse_args(
+        ["config.json", "--filter", "topic_id=42", "--filter", "stance=pro"]
+    )
+    assert args.filters == {"topic_id": 42, "stance": "pro"}
+
+
+def test_run_sweep():
+    rng = np.random.default_rng(0)
+    backend = FakeBackend(rng.normal(size=(200, 8)))
+    queries = rng.normal(size=(5, 8))
+    rows = run_sweep(backend, queries, ks=[5], num_candidates=[3, 20, 200])
+
+    # settings with fewer candidates than k are skipped
+    assert [row["num_candidates"] for row in rows] == [20, 200]
+    assert rows[-1]["recall"] == 1.0
+    assert cheapest_settings(rows, min_recall=1.0)[5]["num_candidates"] == 200
+    assert "num_candidates=200" in format_report(rows, min_recall=1.0)
+
+
+def test_run_sweep_without_ground_truth():
+    class EmptyBackend(FakeBackend):
+        def exact(self, query, k):
+            return []
+
+    backend = EmptyBackend(np.ones((10, 2)))
+    rows = run_sweep(backend, np.ones((2, 2)), ks=[5], num_candidates=[10])
+    # no neighbours to find is not perfect recall
+    assert np.isnan(rows[0]["recall"])
+    assert cheapest_settings(rows, min_recall=0.5) == {}
+
+
+def test_run_sweep_exact_backend():
+    class ExactBackend(FakeBackend):
+        approximate = False
+
+    backend = ExactBackend(np.eye(8))
+    rows = run_sweep(backend, np.eye(8)[:2], ks=[2, 4], num_candidates=[4, 8])
+    # num_candidates does not change an exact search, so it is not swept
+    assert [(row["k"], row["num_candidates"]) for row in rows] == [(2, 4), (4, 4)]
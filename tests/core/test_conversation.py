@@ -0,0 +1,103 @@
+from touche_rad.core.context import DebateContext
+from touche_rad.core.conversation import ConversationBuffer
+
+
+def count_words(text):
+    return len(text.split())
+
+
+def make_buffer(n, **kwargs):
+    buffer = ConversationBuffer(token_counter=count_words, **kwargs)
+    for i in range(n):
+        buffer.append(f"utterance {i}")
+    return buffer
+
+
+def test_window_is_whole_transcript_within_budget():
+    buffer = make_buffer(6, token_budget=12)
+    assert buffer.total_tokens == 12
+    assert buffer.token_counts == [2] * 6
+    assert buffer.window() == buffer.utterances
+
+
+def test_window_keeps_claim_and_recent_turns():
+    buffer = make_buffer(10, token_budget=12)
+    window = buffer.window()
+    assert window == [
+        "utterance 0",
+        "[7 earlier utterances omitted]",
+        "utterance 8",
+        "utterance 9",
+    ]
+    # the claim and the note take 6 words, the recent turns start on a user turn
+    assert sum(count_words(u) for u in window) <= 12
+
+
+def test_window_keeps_latest_turn_over_budget():
+    buffer = ConversationBuffer(token_budget=5, token_counter=count_words)
+    for text in ["claim", "reply", "a very long user rebuttal indeed"]:
+        buffer.append(text)
+    assert buffer.window()[-1] == "a very long user rebuttal indeed"
+    assert buffer.window()[0] == "claim"
+
+
+def test_summary_rolls_forward_incrementally():
+    calls = []
+
+    def summarizer(summary, dropped):
+        calls.append(list(dropped))
+        return (
+            f"summary of {len(dropped) + (int(summary.split()[-1]) if summary else 0)}"
+        )
+
+    buffer = ConversationBuffer(
+        token_budget=10, token_counter=count_words, summarizer=summarizer
+    )
+    for i in range(8):
+        buffer.append(f"utterance {i}")
+    first = buffer.window()
+    assert first[0] == "utterance 0"
+    assert first[1].startswith("summary of")
+    assert sum(count_words(u) for u in first) <= 10
+
+    buffer.append("utterance 8")
+    buffer.append("utterance 9")
+    second = buffer.window()
+    assert second[-1] == "utterance 9"
+    # only utterances that newly left the window are summarized
+    summarized = [u for batch in calls for u in batch]
+    assert len(summarized) == len(set(summarized))
+    assert second[1] == f"summary of {len(summarized)}"
+    calls_before = len(calls)
+    assert buffer.window() == second
+    assert len(calls) == calls_before
+
+
+def test_context_maintains_buffer():
+    context = DebateContext(
+        user_utterances=["claim", "rebuttal"], system_utterances=["reply"]
+    )
+    assert context.get_conversation() == ["claim", "reply", "rebuttal"]
+    context.add_system_utterance("answer")
+    context.add_user_utterance("again")
+    assert context.get_conversation() == [
+        "claim",
+        "reply",
+        "rebuttal",
+        "answer",
+        "again",
+    ]
+    context.reset_debate()
+    assert context.get_conversation() == []
+    assert context.conversation.total_tokens == 0
+
+
+def test_context_snapshot_uses_window():
+    context = DebateContext(token_budget=8, token_counter=count_words)
+    for i in range(4):
+        context.add_user_utterance(f"user {i}")
+        context.add_system_utterance(f"system {i}")
+    assert len(context.get_conversation()) == 8
+    assert context.snapshot().conversation_window() == context.conversation_window()
+    assert context.conversation_window()[0] == "user 0"
+    assert len(context.conversation_window()) < 8
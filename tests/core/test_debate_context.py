@@ -1,5 +1,10 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
+from touche_rad.ai.base import EvaluationClient
 from touche_rad.core.context import DebateContext
+from touche_rad.core.manager import DebateManager
 
 
 def test_debate_context_reset_debate():
@@ -62,3 +67,156 @@ def test_add_utterance():
 
     context.add_system_utterance("Hi")
     assert context.system_utterances == ["Hi"]
+
+
+class BlockingClient:
+    """Evaluation client that blocks until released and records its inputs."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.calls = []
+
+    def evaluate(self, ctx, role, utterance):
+        self.calls.append((role, utterance, ctx.user_claim, ctx.conversation_window()))
+        self.release.wait(timeout=5)
+        return [len(utterance), 0, 0, 0]
+
+
+def test_evaluation_does_not_block_turns():
+    client = BlockingClient()
+    context = DebateContext(client=client)
+
+    context.add_user_utterance("claim")
+    context.add_system_utterance("reply")
+    context.add_user_utterance("rebuttal")
+    assert context.current_turn == 2
+    assert context.pending_ratings() == 2
+
+    client.release.set()
+    user_ratings, system_ratings = context.wait_for_ratings(timeout=5)
+    assert system_ratings == [[5, 0, 0, 0]]
+    assert user_ratings == [[8, 0, 0, 0]]
+    assert context.pending_ratings() == 0
+    # each evaluation sees the conversation as it was when it was submitted
+    assert sorted(client.calls) == [
+        ("system", "reply", "claim", ["claim"]),
+        ("user", "rebuttal", "claim", ["claim", "reply"]),
+    ]
+
+
+def test_wait_for_ratings_timeout():
+    client = BlockingClient()
+    context = DebateContext(client=client)
+    context.add_user_utterance("claim")
+    context.add_system_utterance("reply")
+    with pytest.raises(TimeoutError):
+        context.wait_for_ratings(timeout=0.01)
+    client.release.set()
+    assert context.wait_for_ratings(timeout=5) == ([], [[5, 0, 0, 0]])
+
+
+def test_no_client_skips_evaluation():
+    context = DebateContext()
+    context.add_user_utterance("claim")
+    context.add_system_utterance("reply")
+    context.add_user_utterance("rebuttal")
+    assert context.wait_for_ratings() == ([], [])
+
+
+class BatchingClient:
+    supports_batch = True
+
+    def __init__(self):
+        self.batches = []
+
+    def evaluate_batch(self, ctx, utterances):
+        self.batches.append((ctx.conversation_window(), utterances))
+        return [[len(utterance), 1, 1, 1] for _, utterance in utterances]
+
+
+def test_turn_is_evaluated_in_one_batch():
+    client = BatchingClient()
+    context = DebateContext(client=client)
+
+    context.add_user_utterance("claim")
+    context.add_system_utterance("reply")
+    context.add_user_utterance("rebuttal")
+    context.add_system_utterance("answer")
+    context.add_user_utterance("last")
+
+    user_ratings, system_ratings = context.wait_for_ratings(timeout=5)
+    assert user_ratings == [[8, 1, 1, 1], [4, 1, 1, 1]]
+    assert system_ratings == [[5, 1, 1, 1], [6, 1, 1, 1]]
+    assert sorted(client.batches, key=lambda batch: len(batch[0])) == [
+        (["claim"], [("system", "reply")]),
+        (["claim", "reply"], [("user", "rebuttal"), ("system", "answer")]),
+        # the unanswered utterance is submitted on its own when waiting
+        (["claim", "reply", "rebuttal", "answer"], [("user", "last")]),
+    ]
+
+
+def test_reset_drops_unsubmitted_evaluation():
+    client = BatchingClient()
+    context = DebateContext(client=client)
+    context.add_user_utterance("claim")
+    context.add_system_utterance("reply")
+    context.add_user_utterance("new topic")
+    context.reset_debate()
+    assert context.wait_for_ratings(timeout=5) == ([], [])
+    assert len(client.batches) <= 1
+
+
+class SequentialClient(EvaluationClient):
+    """Inherits the default `evaluate_batch`, so it does not batch."""
+
+    def __init__(self):
+        self.calls = []
+
+    def evaluate(self, ctx, role, utterance):
+        self.calls.append((role, utterance))
+        return [len(utterance), 0, 0, 0]
+
+
+def test_client_without_batching_is_not_deferred():
+    client = SequentialClient()
+    context = DebateContext(client=client, executor=ImmediateExecutor())
+    context.add_user_utterance("claim")
+    context.add_system_utterance("reply")
+    context.add_user_utterance("rebuttal")
+    # submitted right away instead of waiting for the reply
+    assert client.calls == [("system", "reply"), ("user", "rebuttal")]
+
+
+class ImmediateExecutor:
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+def test_conclusion_submits_deferred_evaluation():
+    client = BatchingClient()
+    context = DebateContext(client=client, executor=ImmediateExecutor(), max_turns=2)
+    manager = DebateManager(context=context, strategy_name="always_attack")
+    manager.handle_user_message("claim")
+    manager.handle_user_message("rebuttal")
+    assert context.state == "conclusion"
+    # the last user utterance has no reply to be batched with
+    assert client.batches[-1][1] == [("user", "rebuttal")]
+    assert context.pending_ratings() == 0
+
+
+def test_reset_keeps_queued_evaluations():
+    client = BlockingClient()
+    executor = ThreadPoolExecutor(max_workers=1)
+    context = DebateContext(client=client, executor=executor, max_turns=2)
+    manager = DebateManager(context=context, strategy_name="always_attack")
+    manager.handle_user_message("claim")
+    # the rating of the reply blocks the only worker, so this one is queued
+    manager.handle_user_message("rebuttal")
+    manager.handle_user_message("yes")
+    assert context.user_utterances == []
+
+    client.release.set()
+    executor.shutdown(wait=True)
+    # both evaluations of the concluded debate still reached the client
+    assert [call[0] for call in client.calls] == ["system", "user"]
+    assert client.calls[1][1] == "rebuttal"
@@ -1,5 +1,12 @@
+import pytest
+from transitions.core import MachineError
+
 from touche_rad.core.context import DebateContext
-from touche_rad.core.machine import DebateMachine
+from touche_rad.core.machine import (
+    DebateMachine,
+    LightweightDebateContext,
+    compiled_debate_machine,
+)
 
 
 def test_debate_machine_initialization():
@@ -56,3 +63,57 @@ def test_debate_machine_transitions():
     context.user_rejects_to_conclude()
     assert context.state == "system_turn"
     assert context.conclusion_requested is True  # Stays True
+
+
+SCRIPT = [
+    ("user_input", "claim"),
+    ("system_response", "reply"),
+    ("user_input", "rebuttal"),
+    ("request_conclusion",),
+    ("user_rejects_to_conclude",),
+    ("system_response", "answer"),
+    ("user_input", "new topic"),
+    ("start_new_debate",),
+    ("user_input", "another claim"),
+    ("request_conclusion",),
+    ("user_approves_to_conclude",),
+]
+
+
+def run_script(context):
+    trace = []
+    for trigger, *args in SCRIPT:
+        getattr(context, trigger)(*args)
+        trace.append((context.state, context.get_conversation(), context.current_turn))
+    return trace
+
+
+def test_compiled_machine_matches_transitions():
+    context = DebateContext()
+    _ = DebateMachine(model=context)
+    lightweight = LightweightDebateContext()
+    assert lightweight.state == "user_turn"
+    assert run_script(lightweight) == run_script(context)
+
+
+def test_compiled_machine_invalid_triggers():
+    context = LightweightDebateContext()
+    with pytest.raises(MachineError):
+        context.system_response("too early")
+    assert context.is_user_turn()
+    context.state = "invalid_state"
+    with pytest.raises(ValueError):
+        context.start_new_debate()
+
+
+def test_compiled_machine_is_shared():
+    first, second = LightweightDebateContext(), LightweightDebateContext()
+    first.user_input("claim")
+    assert first.is_system_turn() and second.is_user_turn()
+    assert first.machine is second.machine is compiled_debate_machine
+    assert "state" not in vars(second)
+    assert compiled_debate_machine.get_triggers("system_turn") == [
+        "system_response",
+        "request_conclusion",
+        "start_new_debate",
+    ]
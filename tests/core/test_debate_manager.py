@@ -43,3 +43,26 @@ def test_debate_manager_invalid_state():
     manager.context.state = "invalid_state"
     with pytest.raises(ValueError):
         manager.handle_user_message("This should raise an error.")
+
+
+@pytest.mark.parametrize("lightweight", [False, True])
+def test_debate_manager_modes_agree(lightweight):
+    manager = DebateManager(strategy_name="always_attack", lightweight=lightweight)
+    replies = [
+        manager.handle_user_message(m) for m in ["claim", "point", "more", "yes"]
+    ]
+    assert (
+        replies[-2] == "I think we've reached a good point to conclude. Do you agree?"
+    )
+    assert replies[-1] == "Great! It was a pleasure debating with you."
+    assert manager.context.is_user_turn()
+
+
+def test_debate_manager_bounds_conversation_window():
+    manager = DebateManager(strategy_name="always_attack", token_budget=60)
+    for i in range(6):
+        manager.handle_user_message(f"Point {i}: " + "word " * 20)
+    window = manager.context.conversation_window()
+    assert len(window) < len(manager.context.get_conversation())
+    assert window[0] == manager.context.user_claim
+    assert manager.context.conversation.token_budget == 60
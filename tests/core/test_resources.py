@@ -0,0 +1,103 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from touche_rad.ai.evidence_store import EvidenceStore, PrecomputedRetriever
+from touche_rad.core.manager import DebateManager
+from touche_rad.core.resources import DebateResources
+from touche_rad.core.strategy.drivers.rag import RAGStrategy
+
+
+class FakeRetriever:
+    def __init__(self):
+        self.embedding_model = object()
+        self.filters = []
+
+    def retrieve(self, query, mode="text", k=10, filters=None):
+        self.filters.append(filters)
+        return [{"text": f"evidence for {query}"}]
+
+
+class FakeClient:
+    def generate(self, ctx, prompt):
+        return "counter-argument"
+
+
+def counting_factory():
+    calls = []
+    lock = threading.Lock()
+
+    def factory():
+        with lock:
+            calls.append(1)
+        time.sleep(0.01)
+        return FakeRetriever()
+
+    return factory, calls
+
+
+def test_retriever_built_once_under_concurrency():
+    factory, calls = counting_factory()
+    resources = DebateResources(retriever_factory=factory)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        retrievers = list(executor.map(lambda _: resources.get_retriever(), range(32)))
+    assert len(calls) == 1
+    assert all(r is retrievers[0] for r in retrievers)
+    assert resources.get_encoder() is retrievers[0].embedding_model
+
+
+def test_managers_share_resources():
+    factory, calls = counting_factory()
+    resources = DebateResources(client=FakeClient(), retriever_factory=factory)
+    managers = [
+        DebateManager(strategy_name="rag", resources=resources) for _ in range(5)
+    ]
+    assert len(calls) == 1
+    for manager in managers:
+        assert isinstance(manager.strategy, RAGStrategy)
+        assert manager.strategy.rag_debater.retriever is resources.get_retriever()
+        assert manager.client is resources.client
+    assert managers[0].context is not managers[1].context
+
+
+def test_manager_client_overrides_resources():
+    resources = DebateResources(client=FakeClient(), retriever_factory=FakeRetriever)
+    client = FakeClient()
+    manager = DebateManager(client=client, strategy_name="rag", resources=resources)
+    assert manager.client is client
+    assert manager.strategy.rag_debater.model_client is client
+
+
+def test_non_rag_strategy_does_not_build_retriever():
+    factory, calls = counting_factory()
+    manager = DebateManager(resources=DebateResources(retriever_factory=factory))
+    assert manager.strategy.name == "random"
+    assert calls == []
+
+
+def test_rag_strategy_filters_on_debate_topic():
+    resources = DebateResources(client=FakeClient(), retriever_factory=FakeRetriever)
+    manager = DebateManager(strategy_name="rag", resources=resources)
+    manager.handle_user_message("Pineapple belongs on pizza")
+    manager.context.topic = "Does pineapple belong on pizza?"
+    manager.handle_user_message("It balances the salt")
+    assert resources.get_retriever().filters == [
+        None,
+        {"topic": "Does pineapple belong on pizza?"},
+    ]
+
+
+def test_topic_debate_served_from_precomputed_store(tmp_path):
+    topic = "Does pineapple belong on pizza?"
+    store = EvidenceStore(str(tmp_path / "evidence.duckdb"))
+    store.put_many([(topic, "text", 10, [{"text": "stored evidence"}])])
+    live = FakeRetriever()
+    resources = DebateResources(
+        client=FakeClient(),
+        retriever_factory=lambda: PrecomputedRetriever(live, store),
+    )
+    manager = DebateManager(strategy_name="rag", resources=resources)
+    manager.context.topic = topic
+    manager.handle_user_message("Pineapple belongs on pizza")
+    manager.handle_user_message("It balances the salt")
+    assert live.filters == []
@@ -0,0 +1,240 @@
+import gzip
+import json
+import os
+import threading
+
+import pytest
+
+from touche_rad.core.machine import LightweightDebateContext
+from touche_rad.core.resources import DebateResources
+from touche_rad.core.sessions import (
+    LIGHTWEIGHT_SESSION_OVERHEAD_BYTES,
+    SessionNotFound,
+    SessionStore,
+    estimate_session_bytes,
+)
+
+
+def test_session_keeps_debate_state():
+    store = SessionStore()
+    session_id = store.create()
+    with store.session(session_id) as manager:
+        manager.handle_user_message("My claim")
+    with store.session(session_id) as manager:
+        assert manager.context.user_claim == "My claim"
+        assert manager.context.state == "user_turn"
+    assert len(store) == 1
+
+
+def test_unknown_session():
+    store = SessionStore()
+    with pytest.raises(SessionNotFound):
+        with store.session("missing"):
+            pass
+
+
+def test_lru_eviction_without_snapshots():
+    store = SessionStore(max_sessions=2)
+    first, second = store.create(), store.create()
+    with store.session(first):
+        pass  # first is now the most recently used
+    third = store.create()
+    assert first in store and third in store
+    assert second not in store
+    assert store.stats()["evicted"] == 1
+
+
+def test_evicted_session_is_rehydrated(tmp_path):
+    store = SessionStore(max_sessions=1, snapshot_dir=str(tmp_path))
+    first = store.create(topic="Pizza")
+    with store.session(first) as manager:
+        manager.handle_user_message("My claim")
+        debate_id = manager.context.debate_id
+    store.create()
+    assert len(store) == 1
+    assert os.path.exists(tmp_path / f"{first}.json.gz")
+
+    with store.session(first) as manager:
+        assert manager.context.debate_id == debate_id
+        assert manager.context.topic == "Pizza"
+        assert manager.context.get_conversation()[0] == "My claim"
+        assert manager.context.state == "user_turn"
+        assert manager.context.current_turn == 1
+        manager.handle_user_message("Second point")
+        assert manager.context.current_turn == 2
+    assert store.stats()["rehydrated"] == 1
+    assert not os.path.exists(tmp_path / f"{first}.json.gz")
+
+
+def test_memory_cap(tmp_path):
+    cap = 6 * LIGHTWEIGHT_SESSION_OVERHEAD_BYTES
+    store = SessionStore(max_memory_bytes=cap, snapshot_dir=str(tmp_path))
+    ids = [store.create() for _ in range(10)]
+    assert store.memory_bytes <= cap
+    assert len(store) < 10
+    # the most recent sessions stay in memory
+    assert all(session_id in store._sessions for session_id in ids[-len(store) :])
+    assert all(session_id in store for session_id in ids)
+
+
+def test_idle_eviction():
+    store = SessionStore(idle_timeout=0)
+    store.create()
+    assert store.evict_idle() == 1
+    assert len(store) == 0 and store.memory_bytes == 0
+
+
+def test_session_in_use_is_not_evicted():
+    store = SessionStore(idle_timeout=0)
+    session_id = store.create()
+    with store.session(session_id):
+        assert store.evict_idle() == 0
+    assert session_id in store
+
+
+def test_delete(tmp_path):
+    store = SessionStore(snapshot_dir=str(tmp_path))
+    session_id = store.create()
+    store.snapshot_all()
+    assert len(store) == 0
+    assert store.delete(session_id) is True
+    assert session_id not in store
+    assert store.delete(session_id) is False
+    assert store.delete("../etc") is False
+
+
+@pytest.mark.parametrize("lightweight", [True, False])
+def test_rehydrated_context_keeps_mode(tmp_path, lightweight):
+    store = SessionStore(
+        snapshot_dir=str(tmp_path), lightweight=lightweight, token_budget=100
+    )
+    session_id = store.create()
+    with store.session(session_id) as manager:
+        manager.handle_user_message("My claim")
+    store.snapshot_all()
+    with store.session(session_id) as manager:
+        assert isinstance(manager.context, LightweightDebateContext) is lightweight
+        assert manager.context.conversation.token_budget == 100
+        assert manager.context.is_user_turn()
+        assert manager.context.user_claim == "My claim"
+
+
+class FakeRetriever:
+    def retrieve(self, query, mode="text", k=10, filters=None):
+        return [{"id": "1", "text": f"evidence for {query}"}]
+
+
+class FakeClient:
+    def generate(self, ctx, prompt):
+        return "counter-argument"
+
+
+@pytest.mark.parametrize("lightweight", [True, False])
+def test_rag_session_round_trip(tmp_path, lightweight):
+    resources = DebateResources(client=FakeClient(), retriever_factory=FakeRetriever)
+    store = SessionStore(
+        resources,
+        strategy_name="rag",
+        snapshot_dir=str(tmp_path),
+        lightweight=lightweight,
+    )
+    session_id = store.create()
+    with store.session(session_id) as manager:
+        assert manager.handle_user_message("My claim") == "counter-argument"
+        size = estimate_session_bytes(manager)
+    store.snapshot_all()
+    with gzip.open(tmp_path / f"{session_id}.json.gz", "rt") as f:
+        assert "evidence for" not in f.read()
+
+    with store.session(session_id) as manager:
+        assert manager.context.system_utterances == ["counter-argument"]
+        assert estimate_session_bytes(manager) == size
+        assert manager.handle_user_message("Another point") == "counter-argument"
+        assert manager.context.get_conversation()[1] == "counter-argument"
+
+
+class BlockingClient:
+    """Evaluation client whose ratings arrive once released."""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def evaluate(self, ctx, role, utterance):
+        self.release.wait(timeout=5)
+        return [1, 2, 3, 4]
+
+
+def test_session_is_not_evicted_while_evaluated(tmp_path):
+    client = BlockingClient()
+    store = SessionStore(
+        DebateResources(client=client), max_sessions=1, snapshot_dir=str(tmp_path)
+    )
+    first = store.create()
+    with store.session(first) as manager:
+        manager.handle_user_message("My claim")
+        context = manager.context
+    assert context.pending_ratings() == 1
+
+    # over the limit, but the rating of the reply is still running
+    second = store.create()
+    assert first in store._sessions
+
+    client.release.set()
+    context.wait_for_ratings(timeout=5)
+    with store.session(second):
+        pass
+    assert first not in store._sessions
+    with gzip.open(tmp_path / f"{first}.json.gz", "rt") as f:
+        assert json.load(f)["system_ratings"] == [[1, 2, 3, 4]]
+
+
+def test_snapshot_all_waits_for_ratings(tmp_path):
+    client = BlockingClient()
+    store = SessionStore(DebateResources(client=client), snapshot_dir=str(tmp_path))
+    session_id = store.create()
+    with store.session(session_id) as manager:
+        manager.handle_user_message("My claim")
+    threading.Timer(0.05, client.release.set).start()
+    assert store.snapshot_all() == 1
+    with store.session(session_id) as manager:
+        assert manager.context.wait_for_ratings(timeout=0) == ([], [[1, 2, 3, 4]])
+
+
+def test_snapshot_is_written_outside_the_store_lock(tmp_path):
+    store = SessionStore(max_sessions=2, snapshot_dir=str(tmp_path))
+    first, second = store.create(), store.create()
+    writing, release = threading.Event(), threading.Event()
+    write_snapshot = store._write_snapshot
+
+    def slow_write(session_id, manager):
+        writing.set()
+        release.wait(timeout=5)
+        write_snapshot(session_id, manager)
+
+    store._write_snapshot = slow_write
+    creator = threading.Thread(target=store.create)
+    creator.start()
+    assert writing.wait(timeout=5)
+
+    # other sessions are served while the evicted one is written
+    with store.session(second) as manager:
+        manager.handle_user_message("My claim")
+    assert store.stats()["evicted"] == 0
+
+    # a request for the evicted session waits for its snapshot
+    read = []
+
+    def read_first():
+        with store.session(first) as manager:
+            read.append(str(manager.context.debate_id))
+
+    reader = threading.Thread(target=read_first)
+    reader.start()
+    reader.join(timeout=0.05)
+    assert reader.is_alive()
+    release.set()
+    creator.join(timeout=5)
+    reader.join(timeout=5)
+    assert read == [first]
+    assert store.stats()["evicted"] >= 1
+    assert store.stats()["rehydrated"] == 1
@@ -0,0 +1,26 @@
+import pytest
+
+from touche_rad.ingestion_pipeline import preprocessing
+
+
+class WhitespaceTokenizer:
+    """One token per word, plus `special_tokens`; records every batch."""
+
+    def __init__(self, special_tokens=0):
+        self.special_tokens = special_tokens
+        self.calls = []
+
+    def num_special_tokens_to_add(self):
+        return self.special_tokens
+
+    def __call__(self, texts, add_special_tokens=True, **kwargs):
+        self.calls.append(list(texts))
+        return {"input_ids": [text.split() for text in texts]}
+
+
+@pytest.fixture
+def tokenizer(monkeypatch):
+    """A `WhitespaceTokenizer` in place of every tokenizer the preprocessing loads."""
+    tokenizer = WhitespaceTokenizer()
+    monkeypatch.setattr(preprocessing, "get_tokenizer", lambda name: tokenizer)
+    return tokenizer
@@ -0,0 +1,36 @@
+"""Test doubles shared by the ingestion tests; importable by pool workers."""
+
+import numpy as np
+
+from touche_rad.ingestion_pipeline.embeddings import ArgumentEmbedder
+
+
+class FakeModel:
+    """Embeds a text as its length in words, in three dimensions."""
+
+    max_seq_length = 128
+
+    def tokenizer(self, texts, **kwargs):
+        return {"input_ids": [text.split() for text in texts]}
+
+    def get_sentence_embedding_dimension(self):
+        return 3
+
+    def encode(self, texts, **kwargs):
+        return np.array([[len(t.split()), 1.0, 0.0] for t in texts], dtype=np.float32)
+
+
+class FakeEmbedder(ArgumentEmbedder):
+    """An `ArgumentEmbedder` around `FakeModel` that records every call."""
+
+    def __init__(self, model_name, device=None):
+        self.model_name = model_name
+        self.device = device
+        self.model = FakeModel()
+        self.calls = []
+
+    def embed_texts(self, texts, debug=False, **kwargs):
+        self.calls.append(list(texts))
+        if debug:
+            print(f"DEBUG {len(texts)} texts")
+        return super().embed_texts(texts, debug=debug, **kwargs)
@@ -0,0 +1,35 @@
+import pytest
+
+from touche_rad.ingestion_pipeline.dedup import NearDuplicateFilter, lsh_params
+
+BASE = (
+    "Nuclear power is a reliable source of low carbon electricity and should be "
+    "part of any serious plan to cut emissions"
+)
+
+
+def test_lsh_params():
+    bands, rows = lsh_params(0.8, 128)
+    assert bands * rows <= 128
+    assert 0.75 < (1 / bands) ** (1 / rows) <= 0.8
+
+
+def test_filter_keeps_first_of_each_cluster():
+    texts = [
+        BASE,
+        "School uniforms reduce bullying and help students focus on learning",
+        BASE.replace("serious", "credible"),
+        BASE.upper(),
+        "Social media does more harm than good to teenagers mental health",
+    ]
+    dedup = NearDuplicateFilter(threshold=0.8)
+    assert dedup.filter(texts) == [texts[0], texts[1], texts[4]]
+    assert dedup.stats() == {"seen": 5, "removed": 2, "removed_fraction": 0.4}
+
+
+def test_threshold_controls_what_counts_as_duplicate():
+    texts = [BASE, BASE.replace("low carbon electricity", "clean energy")]
+    assert len(NearDuplicateFilter(threshold=0.5).filter(texts)) == 1
+    assert len(NearDuplicateFilter(threshold=0.95).filter(texts)) == 2
+    with pytest.raises(ValueError):
+        NearDuplicateFilter(threshold=0)
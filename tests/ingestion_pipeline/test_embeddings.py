@@ -0,0 +1,100 @@
+from contextlib import contextmanager
+
+import numpy as np
+
+from fakes import FakeEmbedder
+from touche_rad.ingestion_pipeline.embeddings import (
+    EmbeddingSearchIndex,
+    EmbeddingWorkerPool,
+    token_budget_batches,
+)
+
+
+class FakeEngine:
+    """Answers the two queries `refresh` runs from a dict of rows."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    @contextmanager
+    def connect(self):
+        yield self
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        self.statements.append(sql)
+        if sql.startswith("SELECT id FROM"):
+            return [(row_id,) for row_id in self.rows]
+        wanted = params["ids"]
+        rows = [(i, *self.rows[i]) for i in wanted if i in self.rows]
+        return type("Result", (), {"fetchall": lambda self: rows})()
+
+
+def test_embedding_search_index():
+    index = EmbeddingSearchIndex("sqlite://")
+    index._add_rows(
+        [
+            ("1", "first", [1.0, 0.0, 0.0]),
+            ("2", "second", "{0.0,1.0,0.0}"),
+            ("3", "third", [0.7, 0.7, 0.0]),
+        ]
+    )
+    assert len(index) == 3
+
+    results = index.search(np.array([[1.0, 0.1, 0.0]]), k=2)
+    assert [r["text"] for r in results] == ["first", "third"]
+
+    index._remove_ids({"1"})
+    assert index.search(np.array([1.0, 0.1, 0.0]), k=1)[0]["text"] == "third"
+    assert index.matrix.shape == (2, 3)
+
+
+def test_refresh_syncs_with_table():
+    index = EmbeddingSearchIndex("sqlite://", refresh_interval=None)
+    engine = index.engine = FakeEngine(
+        {"a": ("first", [1.0, 0.0]), "b": ("second", "{0.0,1.0}")}
+    )
+    assert index.refresh_if_stale() == 2
+    assert "id = ANY(CAST(:ids AS uuid[]))" in engine.statements[-1]
+    assert index.search(np.array([0.1, 1.0]), k=1)[0]["id"] == "b"
+
+    # loaded once, after that only on demand
+    engine.rows = {"b": ("second", [0.0, 1.0]), "c": ("third", [0.6, 0.8])}
+    assert index.refresh_if_stale() == 0
+    assert index.refresh() == 1
+    assert sorted(index.ids) == ["b", "c"]
+    assert [r["text"] for r in index.search(np.array([1.0, 0.0]), k=2)] == [
+        "third",
+        "second",
+    ]
+
+    index.refresh_interval = 0
+    engine.rows["d"] = ("fourth", [1.0, 0.0])
+    assert index.refresh_if_stale() == 1
+
+
+def test_token_budget_batches():
+    lengths = np.array([5, 100, 10, 100, 5, 50])
+    batches = token_budget_batches(lengths, max_tokens_per_batch=200, max_batch_size=3)
+
+    # every text is embedded exactly once
+    assert sorted(np.concatenate(batches).tolist()) == list(range(len(lengths)))
+    # padded cost stays within the budget and the longest texts go first
+    for batch in batches:
+        assert lengths[batch].max() * len(batch) <= 200
+    assert sorted(batches[0].tolist()) == [1, 3]
+    assert max(len(batch) for batch in batches) <= 3
+
+
+def test_embedding_worker_pool(capfd):
+    texts = [" ".join(["word"] * n) for n in range(1, 8)]
+    with EmbeddingWorkerPool(
+        num_workers=1, shard_size=3, embedder_factory=FakeEmbedder
+    ) as pool:
+        embeddings = pool.embed_texts(texts, debug=True)
+        assert embeddings[:, 0].tolist() == list(range(1, 8))
+        # the workers see the debug flag
+        assert "DEBUG 3 texts" in capfd.readouterr().out
+        assert pool.embed_texts([]).shape == (0, 3)
+    assert pool._pool is None
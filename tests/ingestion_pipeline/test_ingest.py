@@ -0,0 +1,249 @@
+import os
+
+import pandas as pd
+import pytest
+
+from fakes import FakeEmbedder
+from touche_rad.ingestion_pipeline import ingest, preprocessing
+from touche_rad.ingestion_pipeline.ingest import (
+    DebateIngestionPipeline,
+    chunk_ids,
+    content_hash,
+)
+
+
+class FakeWriter:
+    """`PostgresCopyWriter` in memory: rows, manifest and progress markers."""
+
+    def __init__(self, engine=None, **kwargs):
+        # id -> (topic_id, text)
+        self.rows = {}
+        # id -> embedding
+        self.embeddings = {}
+        # id -> (source, topic_id)
+        self.manifest = {}
+        # (source, topic_id) of committed topics
+        self.progress = set()
+        # (topic_id, texts) of every write_topic call
+        self.writes = []
+        # a topic whose write fails, as if the connection was lost
+        self.fail_on = None
+
+    def create_table(self):
+        pass
+
+    create_progress_table = create_manifest_table = create_table
+
+    def manifest_ids(self, source, topic_id):
+        return {i for i, key in self.manifest.items() if key == (source, topic_id)}
+
+    def delete_other_topics(self, source, keep):
+        gone = [
+            i for i, (s, t) in self.manifest.items() if s == source and t not in keep
+        ]
+        for row_id in gone:
+            del self.manifest[row_id]
+            del self.rows[row_id]
+        self.progress = {(s, t) for s, t in self.progress if s != source or t in keep}
+        return len(gone)
+
+    def completed_topics(self, source):
+        return {t for s, t in self.progress if s == source}
+
+    def reset_progress(self, source):
+        self.progress = {(s, t) for s, t in self.progress if s != source}
+
+    def write_topic(
+        self,
+        source,
+        topic_id,
+        topic,
+        ids,
+        embeddings,
+        texts,
+        num_sentences,
+        hashes=None,
+        stale_ids=(),
+        num_rows=None,
+    ):
+        if topic_id == self.fail_on:
+            raise ConnectionError("connection lost")
+        assert len(ids) == len(texts) == (0 if embeddings is None else len(embeddings))
+        for row_id in [*ids, *stale_ids]:
+            self.rows.pop(row_id, None)
+            self.manifest.pop(row_id, None)
+        for i, (row_id, text) in enumerate(zip(ids, texts)):
+            self.rows[row_id] = (topic_id, text)
+            self.embeddings[row_id] = embeddings[i]
+            self.manifest[row_id] = (source, topic_id)
+        self.progress.add((source, topic_id))
+        self.writes.append((topic_id, list(texts)))
+        return len(ids)
+
+
+@pytest.fixture
+def pipeline(tokenizer, monkeypatch):
+    monkeypatch.setattr(ingest, "create_engine", lambda url: None)
+    monkeypatch.setattr(ingest, "PostgresCopyWriter", FakeWriter)
+    monkeypatch.setattr(ingest, "ArgumentEmbedder", FakeEmbedder)
+    # at most four words per chunk, so every sentence below is a chunk
+    return DebateIngestionPipeline(embedding_model="model", max_tokens=4)
+
+
+def write_topics(path, topics):
+    """Write {topic_id: [sentence, ...]} as an ingestion CSV, one row per sentence."""
+    rows = [
+        {"id": topic_id, "topic": f"Topic {topic_id}", "sentence": sentence}
+        for topic_id, sentences in topics.items()
+        for sentence in sentences
+    ]
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return str(path)
+
+
+def stored_texts(pipeline):
+    return sorted(text for _, text in pipeline.writer.rows.values())
+
+
+def test_chunk_ids_are_deterministic():
+    ids = chunk_ids("7", ["a", "b", "a"])
+    assert ids == chunk_ids("7", ["a", "b", "a"])
+    assert len(set(ids)) == 3
+    # removing a chunk does not change the ids of the others
+    assert chunk_ids("7", ["a", "a"]) == [ids[0], ids[2]]
+    assert chunk_ids("8", ["a"])[0] != ids[0]
+
+
+def test_content_hash_covers_model_and_chunking():
+    key = content_hash("a chunk", "all-mpnet-base-v2", 384)
+    assert key == content_hash("a chunk", "all-mpnet-base-v2", 384)
+    assert key != content_hash("a chunk.", "all-mpnet-base-v2", 384)
+    assert key != content_hash("a chunk", "stella", 384)
+    assert key != content_hash("a chunk", "all-mpnet-base-v2", 256)
+    assert key != content_hash("a chunk", "all-mpnet-base-v2", 384, chunking_version=0)
+
+
+def test_token_cache_is_cleared_per_topic(tokenizer):
+    # only the preprocessing half of the pipeline, without a database
+    pipeline = DebateIngestionPipeline.__new__(DebateIngestionPipeline)
+    pipeline.preprocessor = preprocessing.TextPreprocessor(max_tokens=10)
+    pipeline.dedup = None
+    for topic in (["First point. Second point."], ["Another topic here."]):
+        assert pipeline._topic_chunks(topic)
+        assert pipeline.preprocessor._token_lengths == {}
+
+
+def test_rerun_after_edit_embeds_only_the_changes(pipeline, tmp_path):
+    path = write_topics(
+        tmp_path / "data.csv",
+        {"1": ["Cats purr loudly.", "Dogs bark often."], "2": ["Fish swim fast."]},
+    )
+    assert pipeline.ingest_stream(path)["rows"] == 3
+    # the input was read to the end, so no marker skips a topic next time
+    assert pipeline.writer.progress == set()
+
+    write_topics(
+        tmp_path / "data.csv",
+        {"1": ["Cats purr loudly.", "Birds sing early."], "2": ["Fish swim fast."]},
+    )
+    pipeline.embedder.calls.clear()
+    stats = pipeline.ingest_stream(path)
+    assert stats["skipped_topics"] == 0
+    assert (stats["rows"], stats["reused_rows"], stats["deleted_rows"]) == (1, 2, 1)
+    assert [len(call) for call in pipeline.embedder.calls] == [1]
+    assert stored_texts(pipeline) == [
+        "Birds sing early.",
+        "Cats purr loudly.",
+        "Fish swim fast.",
+    ]
+
+
+def test_csv_ingestion_reuses_the_stream_manifest(pipeline, tmp_path):
+    path = write_topics(
+        tmp_path / "data.csv", {"1": ["Cats purr loudly."], "2": ["Fish swim fast."]}
+    )
+    pipeline.ingest_stream(path)
+    pipeline.embedder.calls.clear()
+
+    stats = pipeline.ingest_csv(path, skip_stats=True)
+    assert (stats["rows"], stats["reused_rows"]) == (0, 2)
+    stats = pipeline.ingest_csv_pipelined(path)
+    assert (stats["rows"], stats["reused_rows"]) == (0, 2)
+    assert pipeline.embedder.calls == []
+    assert len(pipeline.writer.rows) == 2
+
+
+def test_resume_skips_committed_topics(pipeline, tmp_path):
+    path = write_topics(
+        tmp_path / "data.csv",
+        {
+            "1": ["Cats purr loudly."],
+            "2": ["Fish swim fast."],
+            "3": ["Owls hoot late."],
+        },
+    )
+    pipeline.writer.fail_on = "2"
+    with pytest.raises(ConnectionError):
+        pipeline.ingest_stream(path)
+    assert pipeline.writer.completed_topics(os.path.abspath(path)) == {"1"}
+
+    pipeline.writer.fail_on = None
+    pipeline.embedder.calls.clear()
+    stats = pipeline.ingest_stream(path)
+    assert (stats["topics"], stats["skipped_topics"]) == (2, 1)
+    assert pipeline.embedder.calls == [["Fish swim fast."], ["Owls hoot late."]]
+    assert len(pipeline.writer.rows) == 3
+
+
+def test_reingestion_splits_new_and_stale_rows(pipeline, tmp_path):
+    path = write_topics(
+        tmp_path / "data.csv",
+        {
+            "1": ["Cats purr loudly.", "Dogs bark often.", "Cats purr loudly."],
+            "2": ["Fish swim fast."],
+        },
+    )
+    pipeline.ingest_stream(path)
+    first_ids = set(pipeline.writer.rows)
+
+    # a chunk replaced, a repeated chunk dropped and topic 2 removed
+    write_topics(tmp_path / "data.csv", {"1": ["Cats purr loudly.", "Owls hoot late."]})
+    pipeline.writer.writes.clear()
+    stats = pipeline.ingest_stream(path)
+    assert stats["topics"] == 1
+    assert (stats["rows"], stats["reused_rows"]) == (1, 1)
+    # two stale rows of topic 1 and the row of topic 2
+    assert stats["deleted_rows"] == 3
+    assert pipeline.writer.writes == [("1", ["Owls hoot late."])]
+    assert stored_texts(pipeline) == ["Cats purr loudly.", "Owls hoot late."]
+    # the kept row keeps its id, and the manifest only holds the stored rows
+    assert len(first_ids & set(pipeline.writer.rows)) == 1
+    assert set(pipeline.writer.manifest) == set(pipeline.writer.rows)
+
+
+def test_pipelined_batches_span_topics_and_write_in_order(pipeline, tmp_path):
+    topics = {
+        "1": ["Cats purr loudly.", "Dogs bark very often.", "Fish swim fast."],
+        "2": ["Owls hoot late tonight."],
+        "3": ["Bees buzz around.", "Ants march in lines."],
+    }
+    path = write_topics(tmp_path / "data.csv", topics)
+    pipeline.ingest_csv_pipelined(path, preprocess_workers=1, embed_batch_size=2)
+    # batches are filled across topic boundaries
+    assert [len(call) for call in pipeline.embedder.calls] == [2, 2, 2]
+    # but every topic is written once, whole and in input order
+    assert pipeline.writer.writes == list(topics.items())
+    # and every chunk is stored with its own embedding (its word count)
+    for row_id, (_, text) in pipeline.writer.rows.items():
+        assert pipeline.writer.embeddings[row_id][0] == len(text.split())
+
+    # topics without new chunks wait for the ones before them
+    topics["2"] = ["Owls hoot at dawn."]
+    write_topics(tmp_path / "data.csv", topics)
+    pipeline.writer.writes.clear()
+    pipeline.ingest_csv_pipelined(path, preprocess_workers=1, embed_batch_size=2)
+    assert pipeline.writer.writes == [
+        ("1", []),
+        ("2", ["Owls hoot at dawn."]),
+        ("3", []),
+    ]
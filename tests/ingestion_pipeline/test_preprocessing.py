@@ -0,0 +1,49 @@
+import pandas as pd
+import pytest
+
+from touche_rad.ingestion_pipeline import preprocessing
+
+
+@pytest.fixture
+def preprocessor(tokenizer):
+    tokenizer.special_tokens = 2
+    return preprocessing.TextPreprocessor(max_tokens=10)
+
+
+def test_token_lengths_are_batched_and_memoized(preprocessor):
+    tokenizer = preprocessor.tokenizer
+    assert preprocessor.get_token_lengths(["a b", "c", "a b"]) == [4, 3, 4]
+    assert tokenizer.calls == [["a b", "c"]]
+
+    assert preprocessor.get_token_length("c") == 3
+    assert preprocessor.get_token_lengths(["c", "d e f"]) == [3, 5]
+    assert tokenizer.calls[1:] == [["d e f"]]
+
+    preprocessor.clear_token_cache()
+    preprocessor.get_token_length("c")
+    assert tokenizer.calls[-1] == ["c"]
+
+
+def test_chunking_tokenizes_each_sentence_once(preprocessor):
+    sentences = ["one two three", "four five", "six seven eight nine", "ten"]
+    chunks = preprocessor.chunk_sentences(sentences)
+    assert chunks == ["one two three four five", "six seven eight nine ten"]
+    assert preprocessor.tokenizer.calls == [sentences]
+
+
+def test_split_sentences_matches_preprocess(preprocessor):
+    texts = pd.Series(
+        [
+            "First claim.  Second one!Third? fourth\nline",
+            None,
+            "\u00dcn\u00efcode & symbols... are dropped.   ",
+            "   ",
+        ],
+        index=[5, 6, 7, 8],
+    )
+    expected = [
+        preprocessor.preprocess(text) if isinstance(text, str) else [] for text in texts
+    ]
+    result = preprocessing.split_sentences(texts)
+    assert result.index.tolist() == [5, 6, 7, 8]
+    assert result.tolist() == expected
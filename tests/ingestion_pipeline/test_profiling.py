@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from touche_rad.ingestion_pipeline.profiling import histogram_summary, profile_dataset
+
+
+def test_histogram_summary():
+    # values 1, 1, 2, 5
+    summary = histogram_summary(np.array([0, 2, 1, 0, 0, 1]))
+    assert summary == {"mean": 2.25, "p50": 1, "p90": 5, "p99": 5, "max": 5}
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+def test_profile_dataset(tmp_path, tokenizer, suffix):
+    df = pd.DataFrame(
+        {
+            "id": ["1", "1", "2", "3"],
+            "topic": ["a", "a", "b", "c"],
+            "sentence": ["one two. three four five!", None, "one", "a b c d e f"],
+        }
+    )
+    path = str(tmp_path / f"data{suffix}")
+    if suffix == ".csv":
+        df.to_csv(path, index=False)
+    else:
+        df.to_parquet(path)
+
+    profile = profile_dataset(path, max_tokens=4, batch_rows=2)
+    assert profile["rows"] == 4
+    assert profile["rows_without_sentence"] == 1
+    assert profile["topics"] == 3
+    assert profile["chars_per_row"]["max"] == len("one two. three four five!")
+    assert profile["total_sentences"] == 4
+    assert profile["sentences_per_row"]["max"] == 2
+    assert profile["tokens_per_sentence"]["max"] == 6
+    assert profile["sentences_exceeding_limit"] == 1
@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+from touche_rad.ingestion_pipeline.sources import iter_topics
+
+ROWS = {
+    "id": ["1", "1", "1", "2", "3", "3"],
+    "topic": ["a", "a", "a", "b", "c", "c"],
+    "sentence": ["s1", None, "s2", "s3", "s4", "s5"],
+}
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+def test_iter_topics_across_batches(tmp_path, suffix):
+    path = str(tmp_path / f"data{suffix}")
+    df = pd.DataFrame(ROWS)
+    df["extra"] = 0
+    if suffix == ".csv":
+        df.to_csv(path, index=False)
+    else:
+        df.to_parquet(path)
+
+    topics = list(iter_topics(path, batch_rows=2))
+    assert topics == [
+        ("1", "a", ["s1", "s2"]),
+        ("2", "b", ["s3"]),
+        ("3", "c", ["s4", "s5"]),
+    ]
+
+
+def test_iter_topics_rejects_split_topics(tmp_path):
+    path = str(tmp_path / "data.csv")
+    pd.DataFrame({"id": [1, 2, 1], "topic": "t", "sentence": "s"}).to_csv(
+        path, index=False
+    )
+    with pytest.raises(ValueError, match="not contiguous"):
+        list(iter_topics(path))
+
+
+def test_iter_topics_missing_columns(tmp_path):
+    path = str(tmp_path / "data.csv")
+    pd.DataFrame({"id": [1], "text": ["s"]}).to_csv(path, index=False)
+    with pytest.raises(ValueError, match="Missing required columns"):
+        list(iter_topics(path))
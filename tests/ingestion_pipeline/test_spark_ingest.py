@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from touche_rad.ingestion_pipeline import spark_ingest
+from touche_rad.ingestion_pipeline.ingest import chunk_ids, content_hash
+
+
+@pytest.fixture(autouse=True)
+def executor_preprocessors(tokenizer, monkeypatch):
+    monkeypatch.setattr(spark_ingest, "_executor_preprocessors", {})
+
+
+def test_chunk_topic_keeps_input_order():
+    pdf = pd.DataFrame(
+        {
+            "id": ["7", "7"],
+            "topic": ["t", "t"],
+            "row_order": [2, 1],
+            "sentences": [np.array(["c d"]), np.array(["a b"])],
+        }
+    )
+    chunks = spark_ingest.chunk_topic(pdf, "model", max_tokens=384)
+    assert chunks["text"].tolist() == ["a b c d"]
+    assert chunks["id"].tolist() == chunk_ids(
+        "7", [content_hash("a b c d", "model", 384)]
+    )
+    assert chunks["topic_id"].tolist() == ["7"]
+    assert chunks["num_sentences"].tolist() == [1]
+
+
+def test_embed_partitions(monkeypatch):
+    class FakeEmbedder:
+        def embed_texts(self, texts, show_progress=True):
+            return np.arange(len(texts) * 2, dtype=np.float64).reshape(-1, 2)
+
+    monkeypatch.setattr(
+        spark_ingest, "_executor_embedder", lambda name, threads: FakeEmbedder()
+    )
+    batches = [pd.DataFrame({"text": ["a", "b"]}), pd.DataFrame({"text": ["c"]})]
+    out = list(spark_ingest.embed_partitions(iter(batches), "model"))
+    assert [len(pdf) for pdf in out] == [2, 1]
+    assert out[0]["embedding"][1].tolist() == [2.0, 3.0]
+    assert out[0]["embedding"][1].dtype == np.float32
@@ -0,0 +1,47 @@
+import pytest
+
+from touche_rad.ingestion_pipeline.stages import StagedPipeline
+
+
+def test_staged_pipeline_runs_all_items():
+    results = []
+
+    def square(items):
+        for item in items:
+            yield item * item
+
+    def batch(items):
+        pending = []
+        for item in items:
+            pending.append(item)
+            if len(pending) == 3:
+                yield pending
+                pending = []
+        if pending:
+            yield pending
+
+    def collect(batches):
+        for pending in batches:
+            results.extend(pending)
+            yield
+
+    StagedPipeline(maxsize=2).add_stage(square, workers=4).add_stage(batch).add_stage(
+        collect
+    ).run(range(20))
+    assert sorted(results) == [i * i for i in range(20)]
+
+
+def test_staged_pipeline_propagates_errors():
+    def fail(items):
+        for item in items:
+            if item == 5:
+                raise RuntimeError("boom")
+            yield item
+
+    def sink(items):
+        for _ in items:
+            yield
+
+    pipeline = StagedPipeline(maxsize=1).add_stage(fail, workers=2).add_stage(sink)
+    with pytest.raises(RuntimeError, match="boom"):
+        pipeline.run(range(1000))
@@ -0,0 +1,142 @@
+import struct
+import uuid
+
+import numpy as np
+import pytest
+
+from touche_rad.ingestion_pipeline.writer import (
+    PostgresCopyWriter,
+    embeddings_table_ddl,
+    encode_rows_binary,
+    encode_rows_text,
+    encode_vectors_binary,
+)
+
+ROW_ID = "12345678-1234-5678-1234-567812345678"
+
+
+def test_encode_vectors_binary_arrays():
+    embeddings = np.array([[1.5, -2.0]])
+    (float8,) = encode_vectors_binary(embeddings, "float8[]")
+    assert struct.unpack(">iiiii", float8[:20]) == (1, 0, 701, 2, 1)
+    assert struct.unpack(">idid", float8[20:]) == (8, 1.5, 8, -2.0)
+
+    (float4,) = encode_vectors_binary(embeddings, "float4[]")
+    assert struct.unpack(">iiiii", float4[:20]) == (1, 0, 700, 2, 1)
+    assert struct.unpack(">ifif", float4[20:]) == (4, 1.5, 4, -2.0)
+
+
+def test_encode_vectors_binary_pgvector():
+    (vector,) = encode_vectors_binary(np.array([[1.5, -2.0, 0.25]]), "vector")
+    assert struct.unpack(">hhfff", vector) == (3, 0, 1.5, -2.0, 0.25)
+
+
+def test_encode_rows_binary():
+    payload = encode_rows_binary(
+        [ROW_ID], np.array([[1.0, 2.0]]), ["a chunk"], ["7"], ["topic"], [2]
+    )
+    assert payload.startswith(b"PGCOPY\n\xff\r\n\x00")
+    assert payload.endswith(struct.pack(">h", -1))
+
+    offset = 19
+    (field_count,) = struct.unpack(">h", payload[offset : offset + 2])
+    assert field_count == 7
+    (id_len,) = struct.unpack(">i", payload[offset + 2 : offset + 6])
+    assert payload[offset + 6 : offset + 6 + id_len] == uuid.UUID(ROW_ID).bytes
+
+
+def test_encode_rows_text_escapes():
+    payload = encode_rows_text(
+        [ROW_ID], np.array([[1.0, 2.0]]), ["tab\there"], ["7"], [None], [1], "vector"
+    )
+    assert payload.decode() == f"{ROW_ID}\t[1.0,2.0]\ttab\\there\t7\t\\N\t1\tt\n"
+
+
+def test_embeddings_table_ddl():
+    assert "embedding FLOAT4[]" in embeddings_table_ddl(vector_type="float4[]")
+    with pytest.raises(ValueError):
+        embeddings_table_ddl(vector_type="float16")
+
+
+class FakeCursor:
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, sql, params=None):
+        self.statements.append((sql, params))
+
+    def copy_expert(self, sql, stream):
+        self.statements.append((sql, stream.read()))
+
+
+class FakeConnection:
+    def __init__(self):
+        self.cursor_ = FakeCursor()
+        self.events = []
+
+    def cursor(self):
+        return self.cursor_
+
+    def commit(self):
+        self.events.append("commit")
+
+    def rollback(self):
+        self.events.append("rollback")
+
+    def close(self):
+        self.events.append("close")
+
+
+class FakeEngine:
+    def __init__(self):
+        self.connection = FakeConnection()
+
+    def raw_connection(self):
+        return self.connection
+
+
+def test_write_topic_commits_rows_with_progress_marker():
+    engine = FakeEngine()
+    writer = PostgresCopyWriter(engine, batch_rows=1)
+    written = writer.write_topic(
+        "data.csv",
+        "7",
+        "topic",
+        ids=[ROW_ID, str(uuid.uuid4())],
+        embeddings=np.ones((2, 3)),
+        texts=["a", "b"],
+        num_sentences=[1, 1],
+    )
+    assert written == 2
+
+    statements = [sql for sql, _ in engine.connection.cursor_.statements]
+    assert statements[0].startswith("DELETE FROM embeddings")
+    assert sum(sql.startswith("COPY embeddings") for sql in statements) == 2
+    assert not any("embedding_manifest (" in sql for sql in statements)
+    assert statements[-1].startswith("INSERT INTO ingestion_progress")
+    assert engine.connection.cursor_.statements[-1][1] == ("data.csv", "7", 2)
+    # rows and marker are committed once, together
+    assert engine.connection.events == ["commit", "close"]
+
+
+def test_write_topic_updates_manifest():
+    engine = FakeEngine()
+    writer = PostgresCopyWriter(engine)
+    writer.write_topic(
+        "data.csv",
+        "7",
+        "topic",
+        ids=[ROW_ID],
+        embeddings=np.ones((1, 3)),
+        texts=["a"],
+        num_sentences=[1],
+        hashes=["abc"],
+        stale_ids={"stale"},
+        num_rows=3,
+    )
+    statements = engine.connection.cursor_.statements
+    deletes = [params for sql, params in statements if sql.startswith("DELETE")]
+    assert deletes == [([ROW_ID, "stale"],)] * 2
+    (manifest,) = [p for sql, p in statements if "INTO embedding_manifest" in sql]
+    assert manifest == ([ROW_ID], "data.csv", "7", ["abc"])
+    assert statements[-1][1] == ("data.csv", "7", 3)
@@ -0,0 +1,122 @@
+import asyncio
+import os
+import time
+
+import httpx
+import numpy as np
+import pytest
+
+os.environ.setdefault("OPENROUTER_API_KEY", "test")
+import app  # noqa: E402
+from touche_rad.ai.evidence_store import (  # noqa: E402
+    EvidenceStore,
+    PrecomputedRetriever,
+)
+
+
+class FakeCompletion:
+    def __init__(self, content):
+        self.choices = [
+            type("Choice", (), {"message": type("M", (), {"content": content})})
+        ]
+
+    def to_dict(self):
+        return {}
+
+
+class FakeCompletions:
+    """Async chat completions that take `delay` seconds each."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.calls = []
+
+    async def create(self, model, messages):
+        self.calls.append(messages)
+        await asyncio.sleep(self.delay)
+        return FakeCompletion("counter-argument")
+
+
+class FakeRetriever:
+    def __init__(self):
+        self.queries = []
+
+    async def aretrieve(self, query, mode="text", k=10, **kwargs):
+        self.queries.append((query, kwargs))
+        return [{"id": "1", "topic": "t", "text": f"evidence for {query}"}]
+
+
+@pytest.fixture
+def fake_app(monkeypatch):
+    completions = FakeCompletions(delay=0.2)
+    fake_client = type("Client", (), {"chat": type("Chat", (), {})()})()
+    fake_client.chat.completions = completions
+    monkeypatch.setattr(app, "async_client", fake_client)
+    monkeypatch.setattr(app, "retriever", FakeRetriever())
+    monkeypatch.setattr(app, "evidence_cache", app.EvidenceCache())
+    return app
+
+
+def genirsim_request(opening):
+    """The body GenIRSim's BasicChatSystem sends: only the messages."""
+    return {
+        "messages": [
+            {"role": "user", "content": opening},
+            {"role": "assistant", "content": "It does, the sweetness balances salt."},
+            {"role": "user", "content": "But fruit does not belong on pizza."},
+        ]
+    }
+
+
+async def post_concurrently(bodies):
+    transport = httpx.ASGITransport(app=app.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        return await asyncio.gather(
+            *(c.post("/respond/gpt-4o", json=body) for body in bodies)
+        )
+
+
+def test_respond_does_not_block_event_loop(fake_app):
+    bodies = [genirsim_request(f"Opening {i}") for i in range(4)]
+    start = time.perf_counter()
+    responses = asyncio.run(post_concurrently(bodies))
+    elapsed = time.perf_counter() - start
+    assert all(r.status_code == 200 for r in responses)
+    assert responses[0].json()["content"] == "counter-argument"
+    # four 0.2 s completions overlap instead of running one after another
+    assert elapsed < 0.6
+
+
+class LiveRetriever:
+    """Stands in for Elasticsearch behind a PrecomputedRetriever."""
+
+    def __init__(self):
+        self.live_queries = []
+
+    def get_query_embedding(self, query):
+        return np.array([float("pineapple" in query.lower()), 0.1])
+
+    async def aretrieve(self, query, mode="text", k=10, **kwargs):
+        self.live_queries.append(query)
+        return []
+
+
+def test_respond_serves_precomputed_evidence(fake_app, tmp_path, monkeypatch):
+    topic = "Does pineapple belong on pizza?"
+    store = EvidenceStore(str(tmp_path / "evidence.duckdb"))
+    evidence = [
+        {"id": str(i), "topic": topic, "text": f"stored {i}"} for i in range(10)
+    ]
+    store.put_many([(topic, "text", 10, evidence)])
+    store.put_embeddings([topic], [[1.0, 0.0]])
+    live = LiveRetriever()
+    monkeypatch.setattr(app, "retriever", PrecomputedRetriever(live, store))
+
+    # only the messages, as GenIRSim sends them, and with the topic passed through
+    with_topic = dict(genirsim_request("Hello there"), topic=topic)
+    bodies = [genirsim_request("Pineapple on pizza is delicious."), with_topic]
+    responses = asyncio.run(post_concurrently(bodies))
+    assert all(r.status_code == 200 for r in responses)
+    assert live.live_queries == []
+    for response in responses:
+        assert response.json()["arguments"][0]["text"] == "stored 0"
@@ -0,0 +1,52 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from touche_rad import debate_service
+from touche_rad.core.sessions import SessionStore
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        debate_service, "store", SessionStore(snapshot_dir=str(tmp_path))
+    )
+    with TestClient(debate_service.app) as client:
+        yield client
+
+
+def test_debate_round_trip(client):
+    debate = client.post("/debates").json()
+    debate_id = debate["debate_id"]
+    assert debate["state"] == "user_turn"
+
+    reply = client.post(f"/debates/{debate_id}/messages", json={"content": "A claim"})
+    assert reply.status_code == 200
+    assert reply.json()["current_turn"] == 1
+    assert reply.json()["response"]
+
+    debate = client.get(f"/debates/{debate_id}").json()
+    assert debate["conversation"][0] == "A claim"
+    assert client.get("/stats").json()["sessions"] == 1
+
+    assert client.delete(f"/debates/{debate_id}").status_code == 200
+    assert client.get(f"/debates/{debate_id}").status_code == 404
+
+
+def test_unknown_debate(client):
+    response = client.post("/debates/nope/messages", json={"content": "hi"})
+    assert response.status_code == 404
+
+
+def test_debate_with_topic(client):
+    debate = client.post("/debates", json={"topic": "Pizza"}).json()
+    assert debate["topic"] == "Pizza"
+    assert client.get(f"/debates/{debate['debate_id']}").json()["topic"] == "Pizza"
+
+
+def test_token_budget_from_environment(monkeypatch):
+    monkeypatch.delenv("DEBATE_TOKEN_BUDGET", raising=False)
+    assert debate_service.create_store().token_budget == 4096
+    monkeypatch.setenv("DEBATE_TOKEN_BUDGET", "1000")
+    assert debate_service.create_store().token_budget == 1000
+    monkeypatch.setenv("DEBATE_TOKEN_BUDGET", "0")
+    assert debate_service.create_store().token_budget is None
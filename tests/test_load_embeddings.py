@@ -0,0 +1,48 @@
+import chromadb
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from touche_rad import load_embeddings as loader
+
+
+def write_part(path, ids, dim=3):
+    pd.DataFrame(
+        {
+            "id": ids,
+            "embedding": [np.full(dim, i, dtype=np.float32) for i in range(len(ids))],
+            "text": [f"text {i}" for i in ids],
+            "topic_id": "7",
+            "topic": "topic",
+            "num_sentences": 1,
+        }
+    ).to_parquet(path)
+
+
+def test_embeddings_to_numpy():
+    column = pa.chunked_array([[[1.0, 2.0]], [[3.0, 4.0], [5.0, 6.0]]])
+    array = loader.embeddings_to_numpy(column)
+    assert array.dtype == np.float32
+    assert array.tolist() == [[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]]
+
+
+def test_load_embeddings_skips_existing_ids(tmp_path):
+    write_part(tmp_path / "part-0.parquet", ["a", "b", "c"])
+    write_part(tmp_path / "part-1.parquet", ["d", "e"])
+    client = chromadb.EphemeralClient()
+    name = "test-load-embeddings"
+
+    assert loader.load_embeddings(str(tmp_path), client, name, batch_size=2) == 5
+    write_part(tmp_path / "part-2.parquet", ["e", "f"])
+    assert loader.load_embeddings(str(tmp_path), client, name, read_workers=2) == 1
+
+    collection = client.get_collection(name)
+    assert collection.count() == 6
+    row = collection.get(ids=["b"], include=["embeddings", "metadatas"])
+    assert row["embeddings"][0].tolist() == [1.0, 1.0, 1.0]
+    assert row["metadatas"][0] == {
+        "topic_id": "7",
+        "topic": "topic",
+        "is_chunk": True,
+        "num_sentences": 1,
+    }
@@ -1,9 +1,9 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from enum import Enum
-from typing import List
+from typing import List, Tuple
 
-from touche_rad.core.context import DebateContext
+from touche_rad.core.context import ContextSnapshot, DebateContext
 
 
 class ChatResourceEnum(str, Enum):
@@ -58,9 +58,30 @@ class EvaluationClient(ABC):
     Base class to be used for utterance evaluations
     """
 
+    # whether `evaluate_batch` scores several utterances in one request, in
+    # which case a debate holds back a user utterance to send it with the reply
+    supports_batch: bool = False
+
     @abstractmethod
     def evaluate(self, ctx: "DebateContext", role: str, utterance: str):
         """
         Evaluate an utterance based on the given context
         """
         pass
+
+    def evaluate_batch(self, ctx: "DebateContext", utterances: List[Tuple[str, str]]):
+        """
+        Evaluate consecutive (role, utterance) pairs, each following the
+        conversation and the utterances before it. Clients that can score
+        several utterances in one request should override this and set
+        `supports_batch`.
+        """
+        results = []
+        for role, utterance in utterances:
+            results.append(self.evaluate(ctx=ctx, role=role, utterance=utterance))
+            ctx = ContextSnapshot(
+                debate_id=ctx.debate_id,
+                user_claim=ctx.user_claim or utterance,
+                conversation=tuple(ctx.conversation_window()) + (utterance,),
+            )
+        return results
@@ -1,41 +1,140 @@
-from typing import List, Dict, Any
-from elasticsearch import Elasticsearch
+import asyncio
+import functools
+import threading
+from typing import List, Dict, Any, Optional
+from elasticsearch import AsyncElasticsearch, Elasticsearch
 from sentence_transformers import SentenceTransformer
 
 import torch
 
+from .registry import get_sentence_transformer, release, sentence_transformer_key
+
+EMBEDDING_MODEL_NAME = "dunzhang/stella_en_400M_v5"
+DEFAULT_ES_URL = "https://touche25-rad.webis.de/arguments/"
+DEFAULT_INDEX_NAME = "claimrev"
+
+RETRIEVAL_FIELDS = {
+    "text": "text_embedding_stella",
+    "support": "supports_embedding_stella",
+    "attack": "attacks_embedding_stella",
+}
+
+
+def build_knn_filter(filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Turn {field: value} metadata filters into kNN pre-filter clauses.
+
+    A list value matches any of its elements, e.g. {"stance": ["pro", "con"]}.
+    """
+    clauses = []
+    for field, value in filters.items():
+        if isinstance(value, (list, tuple, set)):
+            clauses.append({"terms": {field: list(value)}})
+        else:
+            clauses.append({"term": {field: value}})
+    return clauses
+
 
 class ElasticsearchRetriever:
     def __init__(
         self,
-        es_url: str = "https://touche25-rad.webis.de/arguments/",
-        index_name: str = "claimrev",
+        es_url: str = DEFAULT_ES_URL,
+        index_name: str = DEFAULT_INDEX_NAME,
+        connections_per_node: int = 32,
+        request_timeout: float = 10.0,
+        http_compress: bool = True,
     ):
-        self.es_client = Elasticsearch(
-            es_url,
-            retry_on_timeout=True,
-        )
+        """Initialize the retriever.
+
+        Args:
+            es_url: URL of the Elasticsearch cluster
+            index_name: Name of the index holding the argument embeddings
+            connections_per_node: Size of the HTTP connection pool per node
+            request_timeout: Default timeout in seconds for each search request
+            http_compress: Whether to gzip request and response bodies
+        """
+        self.es_url = es_url
         self.index_name = index_name
+        self.request_timeout = request_timeout
+        # the same pool settings are used for the sync and async clients
+        self._client_kwargs = {
+            "retry_on_timeout": True,
+            "connections_per_node": connections_per_node,
+            "request_timeout": request_timeout,
+            "http_compress": http_compress,
+        }
+        self.es_client = Elasticsearch(es_url, **self._client_kwargs)
+        self._aes_client: Optional[AsyncElasticsearch] = None
+        self._embedding_model: Optional[SentenceTransformer] = None
+        self._embedding_device: Optional[str] = None
+        # concurrent first queries must take a single registry reference
+        self._embedding_lock = threading.Lock()
 
+    @property
+    def embedding_model(self) -> SentenceTransformer:
+        """The stella query encoder, loaded once per process through the registry
+        and referenced until `close` or `aclose`."""
+        with self._embedding_lock:
+            if self._embedding_model is None:
+                self._embedding_model = self._load_embedding_model()
+            return self._embedding_model
+
+    def _load_embedding_model(self) -> SentenceTransformer:
         if torch.cuda.is_available():
-            self.embedding_model = SentenceTransformer(
-                "dunzhang/stella_en_400M_v5", trust_remote_code=True
-            )
-        else:
-            self.embedding_model = SentenceTransformer(
-                "dunzhang/stella_en_400M_v5",
-                trust_remote_code=True,
-                device="cpu",
-                config_kwargs={
-                    "use_memory_efficient_attention": False,
-                    "unpad_inputs": False,
-                },
+            self._embedding_device = "cuda"
+            return get_sentence_transformer(
+                EMBEDDING_MODEL_NAME, device="cuda", trust_remote_code=True
             )
+        self._embedding_device = "cpu"
+        return get_sentence_transformer(
+            EMBEDDING_MODEL_NAME,
+            device="cpu",
+            trust_remote_code=True,
+            config_kwargs={
+                "use_memory_efficient_attention": False,
+                "unpad_inputs": False,
+            },
+        )
+
+    @property
+    def aes_client(self) -> AsyncElasticsearch:
+        """The async client, created on first use so it binds to the running loop."""
+        if self._aes_client is None:
+            self._aes_client = AsyncElasticsearch(self.es_url, **self._client_kwargs)
+        return self._aes_client
+
+    def _release_embedding_model(self):
+        with self._embedding_lock:
+            if self._embedding_model is not None:
+                release(
+                    sentence_transformer_key(
+                        EMBEDDING_MODEL_NAME, self._embedding_device
+                    )
+                )
+                self._embedding_model = None
+
+    def close(self):
+        """Close the sync client and give the encoder back to the registry."""
+        self.es_client.close()
+        self._release_embedding_model()
+
+    async def aclose(self):
+        """Close the async client, release its connection pool and give the
+        encoder back to the registry."""
+        if self._aes_client is not None:
+            await self._aes_client.close()
+            self._aes_client = None
+        self._release_embedding_model()
 
     def get_query_embedding(self, query: str):
         # get embedding for query using HuggingFace's sentence-transformers
         return self.embedding_model.encode(query, prompt_name="s2p_query")
 
+    def get_query_embeddings(self, queries: List[str], batch_size: int = 32):
+        # batch-encode many queries at once, e.g. when precomputing evidence
+        return self.embedding_model.encode(
+            queries, prompt_name="s2p_query", batch_size=batch_size
+        )
+
     def clean_hit(self, hit: dict, rank=1) -> dict:
         # remove embedding vectors from hit for display purposes
         source = hit["_source"].copy()
@@ -52,29 +151,122 @@ class ElasticsearchRetriever:
                 del source[field]
         return source
 
-    def retrieve(
-        self, query: str, mode: str = "text", k: int = 10, num_candidates: int = 100
-    ) -> List[Dict[str, Any]]:
-        # retrieve arguments from Elasticsearch using the specified mode
-        query_embedding = self.get_query_embedding(query)
-        if mode == "text":
-            field = "text_embedding_stella"
-        elif mode == "support":
-            field = "supports_embedding_stella"
-        elif mode == "attack":
-            field = "attacks_embedding_stella"
-        else:
+    def get_embedding_field(self, mode: str) -> str:
+        # map the retrieval mode onto the embedding field that is searched
+        if mode not in RETRIEVAL_FIELDS:
             raise ValueError(f"Unknown retrieval mode: {mode}")
+        return RETRIEVAL_FIELDS[mode]
 
-        resp = self.es_client.search(
-            index=self.index_name,
-            knn={
-                "field": field,
-                "query_vector": query_embedding,
-                "k": k,
-                "num_candidates": num_candidates,
-            },
-        )
+    def _search_kwargs(
+        self,
+        query_embedding,
+        field: str,
+        k: int,
+        num_candidates: int,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        knn = {
+            "field": field,
+            "query_vector": query_embedding,
+            "k": k,
+            "num_candidates": num_candidates,
+        }
+        if filters:
+            # applied during the graph search, so all k hits match the filter
+            knn["filter"] = build_knn_filter(filters)
+        return {
+            "index": self.index_name,
+            # hits default to 10, so ask for all k neighbours explicitly
+            "size": k,
+            "knn": knn,
+        }
+
+    def _clean_response(self, resp) -> List[Dict[str, Any]]:
         return [
             self.clean_hit(hit, i + 1) for i, hit in enumerate(resp["hits"]["hits"])
         ]
+
+    def retrieve(
+        self,
+        query: str,
+        mode: str = "text",
+        k: int = 10,
+        num_candidates: int = 100,
+        request_timeout: Optional[float] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        query_embedding=None,
+    ) -> List[Dict[str, Any]]:
+        # retrieve arguments from Elasticsearch using the specified mode,
+        # encoding the query unless its embedding is given
+        field = self.get_embedding_field(mode)
+        if query_embedding is None:
+            query_embedding = self.get_query_embedding(query)
+        resp = self.es_client.options(
+            request_timeout=request_timeout or self.request_timeout
+        ).search(
+            **self._search_kwargs(query_embedding, field, k, num_candidates, filters)
+        )
+        return self._clean_response(resp)
+
+    def search_embeddings(
+        self,
+        query_embeddings,
+        mode: str = "text",
+        k: int = 10,
+        num_candidates: int = 100,
+        batch_size: int = 64,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """Run one kNN search per query embedding, batched through msearch."""
+        field = self.get_embedding_field(mode)
+        results = []
+        for i in range(0, len(query_embeddings), batch_size):
+            searches = []
+            for query_embedding in query_embeddings[i : i + batch_size]:
+                body = self._search_kwargs(
+                    query_embedding, field, k, num_candidates, filters
+                )
+                searches.append({"index": body.pop("index")})
+                searches.append(body)
+            resp = self.es_client.msearch(searches=searches)
+            for item in resp["responses"]:
+                if "error" in item:
+                    raise RuntimeError(f"Elasticsearch search failed: {item['error']}")
+                results.append(self._clean_response(item))
+        return results
+
+    async def aretrieve(
+        self,
+        query: str,
+        mode: str = "text",
+        k: int = 10,
+        num_candidates: int = 100,
+        request_timeout: Optional[float] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        query_embedding=None,
+    ) -> List[Dict[str, Any]]:
+        """Async variant of `retrieve`.
+
+        `filters` maps metadata fields such as topic or stance to a value, or a
+        list of accepted values, and restricts the kNN candidates to matches.
+
+        The query is encoded in a worker thread and the kNN search goes through
+        the pooled async client, so concurrent callers overlap their round trips.
+        """
+        field = self.get_embedding_field(mode)
+        if query_embedding is None:
+            query_embedding = await asyncio.to_thread(self.get_query_embedding, query)
+        resp = await self.aes_client.options(
+            request_timeout=request_timeout or self.request_timeout
+        ).search(
+            **self._search_kwargs(query_embedding, field, k, num_candidates, filters)
+        )
+        return self._clean_response(resp)
+
+
+@functools.lru_cache(maxsize=None)
+def get_shared_retriever(
+    es_url: str = DEFAULT_ES_URL, index_name: str = DEFAULT_INDEX_NAME
+) -> ElasticsearchRetriever:
+    """Return a process-wide retriever so clients and models are built only once."""
+    return ElasticsearchRetriever(es_url=es_url, index_name=index_name)
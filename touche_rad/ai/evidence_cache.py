@@ -0,0 +1,95 @@
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import cachetools
+
+Evidence = List[Dict[str, Any]]
+
+
+def merge_evidence(
+    first: Evidence, second: Evidence, max_size: Optional[int] = None
+) -> Evidence:
+    """Merge two evidence lists, dropping arguments that were already seen.
+
+    Arguments are deduplicated by their `id`, with `first` taking precedence,
+    and the ranks in `key` are renumbered to match the merged order.
+    """
+    merged = []
+    seen = set()
+    for item in list(first) + list(second):
+        if item["id"] in seen:
+            continue
+        seen.add(item["id"])
+        merged.append({**item, "key": len(merged) + 1})
+    if max_size is not None:
+        merged = merged[:max_size]
+    return merged
+
+
+@dataclass
+class EvidenceBundle:
+    """Evidence gathered so far for one conversation."""
+
+    evidence: Evidence = field(default_factory=list)
+    queries: set = field(default_factory=set)
+
+
+class EvidenceCache:
+    """
+    Per-conversation evidence cache keyed by the opening message of a debate.
+
+    In the default mode the evidence for the opening message is retrieved once
+    and reused on every later turn. In incremental mode only the newest user
+    turn is retrieved and merged into the evidence collected so far.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float = 60 * 60,
+        max_evidence: Optional[int] = 20,
+    ):
+        self._cache = cachetools.TTLCache(maxsize=maxsize, ttl=ttl)
+        self.max_evidence = max_evidence
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def get(self, opening: str) -> Optional[EvidenceBundle]:
+        return self._cache.get(opening)
+
+    async def aget_evidence(
+        self,
+        opening: str,
+        retrieve: Callable[[str], Awaitable[Evidence]],
+        latest: Optional[str] = None,
+        incremental: bool = False,
+    ) -> Evidence:
+        """Return the evidence for a conversation, retrieving only what is missing.
+
+        Args:
+            opening: The first message of the conversation, used as the cache key
+            retrieve: Coroutine function that retrieves evidence for a query
+            latest: The newest user turn, only used in incremental mode
+            incremental: Whether to retrieve and merge evidence for new user turns
+        """
+        bundle = self._cache.get(opening)
+        if bundle is None:
+            bundle = EvidenceBundle()
+
+        queries = [opening]
+        if incremental and latest:
+            queries.append(latest)
+
+        for query in queries:
+            if query in bundle.queries:
+                continue
+            # evidence for the newest turn goes first so it survives the cap
+            bundle.evidence = merge_evidence(
+                await retrieve(query), bundle.evidence, self.max_evidence
+            )
+            bundle.queries.add(query)
+
+        # re-insert so the entry's ttl is refreshed while the debate is active
+        self._cache[opening] = bundle
+        return bundle.evidence
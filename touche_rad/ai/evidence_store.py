@@ -0,0 +1,286 @@
+import asyncio
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import duckdb
+import numpy as np
+
+from .elasticsearch_retriever import RETRIEVAL_FIELDS
+
+Evidence = List[Dict[str, Any]]
+
+# cosine similarity above which an utterance is taken to be about a topic
+DEFAULT_MATCH_THRESHOLD = 0.6
+
+
+def load_dataset_queries(path: str) -> List[str]:
+    """Collect topic descriptions and user claims from a dataset file.
+
+    Accepts a GenIRSim configuration such as `sample-config.json`, a JSON list
+    of configurations or topics, or a JSON-lines file of either. Every
+    `topic.description` and every `claim` value found is returned once, in the
+    order it first appears.
+    """
+    text = Path(path).read_text()
+    try:
+        documents = [json.loads(text)]
+    except json.JSONDecodeError:
+        documents = [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    queries = []
+
+    def walk(node, parent_key=None):
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if isinstance(value, str) and (
+                    key == "claim" or (key == "description" and parent_key == "topic")
+                ):
+                    queries.append(value)
+                else:
+                    walk(value, key)
+        elif isinstance(node, list):
+            for value in node:
+                walk(value, parent_key)
+
+    walk(documents)
+    return list(dict.fromkeys(q.strip() for q in queries if q.strip()))
+
+
+class EvidenceStore:
+    """
+    Local table of precomputed evidence bundles, keyed by query and mode.
+
+    Bundles are persisted in a DuckDB file and held in memory once loaded, so
+    a lookup at debate time is a dictionary access. The query embeddings are
+    kept as well, so that text that is not a stored query verbatim, such as
+    a simulated user's opening utterance, can be matched to the closest
+    stored topic.
+    """
+
+    def __init__(self, path: str = "evidence.duckdb"):
+        self.path = path
+        self._bundles: Dict[Tuple[str, str], Tuple[int, Evidence]] = {}
+        self._queries: List[str] = []
+        self._matrix: Optional[np.ndarray] = None
+        with duckdb.connect(path) as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS evidence (
+                    query TEXT,
+                    mode TEXT,
+                    k INTEGER,
+                    evidence JSON,
+                    PRIMARY KEY (query, mode)
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS query_embeddings (
+                    query TEXT PRIMARY KEY,
+                    embedding FLOAT[]
+                )
+                """
+            )
+            rows = conn.execute("SELECT query, mode, k, evidence FROM evidence")
+            for query, mode, k, evidence in rows.fetchall():
+                self._bundles[(query, mode)] = (k, json.loads(evidence))
+            rows = conn.execute("SELECT query, embedding FROM query_embeddings")
+            self._set_embeddings(rows.fetchall())
+
+    def __len__(self) -> int:
+        return len(self._bundles)
+
+    def _set_embeddings(self, rows: List[Tuple[str, List[float]]]):
+        if not rows:
+            return
+        self._queries = [query for query, _ in rows]
+        matrix = np.asarray([embedding for _, embedding in rows], dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        self._matrix = matrix / np.maximum(norms, 1e-12)
+
+    @property
+    def has_embeddings(self) -> bool:
+        return self._matrix is not None
+
+    def get(self, query: str, mode: str = "text", k: int = 10) -> Optional[Evidence]:
+        """Return the top-k stored evidence, or None if it was not precomputed."""
+        bundle = self._bundles.get((query.strip(), mode))
+        if bundle is None or bundle[0] < k:
+            return None
+        return bundle[1][:k]
+
+    def match(
+        self, embedding, threshold: float = DEFAULT_MATCH_THRESHOLD
+    ) -> Optional[str]:
+        """The stored query most similar to `embedding`, if its cosine
+        similarity reaches `threshold`."""
+        if self._matrix is None:
+            return None
+        embedding = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        scores = self._matrix @ (embedding / max(np.linalg.norm(embedding), 1e-12))
+        best = int(np.argmax(scores))
+        return self._queries[best] if scores[best] >= threshold else None
+
+    def put_many(self, rows: Iterable[Tuple[str, str, int, Evidence]]):
+        """Insert or replace (query, mode, k, evidence) bundles."""
+        rows = [(query.strip(), mode, k, evidence) for query, mode, k, evidence in rows]
+        with duckdb.connect(self.path) as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO evidence VALUES (?, ?, ?, ?)",
+                [(q, m, k, json.dumps(e)) for q, m, k, e in rows],
+            )
+        for query, mode, k, evidence in rows:
+            self._bundles[(query, mode)] = (k, evidence)
+
+    def put_embeddings(self, queries: List[str], embeddings):
+        """Insert or replace the embeddings used to match text to queries."""
+        rows = [
+            (query.strip(), np.asarray(e, dtype=np.float32).tolist())
+            for query, e in zip(queries, embeddings)
+        ]
+        with duckdb.connect(self.path) as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO query_embeddings VALUES (?, ?)", rows
+            )
+            rows = conn.execute("SELECT query, embedding FROM query_embeddings")
+            self._set_embeddings(rows.fetchall())
+
+
+def precompute_evidence(
+    retriever,
+    queries: List[str],
+    store: EvidenceStore,
+    modes: Iterable[str] = tuple(RETRIEVAL_FIELDS),
+    k: int = 10,
+    num_candidates: int = 100,
+    batch_size: int = 32,
+) -> int:
+    """Batch-encode the queries once and store the evidence for every mode.
+
+    Returns the number of bundles written.
+    """
+    if not queries:
+        return 0
+    embeddings = retriever.get_query_embeddings(queries, batch_size=batch_size)
+    rows = []
+    for mode in modes:
+        results = retriever.search_embeddings(
+            embeddings, mode=mode, k=k, num_candidates=num_candidates
+        )
+        rows.extend(
+            (query, mode, k, evidence) for query, evidence in zip(queries, results)
+        )
+    store.put_many(rows)
+    store.put_embeddings(queries, embeddings)
+    return len(rows)
+
+
+class PrecomputedRetriever:
+    """
+    Retriever that serves evidence from an EvidenceStore and falls back to the
+    wrapped retriever for queries that were not precomputed.
+
+    Evidence is looked up by `topic` when the caller knows it. Otherwise the
+    query is looked up verbatim and then matched to the most similar stored
+    topic, which costs one query encoding but no search; the embedding is
+    reused if the search has to go live after all. Bundles are stored
+    unfiltered, so filtered searches go live, except for a filter on
+    `topic_field` alone, which the bundle of that topic answers.
+    """
+
+    def __init__(
+        self,
+        retriever,
+        store: EvidenceStore,
+        match_threshold: float = DEFAULT_MATCH_THRESHOLD,
+        topic_field: str = "topic",
+    ):
+        self.retriever = retriever
+        self.store = store
+        self.match_threshold = match_threshold
+        self.topic_field = topic_field
+
+    def _filtered_topic(self, filters) -> Optional[str]:
+        """The topic a filter restricts retrieval to, if that is all it does."""
+        if filters and list(filters) == [self.topic_field]:
+            topic = filters[self.topic_field]
+            if isinstance(topic, str):
+                return topic
+        return None
+
+    def _stored(self, query: str, mode: str, k: int, topic: Optional[str]):
+        return self.store.get(topic or query, mode, k)
+
+    def _matched(self, embedding, mode: str, k: int) -> Optional[Evidence]:
+        matched = self.store.match(embedding, self.match_threshold)
+        return None if matched is None else self.store.get(matched, mode, k)
+
+    def retrieve(
+        self,
+        query: str,
+        mode: str = "text",
+        k: int = 10,
+        topic: Optional[str] = None,
+        **kwargs,
+    ):
+        filters = kwargs.get("filters")
+        if filters:
+            topic = self._filtered_topic(filters)
+        if topic or not filters:
+            evidence = self._stored(query, mode, k, topic)
+            if evidence is not None:
+                return evidence
+            if topic is None and self.store.has_embeddings:
+                embedding = self.retriever.get_query_embedding(query)
+                evidence = self._matched(embedding, mode, k)
+                if evidence is not None:
+                    return evidence
+                kwargs["query_embedding"] = embedding
+        return self.retriever.retrieve(query, mode=mode, k=k, **kwargs)
+
+    async def aretrieve(
+        self,
+        query: str,
+        mode: str = "text",
+        k: int = 10,
+        topic: Optional[str] = None,
+        **kwargs,
+    ):
+        filters = kwargs.get("filters")
+        if filters:
+            topic = self._filtered_topic(filters)
+        if topic or not filters:
+            evidence = self._stored(query, mode, k, topic)
+            if evidence is not None:
+                return evidence
+            if topic is None and self.store.has_embeddings:
+                embedding = await asyncio.to_thread(
+                    self.retriever.get_query_embedding, query
+                )
+                evidence = self._matched(embedding, mode, k)
+                if evidence is not None:
+                    return evidence
+                kwargs["query_embedding"] = embedding
+        return await self.retriever.aretrieve(query, mode=mode, k=k, **kwargs)
+
+    async def aclose(self):
+        await self.retriever.aclose()
+
+
+def with_evidence_store(
+    retriever, path: Optional[str] = None, match_threshold: Optional[float] = None
+):
+    """Wrap a retriever with the store at `path` or `$EVIDENCE_STORE_PATH`, if
+    set, matching text to topics above `match_threshold` or
+    `$EVIDENCE_MATCH_THRESHOLD`."""
+    path = path or os.environ.get("EVIDENCE_STORE_PATH")
+    if not path:
+        return retriever
+    if match_threshold is None:
+        match_threshold = float(
+            os.environ.get("EVIDENCE_MATCH_THRESHOLD", DEFAULT_MATCH_THRESHOLD)
+        )
+    return PrecomputedRetriever(retriever, EvidenceStore(path), match_threshold)
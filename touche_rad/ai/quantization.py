@@ -0,0 +1,264 @@
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from touche_rad.ai.vector_index import (
+    MetadataColumns,
+    normalize,
+    rows_nbytes,
+    top_k_indices,
+)
+
+METHODS = ("int8", "binary")
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def fit_int8(embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-dimension offset and step that map the value range onto 256 levels."""
+    lo = embeddings.min(axis=0).astype(np.float32)
+    step = (embeddings.max(axis=0) - lo).astype(np.float32) / 255
+    step[step == 0] = 1.0
+    return lo, step
+
+
+def quantize_int8(
+    embeddings: np.ndarray, lo: np.ndarray, step: np.ndarray
+) -> np.ndarray:
+    levels = np.rint((embeddings - lo) / step)
+    return (np.clip(levels, 0, 255) - 128).astype(np.int8)
+
+
+def quantize_binary(embeddings: np.ndarray) -> np.ndarray:
+    """One sign bit per dimension, packed into bytes."""
+    return np.packbits(embeddings > 0, axis=1)
+
+
+def hamming_distances(codes: np.ndarray, query_code: np.ndarray) -> np.ndarray:
+    return _POPCOUNT[np.bitwise_xor(codes, query_code)].sum(axis=1, dtype=np.int32)
+
+
+class DiskTexts:
+    """
+    Strings in one memory-mapped UTF-8 file with an array of their offsets,
+    so that only the texts that are read are paged in.
+    """
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return bytes(self.data[self.offsets[i] : self.offsets[i + 1]]).decode("utf-8")
+
+    @staticmethod
+    def write(texts: List[Optional[str]], path: str):
+        """Write `texts` to the directory `path`; missing texts become empty."""
+        encoded = [t.encode("utf-8") if isinstance(t, str) else b"" for t in texts]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        with open(os.path.join(path, "texts.bin"), "wb") as f:
+            f.write(b"".join(encoded))
+        np.save(os.path.join(path, "text_offsets.npy"), offsets)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["DiskTexts"]:
+        """The texts written to `path`, or None if there are none."""
+        offsets_path = os.path.join(path, "text_offsets.npy")
+        if not os.path.exists(offsets_path):
+            return None
+        offsets = np.load(offsets_path, mmap_mode="r")
+        # an empty file cannot be memory-mapped
+        data = (
+            np.memmap(os.path.join(path, "texts.bin"), dtype=np.uint8, mode="r")
+            if offsets[-1]
+            else np.empty(0, dtype=np.uint8)
+        )
+        return cls(data, offsets)
+
+
+class QuantizedVectorIndex:
+    """
+    Cosine-similarity index that keeps only compact codes in memory.
+
+    A search ranks every vector by its int8 or binary code, then rescores the
+    best `num_candidates` with the full float32 vectors, which stay on disk
+    in a memory-mapped file and are only paged in for those candidates.
+    `int8` codes take a quarter of the float32 memory, `binary` codes a
+    thirty-second. Ids and metadata are held in memory; the texts of the
+    rows, if any, are memory-mapped like the vectors and only read for hits.
+    """
+
+    def __init__(
+        self,
+        ids: List[str],
+        codes: np.ndarray,
+        vectors: np.ndarray,
+        method: str = "int8",
+        lo: Optional[np.ndarray] = None,
+        step: Optional[np.ndarray] = None,
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        texts: Optional[DiskTexts] = None,
+    ):
+        if method not in METHODS:
+            raise ValueError(f"Unknown quantization method {method}")
+        self.ids = ids
+        self.codes = codes
+        self.vectors = vectors
+        self.method = method
+        self.lo = lo
+        self.step = step
+        self.metadatas = metadatas or [{} for _ in ids]
+        self.columns = MetadataColumns(self.metadatas)
+        self.texts = texts
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def build(
+        cls,
+        ids: List[str],
+        embeddings,
+        path: str,
+        method: str = "int8",
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        texts: Optional[List[str]] = None,
+    ) -> "QuantizedVectorIndex":
+        """Quantize `embeddings`, write the index to the directory `path` and
+        return it with the full-precision vectors and `texts` memory-mapped."""
+        if method not in METHODS:
+            raise ValueError(f"Unknown quantization method {method}")
+        embeddings = normalize(embeddings)
+        os.makedirs(path, exist_ok=True)
+        vectors = np.lib.format.open_memmap(
+            os.path.join(path, "vectors.npy"),
+            mode="w+",
+            dtype=np.float32,
+            shape=embeddings.shape,
+        )
+        vectors[:] = embeddings
+        vectors.flush()
+
+        lo = step = None
+        if method == "int8":
+            lo, step = fit_int8(embeddings)
+            codes = quantize_int8(embeddings, lo, step)
+            np.savez(os.path.join(path, "int8_params.npz"), lo=lo, step=step)
+        else:
+            codes = quantize_binary(embeddings)
+        np.save(os.path.join(path, "codes.npy"), codes)
+        if texts is not None:
+            DiskTexts.write(texts, path)
+        with open(os.path.join(path, "rows.json"), "w") as f:
+            json.dump({"method": method, "ids": ids, "metadatas": metadatas}, f)
+        return cls.load(path)
+
+    @classmethod
+    def from_parquet(
+        cls,
+        parquet_dir: str,
+        path: str,
+        method: str = "int8",
+        text_column: str = "text",
+    ) -> "QuantizedVectorIndex":
+        """Build an index from the embedding Parquet files used by load_embeddings,
+        with `text_column` stored on disk and the other columns as metadata."""
+        import pandas as pd
+
+        df = pd.read_parquet(parquet_dir)
+        skipped = ("id", "embedding", text_column)
+        metadata_columns = [c for c in df.columns if c not in skipped]
+        return cls.build(
+            df["id"].astype(str).tolist(),
+            np.stack(df["embedding"].to_numpy()),
+            path,
+            method=method,
+            metadatas=df[metadata_columns].to_dict("records"),
+            texts=df[text_column].tolist() if text_column in df.columns else None,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "QuantizedVectorIndex":
+        with open(os.path.join(path, "rows.json")) as f:
+            rows = json.load(f)
+        lo = step = None
+        if rows["method"] == "int8":
+            params = np.load(os.path.join(path, "int8_params.npz"))
+            lo, step = params["lo"], params["step"]
+        return cls(
+            rows["ids"],
+            np.load(os.path.join(path, "codes.npy")),
+            np.load(os.path.join(path, "vectors.npy"), mmap_mode="r"),
+            method=rows["method"],
+            lo=lo,
+            step=step,
+            metadatas=rows["metadatas"],
+            texts=DiskTexts.load(path),
+        )
+
+    def memory_bytes(self) -> int:
+        """Approximate bytes held in memory by the codes, ids and metadata,
+        excluding the memory-mapped vectors and texts."""
+        params = sum(p.nbytes for p in (self.lo, self.step) if p is not None)
+        return self.codes.nbytes + params + rows_nbytes(self.ids, self.metadatas)
+
+    def approximate_scores(
+        self, query: np.ndarray, rows: Optional[np.ndarray] = None, block_rows=65536
+    ) -> np.ndarray:
+        """Scores from the codes alone; only their order is meaningful."""
+        codes = self.codes if rows is None else self.codes[rows]
+        if self.method == "binary":
+            return -hamming_distances(codes, quantize_binary(query[None, :])[0])
+        # the per-dimension offset adds the same constant to every score
+        weights = (query * self.step).astype(np.float32)
+        scores = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), block_rows):
+            block = codes[start : start + block_rows].astype(np.float32)
+            scores[start : start + block_rows] = block @ weights
+        return scores
+
+    def search(
+        self,
+        query_embedding,
+        k: int = 10,
+        filters: Optional[Dict[str, Any]] = None,
+        num_candidates: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return the top-k matches as dicts with `id`, `score`, `key` and metadata.
+
+        `num_candidates` is the number of vectors rescored at full precision,
+        four times `k` by default.
+        """
+        query = normalize(query_embedding)[0]
+        rows = None
+        if filters:
+            rows = np.flatnonzero(self.columns.mask(filters))
+            if len(rows) == 0:
+                return []
+
+        approximate = self.approximate_scores(query, rows)
+        candidates = top_k_indices(approximate, max(num_candidates or 4 * k, k))
+        if rows is not None:
+            candidates = rows[candidates]
+        # sorted rows read the memory-mapped file sequentially
+        candidates = np.sort(candidates)
+        scores = self.vectors[candidates] @ query
+        results = []
+        for rank, j in enumerate(top_k_indices(scores, k)):
+            i = candidates[j]
+            result = {
+                **self.metadatas[i],
+                "id": self.ids[i],
+                "score": float(scores[j]),
+                "key": rank + 1,
+            }
+            if self.texts is not None:
+                result["text"] = self.texts[i]
+            results.append(result)
+        return results
@@ -0,0 +1,159 @@
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Hashable, Iterator, Optional, Tuple
+
+import torch
+from sentence_transformers import SentenceTransformer
+from transformers import AutoTokenizer
+
+
+def get_device() -> str:
+    """Get the appropriate device for tensor operations."""
+    if torch.cuda.is_available():
+        return "cuda"
+    elif torch.backends.mps.is_available():
+        return "mps"
+    return "cpu"
+
+
+class ModelRegistry:
+    """
+    Process-wide registry of sentence-transformer models and tokenizers.
+
+    Models are loaded lazily on first request and shared by every caller that
+    asks for the same name and device. Each `get_*` call takes a reference that
+    must be given back with `release` once the caller is done with the model,
+    or use the `sentence_transformer` context manager; `unload` drops a model
+    once nothing references it, or unconditionally with `force=True`.
+
+    A model is loaded under a lock of its own, so loading one model does not
+    hold up callers of models that are already loaded.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._load_locks: Dict[Hashable, threading.Lock] = {}
+        self._models: Dict[Hashable, Any] = {}
+        self._refcounts: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._models
+
+    def _take(self, key: Hashable):
+        """The model with a new reference, or None if it is not loaded; called
+        with the lock held."""
+        if key not in self._models:
+            return None
+        self._refcounts[key] += 1
+        return self._models[key]
+
+    def _get(self, key: Hashable, load):
+        with self._lock:
+            model = self._take(key)
+            if model is not None:
+                return model
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+        # concurrent callers of the same key wait here for the first one's load
+        with load_lock:
+            with self._lock:
+                model = self._take(key)
+                if model is not None:
+                    return model
+            model = load()
+            with self._lock:
+                self._models[key] = model
+                self._refcounts[key] = 1
+            return model
+
+    def get_sentence_transformer(
+        self, name: str, device: Optional[str] = None, **kwargs
+    ) -> SentenceTransformer:
+        """Return the shared model for (name, device), loading it if needed.
+
+        Extra keyword arguments are passed to `SentenceTransformer` on the first
+        load only.
+        """
+        device = device or get_device()
+        return self._get(
+            sentence_transformer_key(name, device),
+            lambda: SentenceTransformer(name, device=device, **kwargs),
+        )
+
+    def get_tokenizer(self, name: str, **kwargs):
+        """Return the shared tokenizer for a model name, loading it if needed."""
+        return self._get(
+            tokenizer_key(name), lambda: AutoTokenizer.from_pretrained(name, **kwargs)
+        )
+
+    @contextmanager
+    def sentence_transformer(
+        self, name: str, device: Optional[str] = None, **kwargs
+    ) -> Iterator[SentenceTransformer]:
+        """`get_sentence_transformer` that releases its reference on exit."""
+        device = device or get_device()
+        model = self.get_sentence_transformer(name, device=device, **kwargs)
+        try:
+            yield model
+        finally:
+            self.release(sentence_transformer_key(name, device))
+
+    def release(self, key: Tuple) -> None:
+        """Give back a reference taken by one of the `get_*` methods."""
+        with self._lock:
+            if self._refcounts.get(key, 0) > 0:
+                self._refcounts[key] -= 1
+
+    def unload(self, key: Tuple, force: bool = False) -> bool:
+        """Drop a model from the registry and return whether it was unloaded."""
+        with self._lock:
+            if key not in self._models:
+                return False
+            if self._refcounts[key] > 0 and not force:
+                return False
+            del self._models[key]
+            del self._refcounts[key]
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        return True
+
+    def unload_unused(self) -> int:
+        """Unload every model without references and return how many were dropped."""
+        with self._lock:
+            unused = [key for key, count in self._refcounts.items() if count == 0]
+        return sum(self.unload(key) for key in unused)
+
+
+def sentence_transformer_key(name: str, device: Optional[str] = None) -> Tuple:
+    return ("sentence_transformer", name, device or get_device())
+
+
+def tokenizer_key(name: str) -> Tuple:
+    return ("tokenizer", name)
+
+
+registry = ModelRegistry()
+
+
+def get_sentence_transformer(
+    name: str, device: Optional[str] = None, **kwargs
+) -> SentenceTransformer:
+    """Shortcut for `registry.get_sentence_transformer`."""
+    return registry.get_sentence_transformer(name, device=device, **kwargs)
+
+
+def get_tokenizer(name: str, **kwargs):
+    """Shortcut for `registry.get_tokenizer`."""
+    return registry.get_tokenizer(name, **kwargs)
+
+
+def sentence_transformer(name: str, device: Optional[str] = None, **kwargs):
+    """Shortcut for `registry.sentence_transformer`."""
+    return registry.sentence_transformer(name, device=device, **kwargs)
+
+
+def release(key: Tuple) -> None:
+    """Shortcut for `registry.release`."""
+    registry.release(key)
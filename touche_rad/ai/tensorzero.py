@@ -1,12 +1,15 @@
 import os
 import json
 import uuid
-from typing import Generator, List, Union
+from typing import Any, Dict, Generator, List, Tuple, Union
 
 from .base import ChatResourceEnum, EvaluationClient
 from tensorzero import InferenceChunk, TensorZeroGateway, InferenceResponse
 
 
+SCORE_FIELDS = ["quantity_score", "quality_score", "relation_score", "manner_score"]
+
+
 class TensorZeroChatResource(ChatResourceEnum):
     """Abstract base class for all TensorZero resources (models and functions)."""
 
@@ -31,6 +34,7 @@ class TensorZeroChatResourceFunction(TensorZeroChatResource):
     """
 
     EVALUATE_UTTERANCE = "evaluate_utterance"
+    EVALUATE_UTTERANCES = "evaluate_utterances"
 
     @classmethod
     def default_model(cls) -> "TensorZeroChatResourceFunction":
@@ -42,6 +46,8 @@ class TensorZeroClient(EvaluationClient):
     TensorZeroClient - a provider agnostic client to interface with the tensorzero gateway inference engine
     """
 
+    supports_batch = True
+
     def __init__(self, base_url: str = os.environ.get("TENSORZERO_GATEWAY_URL")):
         if not base_url:
             raise ValueError("TensorZero base_url is None")
@@ -53,10 +59,7 @@ class TensorZeroClient(EvaluationClient):
         self,
         fn: str,
         episode: uuid.UUID,
-        role: str,
-        utterance: str,
-        convo: List[str],
-        user_claim: str,
+        arguments: Dict[str, Any],
     ) -> InferenceResponse | Generator[InferenceChunk, None, None]:
         return self._client.inference(
             function_name=fn,
@@ -68,11 +71,7 @@ class TensorZeroClient(EvaluationClient):
                         "content": [
                             {
                                 "type": "text",
-                                "arguments": {
-                                    "argument": utterance,
-                                    "conversation": convo,
-                                    "claim": user_claim,
-                                },
+                                "arguments": arguments,
                             }
                         ],
                     }
@@ -80,6 +79,21 @@ class TensorZeroClient(EvaluationClient):
             },
         )
 
+    def _inference_text(self, fn: str, episode: uuid.UUID, arguments) -> str:
+        res_obj = self._inference(fn, episode=episode, arguments=arguments)
+        if isinstance(res_obj, InferenceResponse):
+            return res_obj.content[0].text
+        raise TypeError(f"Unexpected response type from inference: {type(res_obj)}")
+
+    @staticmethod
+    def _parse_scores(data: dict) -> List[Union[int, None]]:
+        """[quantity, quality, relation, manner] from one evaluation object."""
+        if not all(k in data for k in SCORE_FIELDS):
+            raise ValueError(
+                f"Evaluation response missing required score fields. Received: {data}"
+            )
+        return [int(data[k]) if data[k] is not None else None for k in SCORE_FIELDS]
+
     def evaluate(self, ctx, role, utterance) -> Union[List[Union[int, None]], str]:
         """Evaluates an utterance, handling potential errors and None claim."""
         if role == "user":
@@ -92,57 +106,77 @@ class TensorZeroClient(EvaluationClient):
                 current_claim = ""
 
         try:
-            res_obj = self._inference(
+            res = self._inference_text(
                 TensorZeroChatResourceFunction.EVALUATE_UTTERANCE,
                 episode=ctx.debate_id,
-                role=role,
-                utterance=utterance,
-                convo=ctx.get_conversation(),
-                user_claim=current_claim,
+                arguments={
+                    "argument": utterance,
+                    "conversation": ctx.conversation_window(),
+                    "claim": current_claim,
+                },
             )
 
-            if isinstance(res_obj, InferenceResponse):
-                res = res_obj.content[0].text
-            else:
-                raise TypeError(
-                    f"Unexpected response type from inference: {type(res_obj)}"
-                )
-
             try:
-                data = json.loads(res)
-
-                if not all(
-                    k in data
-                    for k in [
-                        "quantity_score",
-                        "quality_score",
-                        "relation_score",
-                        "manner_score",
-                    ]
-                ):
-                    raise ValueError(
-                        f"Evaluation response missing required score fields. Received: {res}"
-                    )
+                return self._parse_scores(json.loads(res))
 
-                evaluation = [
-                    data.get("quantity_score"),
-                    data.get("quality_score"),
-                    data.get("relation_score"),
-                    data.get("manner_score"),
-                ]
+            except (json.JSONDecodeError, ValueError, KeyError, TypeError) as json_err:
+                error_msg = f"Error processing evaluation response: {json_err}. Raw response: '{res}'"
+                print(error_msg)
+                return f"An error occurred during evaluation: {error_msg}"
 
-                evaluation = [int(s) if s is not None else None for s in evaluation]
+        except Exception as e:
+            error_msg = f"An error occurred calling evaluation service: {e}"
+            return f"An error occurred during evaluation: {error_msg}"
+
+    def evaluate_batch(
+        self, ctx, utterances: List[Tuple[str, str]]
+    ) -> List[Union[List[Union[int, None]], str]]:
+        """Evaluates consecutive (role, utterance) pairs in a single inference.
+
+        The conversation from `ctx` is sent once; every utterance is judged as
+        following it and the utterances before it in the batch. Returns one
+        score list, or one error string, per utterance.
+        """
+        if not utterances:
+            return []
+        current_claim = ctx.user_claim
+        if current_claim is None:
+            current_claim = utterances[0][1] if utterances[0][0] == "user" else ""
+
+        try:
+            res = self._inference_text(
+                TensorZeroChatResourceFunction.EVALUATE_UTTERANCES,
+                episode=ctx.debate_id,
+                arguments={
+                    "utterances": [
+                        {"role": role, "argument": utterance}
+                        for role, utterance in utterances
+                    ],
+                    "conversation": ctx.conversation_window(),
+                    "claim": current_claim,
+                },
+            )
 
-                return evaluation
+            try:
+                evaluations = json.loads(res)["evaluations"]
+                if len(evaluations) != len(utterances):
+                    raise ValueError(
+                        f"Expected {len(utterances)} evaluations, got {len(evaluations)}"
+                    )
+                return [self._parse_scores(data) for data in evaluations]
 
             except (json.JSONDecodeError, ValueError, KeyError, TypeError) as json_err:
                 error_msg = f"Error processing evaluation response: {json_err}. Raw response: '{res}'"
                 print(error_msg)
-                return f"An error occurred during evaluation: {error_msg}"
+                return [f"An error occurred during evaluation: {error_msg}"] * len(
+                    utterances
+                )
 
         except Exception as e:
             error_msg = f"An error occurred calling evaluation service: {e}"
-            return f"An error occurred during evaluation: {error_msg}"
+            return [f"An error occurred during evaluation: {error_msg}"] * len(
+                utterances
+            )
 
     def generate(
         self,
@@ -0,0 +1,207 @@
+import sys
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+def normalize(embeddings) -> np.ndarray:
+    """L2-normalize rows as float32 so a dot product is the cosine similarity."""
+    embeddings = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return embeddings / norms
+
+
+def rows_nbytes(ids: List[str], metadatas: List[Dict[str, Any]]) -> int:
+    """Approximate memory held by the ids and metadata dicts of an index,
+    counting every metadata value once per row."""
+    total = sys.getsizeof(ids) + sys.getsizeof(metadatas)
+    total += sum(sys.getsizeof(row_id) for row_id in ids)
+    for metadata in metadatas:
+        total += sys.getsizeof(metadata)
+        total += sum(sys.getsizeof(value) for value in metadata.values())
+    return total
+
+
+class MetadataColumns:
+    """
+    The metadata of a list of rows as one object array per field, built on
+    the first filter on that field, so that a filter is a few comparisons of
+    whole columns rather than a Python loop over rows. The rows are only
+    referenced, and columns are rebuilt once rows have been appended.
+    """
+
+    def __init__(self, metadatas: List[Dict[str, Any]]):
+        self.metadatas = metadatas
+        self._columns: Dict[str, np.ndarray] = {}
+
+    def column(self, field: str) -> np.ndarray:
+        column = self._columns.get(field)
+        if column is None or len(column) != len(self.metadatas):
+            column = np.fromiter(
+                (m.get(field) for m in self.metadatas),
+                dtype=object,
+                count=len(self.metadatas),
+            )
+            self._columns[field] = column
+        return column
+
+    def mask(self, filters: Dict[str, Any]) -> np.ndarray:
+        """Rows matching every filter; list values match any element."""
+        mask = np.ones(len(self.metadatas), dtype=bool)
+        for field, value in filters.items():
+            allowed = value if isinstance(value, (list, tuple, set)) else [value]
+            column = self.column(field)
+            matches = np.zeros(len(column), dtype=bool)
+            for v in allowed:
+                matches |= column == v
+            mask &= matches
+        return mask
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first, without a full sort."""
+    k = min(k, len(scores))
+    if k == 0:
+        return np.empty(0, dtype=np.int64)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+class _Partition:
+    def __init__(self, dim: int):
+        self.ids: List[str] = []
+        self.metadatas: List[Dict[str, Any]] = []
+        self.columns = MetadataColumns(self.metadatas)
+        self._blocks: List[np.ndarray] = []
+        self._matrix = np.empty((0, dim), dtype=np.float32)
+
+    def add(self, ids, embeddings, metadatas):
+        self.ids.extend(ids)
+        self.metadatas.extend(metadatas)
+        self._blocks.append(embeddings)
+
+    @property
+    def matrix(self) -> np.ndarray:
+        # appended blocks are stacked once, on the first search after an add
+        if self._blocks:
+            self._matrix = np.vstack([self._matrix] + self._blocks)
+            self._blocks = []
+        return self._matrix
+
+
+class LocalVectorIndex:
+    """
+    In-memory cosine-similarity index over normalized float32 vectors.
+
+    Vectors are kept in one partition per value of `partition_field` (the
+    topic by default), so a search filtered on that field only scans the
+    matching partitions. Other filters, such as stance, are applied as a
+    pre-filter inside the scanned partitions.
+    """
+
+    def __init__(self, dim: int, partition_field: str = "topic_id"):
+        self.dim = dim
+        self.partition_field = partition_field
+        self.partitions: Dict[Any, _Partition] = {}
+
+    def __len__(self) -> int:
+        return sum(len(p.ids) for p in self.partitions.values())
+
+    @classmethod
+    def from_parquet(
+        cls,
+        parquet_dir: str,
+        partition_field: str = "topic_id",
+        exclude_columns: Sequence[str] = (),
+    ) -> "LocalVectorIndex":
+        """Build an index from the embedding Parquet files used by load_embeddings,
+        keeping every column but `exclude_columns` as metadata."""
+        import pandas as pd
+
+        df = pd.read_parquet(parquet_dir)
+        embeddings = np.stack(df["embedding"].to_numpy())
+        skipped = {"id", "embedding", *exclude_columns}
+        metadata_columns = [c for c in df.columns if c not in skipped]
+        index = cls(embeddings.shape[1], partition_field=partition_field)
+        index.add(
+            df["id"].astype(str).tolist(),
+            embeddings,
+            df[metadata_columns].to_dict("records"),
+        )
+        return index
+
+    def memory_bytes(self) -> int:
+        """Approximate bytes held in memory by the vectors, ids and metadata."""
+        return sum(
+            p.matrix.nbytes + rows_nbytes(p.ids, p.metadatas)
+            for p in self.partitions.values()
+        )
+
+    def add(
+        self,
+        ids: List[str],
+        embeddings,
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+    ):
+        embeddings = normalize(embeddings)
+        if embeddings.shape[1] != self.dim:
+            raise ValueError(
+                f"Expected embeddings of dimension {self.dim}, got {embeddings.shape[1]}"
+            )
+        metadatas = metadatas or [{} for _ in ids]
+        if not len(ids) == len(embeddings) == len(metadatas):
+            raise ValueError("ids, embeddings and metadatas must have the same length")
+
+        groups: Dict[Any, List[int]] = {}
+        for i, metadata in enumerate(metadatas):
+            groups.setdefault(metadata.get(self.partition_field), []).append(i)
+        for key, rows in groups.items():
+            if key not in self.partitions:
+                self.partitions[key] = _Partition(self.dim)
+            self.partitions[key].add(
+                [ids[i] for i in rows], embeddings[rows], [metadatas[i] for i in rows]
+            )
+
+    def search(
+        self,
+        query_embedding,
+        k: int = 10,
+        filters: Optional[Dict[str, Any]] = None,
+        num_candidates: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return the top-k matches as dicts with `id`, `score`, `key` and metadata.
+
+        `num_candidates` is accepted for parity with approximate backends; the
+        search is exact over every vector in the selected partitions.
+        """
+        query = normalize(query_embedding)[0]
+        filters = dict(filters or {})
+
+        if self.partition_field in filters:
+            wanted = filters.pop(self.partition_field)
+            if not isinstance(wanted, (list, tuple, set)):
+                wanted = [wanted]
+            partitions = [self.partitions[w] for w in wanted if w in self.partitions]
+        else:
+            partitions = list(self.partitions.values())
+
+        scores, ids, metadatas = [], [], []
+        for partition in partitions:
+            matrix = partition.matrix
+            if filters:
+                rows = np.flatnonzero(partition.columns.mask(filters))
+                matrix = matrix[rows]
+            else:
+                rows = range(len(partition.ids))
+            scores.append(matrix @ query)
+            ids.extend(partition.ids[i] for i in rows)
+            metadatas.extend(partition.metadatas[i] for i in rows)
+
+        if not ids:
+            return []
+        scores = np.concatenate(scores)
+        return [
+            {**metadatas[i], "id": ids[i], "score": float(scores[i]), "key": rank + 1}
+            for rank, i in enumerate(top_k_indices(scores, k))
+        ]
@@ -0,0 +1,103 @@
+"""Session creation cost and transition throughput of the debate state machine.
+
+Example:
+
+    python -m touche_rad.benchmarks.machine --debates 10000 --output machine-report.json
+
+Every mode creates the same number of `DebateManager`s and plays a scripted
+debate through each of them. `transitions` gives every debate its own
+`transitions.Machine`, `compiled` shares one compiled transition table.
+"""
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+from touche_rad.core.manager import DebateManager
+from touche_rad.core.resources import DebateResources
+
+MODES = {"transitions": False, "compiled": True}
+
+# claim, two turns, conclusion offered and accepted
+MESSAGES = ["My claim", "A rebuttal", "Another point", "yes"]
+
+
+def measure_mode(
+    mode: str, debates: int, messages: List[str] = MESSAGES, strategy="always_attack"
+) -> Dict:
+    """Create `debates` managers in one mode and run `messages` through each."""
+    resources = DebateResources()
+    lightweight = MODES[mode]
+    # warm up imports and caches outside the measurement
+    DebateManager(strategy_name=strategy, resources=resources, lightweight=lightweight)
+
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    managers = [
+        DebateManager(
+            strategy_name=strategy, resources=resources, lightweight=lightweight
+        )
+        for _ in range(debates)
+    ]
+    create_s = time.perf_counter() - start
+    memory_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for manager in managers:
+        for message in messages:
+            manager.handle_user_message(message)
+    run_s = time.perf_counter() - start
+    return {
+        "mode": mode,
+        "debates": debates,
+        "create_s": create_s,
+        "create_us_per_debate": create_s / debates * 1e6,
+        "bytes_per_debate": memory_bytes / debates,
+        "messages": debates * len(messages),
+        "run_s": run_s,
+        "us_per_message": run_s / (debates * len(messages)) * 1e6,
+    }
+
+
+def run_benchmark(debates: int, modes: List[str] = list(MODES)) -> List[Dict]:
+    return [measure_mode(mode, debates) for mode in modes]
+
+
+def format_report(rows: List[Dict]) -> str:
+    lines = [
+        "| mode | debates | create s | us/debate | KB/debate | us/message |",
+        "| --- | --- | --- | --- | --- | --- |",
+    ]
+    for row in rows:
+        lines.append(
+            f"| {row['mode']} | {row['debates']} | {row['create_s']:.3f} "
+            f"| {row['create_us_per_debate']:.1f} "
+            f"| {row['bytes_per_debate'] / 1024:.2f} | {row['us_per_message']:.1f} |"
+        )
+    return "\n".join(lines)
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--debates", type=int, default=10_000)
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--output", default="machine-report.json")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    rows = run_benchmark(args.debates, args.modes)
+    print(format_report(rows))
+    with open(args.output, "w") as f:
+        json.dump({"results": rows}, f, indent=2)
+    print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Memory and recall@k of quantized embedding storage.
+
+Example:
+
+    python -m touche_rad.benchmarks.quantization submission/sample-config.json \
+        --parquet-dir embedded_data --index-dir quantized-index \
+        --ks 10 --num-candidates 10 40 100 --output quantization-report.json
+
+Every method is compared against exact float32 search over the same vectors;
+`num_candidates` is the number of vectors rescored at full precision.
+"""
+
+import argparse
+import json
+import os
+from typing import Dict, List, Optional
+
+from touche_rad.ai.quantization import METHODS, QuantizedVectorIndex
+from touche_rad.benchmarks.retrieval import parse_filters, run_sweep
+
+
+class QuantizedBackend:
+    """Benchmark backend for a `QuantizedVectorIndex`, with exact neighbours
+    from a full-precision `LocalVectorIndex` over the same vectors."""
+
+    def __init__(self, index, exact_index, filters: Optional[Dict] = None):
+        self.index = index
+        self.exact_index = exact_index
+        self.filters = filters
+        self.name = index.method
+
+    def memory_bytes(self) -> int:
+        return self.index.memory_bytes()
+
+    def search(self, query_embedding, k: int, num_candidates: int) -> List[str]:
+        hits = self.index.search(
+            query_embedding, k=k, filters=self.filters, num_candidates=num_candidates
+        )
+        return [hit["id"] for hit in hits]
+
+    def exact(self, query_embedding, k: int) -> List[str]:
+        hits = self.exact_index.search(query_embedding, k=k, filters=self.filters)
+        return [hit["id"] for hit in hits]
+
+
+class Float32Backend:
+    """The uncompressed baseline: every vector in memory, exact search.
+
+    Build the index without the chunk text, which `QuantizedVectorIndex`
+    keeps on disk, so that both count the same resident rows."""
+
+    name = "float32"
+    approximate = False
+
+    def __init__(self, exact_index, filters: Optional[Dict] = None):
+        self.exact_index = exact_index
+        self.filters = filters
+
+    def memory_bytes(self) -> int:
+        return self.exact_index.memory_bytes()
+
+    def search(self, query_embedding, k: int, num_candidates: int) -> List[str]:
+        return self.exact(query_embedding, k)
+
+    def exact(self, query_embedding, k: int) -> List[str]:
+        hits = self.exact_index.search(query_embedding, k=k, filters=self.filters)
+        return [hit["id"] for hit in hits]
+
+
+def run_benchmark(
+    backends, query_embeddings, ks, num_candidates, repeats: int = 1
+) -> List[Dict]:
+    """`run_sweep` for every backend, with its resident memory added to each row."""
+    rows = []
+    for backend in backends:
+        memory_mb = backend.memory_bytes() / 2**20
+        for row in run_sweep(backend, query_embeddings, ks, num_candidates, repeats):
+            rows.append({**row, "memory_mb": memory_mb})
+    return rows
+
+
+def format_report(rows: List[Dict]) -> str:
+    lines = [
+        "| method | memory MB | k | num_candidates | recall@k | p50 ms | p99 ms |",
+        "| --- | --- | --- | --- | --- | --- | --- |",
+    ]
+    for row in rows:
+        lines.append(
+            f"| {row['backend']} | {row['memory_mb']:.1f} | {row['k']} "
+            f"| {row['num_candidates']} | {row['recall']:.3f} "
+            f"| {row['p50_ms']:.2f} | {row['p99_ms']:.2f} |"
+        )
+    return "\n".join(lines)
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("datasets", nargs="+", help="files with topic descriptions")
+    parser.add_argument("--parquet-dir", required=True, help="embeddings to index")
+    parser.add_argument("--index-dir", default="quantized-index")
+    parser.add_argument("--methods", nargs="+", choices=METHODS, default=METHODS)
+    parser.add_argument(
+        "--filter",
+        action="append",
+        default=[],
+        metavar="FIELD=VALUE",
+        help="metadata pre-filter, e.g. topic_id=42",
+    )
+    parser.add_argument("--model", default="all-mpnet-base-v2")
+    parser.add_argument("--ks", type=int, nargs="+", default=[10])
+    parser.add_argument(
+        "--num-candidates", type=int, nargs="+", default=[10, 20, 40, 100, 200]
+    )
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", default="quantization-report.json")
+    args = parser.parse_args(argv)
+    args.filters = parse_filters(args.filter)
+    return args
+
+
+def main(argv: Optional[List[str]] = None):
+    from touche_rad.ai.evidence_store import load_dataset_queries
+    from touche_rad.ai.registry import sentence_transformer
+    from touche_rad.ai.vector_index import LocalVectorIndex
+
+    args = parse_args(argv)
+    queries = []
+    for path in args.datasets:
+        queries.extend(load_dataset_queries(path))
+    queries = list(dict.fromkeys(queries))
+    print(f"Benchmarking with {len(queries)} queries")
+
+    exact_index = LocalVectorIndex.from_parquet(
+        args.parquet_dir, exclude_columns=["text"]
+    )
+    backends = [Float32Backend(exact_index, filters=args.filters)]
+    for method in args.methods:
+        index = QuantizedVectorIndex.from_parquet(
+            args.parquet_dir, os.path.join(args.index_dir, method), method=method
+        )
+        backends.append(QuantizedBackend(index, exact_index, filters=args.filters))
+
+    with sentence_transformer(args.model) as model:
+        query_embeddings = model.encode(queries)
+    rows = run_benchmark(
+        backends, query_embeddings, args.ks, args.num_candidates, args.repeats
+    )
+    print(format_report(rows))
+    with open(args.output, "w") as f:
+        json.dump({"queries": queries, "results": rows}, f, indent=2)
+    print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+"""Recall versus latency sweep over the kNN retrieval settings.
+
+Example:
+
+    python -m touche_rad.benchmarks.retrieval submission/sample-config.json \
+        --ks 5 10 --num-candidates 10 50 100 200 --output retrieval-report.json
+
+Pass `--backend local --parquet-dir embedded_data` to benchmark a
+`LocalVectorIndex` built from the ingestion Parquet files instead.
+"""
+
+import argparse
+import json
+import time
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from touche_rad.ai.elasticsearch_retriever import build_knn_filter
+
+
+def recall_at_k(retrieved: List[str], exact: List[str], k: int) -> float:
+    """Fraction of the exact top-k neighbours that were retrieved in the top-k;
+    NaN when there are none, e.g. because a filter matches no documents."""
+    exact = exact[:k]
+    if not exact:
+        return float("nan")
+    return len(set(retrieved[:k]) & set(exact)) / len(exact)
+
+
+def parse_filters(pairs: Iterable[str]) -> Dict:
+    """`FIELD=VALUE` pairs as a filter dict, with JSON values such as numbers
+    and booleans decoded and anything else kept as a string."""
+    filters = {}
+    for pair in pairs:
+        field, value = pair.split("=", 1)
+        try:
+            filters[field] = json.loads(value)
+        except json.JSONDecodeError:
+            filters[field] = value
+    return filters
+
+
+def mean_recall(recalls: List[float]) -> float:
+    recalls = [r for r in recalls if not np.isnan(r)]
+    return float(np.mean(recalls)) if recalls else float("nan")
+
+
+def latency_summary(latencies_ms: List[float]) -> Dict[str, float]:
+    """p50/p99 and mean latency in milliseconds."""
+    return {
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+        "mean_ms": float(np.mean(latencies_ms)),
+    }
+
+
+class ElasticsearchBackend:
+    """
+    Benchmark backend for `ElasticsearchRetriever`.
+
+    Exact neighbours come from a brute-force `script_score` query over the
+    whole index, using the same similarity as the kNN field.
+    """
+
+    name = "elasticsearch"
+
+    def __init__(
+        self,
+        retriever,
+        mode: str = "text",
+        similarity: str = "cosine",
+        filters: Optional[Dict] = None,
+    ):
+        self.retriever = retriever
+        self.field = retriever.get_embedding_field(mode)
+        self.filters = build_knn_filter(filters or {})
+        self.script = {
+            "cosine": f"cosineSimilarity(params.query_vector, '{self.field}') + 1.0",
+            "dot_product": f"dotProduct(params.query_vector, '{self.field}')",
+        }[similarity]
+
+    def embed(self, queries: List[str]) -> np.ndarray:
+        return self.retriever.get_query_embeddings(queries)
+
+    def search(self, query_embedding, k: int, num_candidates: int) -> List[str]:
+        knn = {
+            "field": self.field,
+            "query_vector": query_embedding,
+            "k": k,
+            "num_candidates": num_candidates,
+        }
+        if self.filters:
+            knn["filter"] = self.filters
+        resp = self.retriever.es_client.search(
+            index=self.retriever.index_name, size=k, source=False, knn=knn
+        )
+        return [hit["_id"] for hit in resp["hits"]["hits"]]
+
+    def exact(self, query_embedding, k: int) -> List[str]:
+        resp = self.retriever.es_client.options(request_timeout=600).search(
+            index=self.retriever.index_name,
+            size=k,
+            source=False,
+            query={
+                "script_score": {
+                    "query": {"bool": {"filter": self.filters}},
+                    "script": {
+                        "source": self.script,
+                        "params": {"query_vector": query_embedding},
+                    },
+                }
+            },
+        )
+        return [hit["_id"] for hit in resp["hits"]["hits"]]
+
+
+class LocalIndexBackend:
+    """
+    Benchmark backend for a `LocalVectorIndex`.
+
+    Its search is exact, so `search` and `exact` return the same neighbours
+    and only the latency is informative; `num_candidates` is not swept.
+    """
+
+    name = "local"
+    approximate = False
+
+    def __init__(self, index, encoder, filters: Optional[Dict] = None):
+        self.index = index
+        self.encoder = encoder
+        self.filters = filters
+
+    def embed(self, queries: List[str]) -> np.ndarray:
+        return self.encoder.encode(queries)
+
+    def search(self, query_embedding, k: int, num_candidates: int) -> List[str]:
+        hits = self.index.search(
+            query_embedding, k=k, filters=self.filters, num_candidates=num_candidates
+        )
+        return [hit["id"] for hit in hits]
+
+    def exact(self, query_embedding, k: int) -> List[str]:
+        hits = self.index.search(query_embedding, k=k, filters=self.filters)
+        return [hit["id"] for hit in hits]
+
+
+def run_sweep(
+    backend,
+    query_embeddings,
+    ks: Iterable[int],
+    num_candidates: Iterable[int],
+    repeats: int = 1,
+) -> List[Dict]:
+    """Measure recall@k and search latency for every (k, num_candidates) pair.
+
+    Latency covers the search only; queries are embedded once up front so the
+    encoder does not drown out the differences between settings. Queries
+    without exact neighbours are left out of the recall, which is NaN if no
+    query has any. Backends whose search is exact (`approximate = False`) get
+    a single row per k.
+    """
+    ks = sorted(ks)
+    if not getattr(backend, "approximate", True):
+        num_candidates = [max(ks)]
+    exact = [backend.exact(emb, max(ks)) for emb in query_embeddings]
+    rows = []
+    for k in ks:
+        for candidates in sorted(num_candidates):
+            if candidates < k:
+                continue
+            recalls, latencies = [], []
+            for emb, truth in zip(query_embeddings, exact):
+                for _ in range(repeats):
+                    start = time.perf_counter()
+                    retrieved = backend.search(emb, k, candidates)
+                    latencies.append((time.perf_counter() - start) * 1000)
+                recalls.append(recall_at_k(retrieved, truth, k))
+            rows.append(
+                {
+                    "backend": backend.name,
+                    "k": k,
+                    "num_candidates": candidates,
+                    "recall": mean_recall(recalls),
+                    **latency_summary(latencies),
+                }
+            )
+    return rows
+
+
+def cheapest_settings(rows: List[Dict], min_recall: float = 0.95) -> Dict[int, Dict]:
+    """For each k, the row with the lowest p50 latency that keeps `min_recall`."""
+    best = {}
+    for row in rows:
+        # NaN recall means there was nothing to find, which proves nothing
+        if not row["recall"] >= min_recall:
+            continue
+        current = best.get(row["k"])
+        if current is None or row["p50_ms"] < current["p50_ms"]:
+            best[row["k"]] = row
+    return best
+
+
+def format_report(rows: List[Dict], min_recall: float = 0.95) -> str:
+    lines = [
+        "| backend | k | num_candidates | recall@k | p50 ms | p99 ms |",
+        "| --- | --- | --- | --- | --- | --- |",
+    ]
+    for row in rows:
+        lines.append(
+            f"| {row['backend']} | {row['k']} | {row['num_candidates']} "
+            f"| {row['recall']:.3f} | {row['p50_ms']:.1f} | {row['p99_ms']:.1f} |"
+        )
+    lines.append("")
+    for k, row in sorted(cheapest_settings(rows, min_recall).items()):
+        lines.append(
+            f"k={k}: cheapest setting with recall >= {min_recall} is "
+            f"num_candidates={row['num_candidates']} ({row['p50_ms']:.1f} ms p50)"
+        )
+    return "\n".join(lines)
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("datasets", nargs="+", help="files with topic descriptions")
+    parser.add_argument("--backend", choices=["elasticsearch", "local"])
+    parser.add_argument("--mode", default="text")
+    parser.add_argument(
+        "--filter",
+        action="append",
+        default=[],
+        metavar="FIELD=VALUE",
+        help="metadata pre-filter, e.g. topic_id=42",
+    )
+    parser.add_argument("--parquet-dir", help="embeddings for the local backend")
+    parser.add_argument("--model", default="all-mpnet-base-v2")
+    parser.add_argument("--ks", type=int, nargs="+", default=[5, 10])
+    parser.add_argument(
+        "--num-candidates", type=int, nargs="+", default=[10, 25, 50, 100, 200]
+    )
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--min-recall", type=float, default=0.95)
+    parser.add_argument("--output", default="retrieval-report.json")
+    args = parser.parse_args(argv)
+    args.backend = args.backend or ("local" if args.parquet_dir else "elasticsearch")
+    args.filters = parse_filters(args.filter)
+    return args
+
+
+def main(argv: Optional[List[str]] = None):
+    from touche_rad.ai.evidence_store import load_dataset_queries
+
+    args = parse_args(argv)
+    queries = []
+    for path in args.datasets:
+        queries.extend(load_dataset_queries(path))
+    queries = list(dict.fromkeys(queries))
+    print(f"Benchmarking with {len(queries)} queries")
+
+    if args.backend == "local":
+        from touche_rad.ai.registry import sentence_transformer
+        from touche_rad.ai.vector_index import LocalVectorIndex
+
+        with sentence_transformer(args.model) as encoder:
+            backend = LocalIndexBackend(
+                LocalVectorIndex.from_parquet(args.parquet_dir),
+                encoder,
+                filters=args.filters,
+            )
+            query_embeddings = backend.embed(queries)
+    else:
+        from touche_rad.ai.elasticsearch_retriever import get_shared_retriever
+
+        backend = ElasticsearchBackend(
+            get_shared_retriever(), mode=args.mode, filters=args.filters
+        )
+        query_embeddings = backend.embed(queries)
+    rows = run_sweep(
+        backend,
+        query_embeddings,
+        ks=args.ks,
+        num_candidates=args.num_candidates,
+        repeats=args.repeats,
+    )
+    print(format_report(rows, args.min_recall))
+    with open(args.output, "w") as f:
+        json.dump({"queries": queries, "results": rows}, f, indent=2)
+    print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
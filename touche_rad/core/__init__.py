@@ -1,6 +1,7 @@
 from .context import DebateContext
 from .manager import DebateManager
-from .machine import DebateMachine
+from .machine import DebateMachine, LightweightDebateContext
+from .resources import DebateResources
 from .strategy import create_strategy, BaseStrategy
 
 __all__ = [
@@ -9,4 +10,6 @@ __all__ = [
     "DebateContext",
     "DebateManager",
     "DebateMachine",
+    "LightweightDebateContext",
+    "DebateResources",
 ]
@@ -1,24 +1,113 @@
+import threading
 import uuid
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
 
-from typing import List, Optional
 from uuid_utils import compat
 
+from .conversation import ConversationBuffer, Summarizer, TokenCounter
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_evaluation_executor() -> ThreadPoolExecutor:
+    """The thread pool shared by all debates for background evaluation."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=8, thread_name_prefix="evaluation"
+            )
+        return _executor
+
+
+@dataclass(frozen=True)
+class ContextSnapshot:
+    """The parts of a `DebateContext` an evaluation reads, frozen at the time
+    the utterance was added so later turns do not change what is judged.
+    `conversation` is the context's token-bounded conversation window."""
+
+    debate_id: uuid.UUID
+    user_claim: Optional[str]
+    conversation: Tuple[str, ...]
+
+    def conversation_window(self) -> List[str]:
+        return list(self.conversation)
+
+
+def _supports_batch(client) -> bool:
+    return getattr(client, "supports_batch", False)
+
+
+def _run_evaluations(
+    client,
+    ctx: ContextSnapshot,
+    utterances: Sequence[Tuple[str, str]],
+    futures: Sequence[Future],
+):
+    """Evaluate `utterances` and resolve their futures, unless all were cancelled."""
+    if not any([future.set_running_or_notify_cancel() for future in futures]):
+        return
+    try:
+        if _supports_batch(client):
+            results = client.evaluate_batch(ctx, list(utterances))
+        else:
+            results = [
+                client.evaluate(ctx=ctx, role=role, utterance=utterance)
+                for role, utterance in utterances
+            ]
+    except Exception as e:
+        for future in futures:
+            if not future.cancelled():
+                future.set_exception(e)
+        return
+    for future, result in zip(futures, results):
+        if not future.cancelled():
+            future.set_result(result)
+
+
+def _rating_result(future: Future):
+    """The rating of a finished evaluation, or None if it is not available."""
+    if not future.done() or future.cancelled() or future.exception() is not None:
+        return None
+    return future.result()
+
+
+def _resolved_rating(rating) -> Future:
+    future = Future()
+    future.set_result(rating)
+    return future
+
 
 class DebateContext(object):
     """The debate context"""
 
     def __init__(
         self,
-        client,
+        client=None,
         user_utterances: list[str] = None,
         system_utterances: list[str] = None,
         current_turn: int = 0,
         max_turns: int = 3,
         conclusion_requested: bool = False,
         debate_id: uuid.UUID = None,
+        executor: Optional[Executor] = None,
+        token_budget: Optional[int] = None,
+        token_counter: Optional[TokenCounter] = None,
+        summarizer: Optional[Summarizer] = None,
+        topic: Optional[str] = None,
     ):
         self.debate_id = debate_id or self._generate_id()
+        # what the debate is about, when known; restricts evidence retrieval
+        self.topic = topic
+        # utterances are only rated when there is an evaluation client
         self.client = client
+        self.executor = executor
+        # with a batching client, a user utterance waits for the system reply
+        # so that both are evaluated in one request
+        self._unsubmitted: Optional[Tuple[ContextSnapshot, str, Future]] = None
         self.user_utterances = user_utterances or []
         self.system_utterances = system_utterances or []
         self.user_ratings = []
@@ -26,6 +115,14 @@ class DebateContext(object):
         self.current_turn = current_turn
         self.max_turns = max_turns
         self.conclusion_requested = conclusion_requested
+        # what models see of the conversation: bounded by `token_budget`
+        self.conversation = ConversationBuffer(
+            token_budget=token_budget,
+            token_counter=token_counter,
+            summarizer=summarizer,
+        )
+        for utterance in self._interleave():
+            self.conversation.append(utterance)
 
     @property
     def user_claim(self) -> Optional[str]:
@@ -39,7 +136,7 @@ class DebateContext(object):
             return None
         return self.user_utterances[-1]
 
-    def get_conversation(self) -> List[str]:
+    def _interleave(self) -> List[str]:
         conversation = []
         user_len = len(self.user_utterances)
         system_len = len(self.system_utterances)
@@ -53,14 +150,29 @@ class DebateContext(object):
                 conversation.append(self.system_utterances[i])
         return conversation
 
+    def get_conversation(self) -> List[str]:
+        """The full transcript, alternating user and system utterances."""
+        return list(self.conversation.utterances)
+
+    def conversation_window(self) -> List[str]:
+        """The claim and recent turns that fit in the token budget, with a
+        summary of older turns; see `ConversationBuffer.window`."""
+        return self.conversation.window()
+
     def reset_debate(self):
         """Reset the debate context to its initial state."""
         self.user_utterances = []
         self.system_utterances = []
+        self.conversation.clear()
+        # evaluations of the finished debate still run and reach the client,
+        # the context just stops tracking them; only an utterance held back
+        # for a reply that never came, such as "new topic", is dropped
+        self._unsubmitted = None
         self.user_ratings = []
         self.system_ratings = []
         self.current_turn = 0
         self.conclusion_requested = False
+        self.topic = None
         self.debate_id = self._generate_id()
 
     def _generate_id(self):
@@ -82,6 +194,7 @@ class DebateContext(object):
             self._evaluate_user_utterance(utterance=utterance)
 
         self.user_utterances.append(utterance)
+        self.conversation.append(utterance)
         self.current_turn = self.current_turn + 1
         if self.current_turn >= self.max_turns:
             self.conclusion_requested = True
@@ -90,11 +203,119 @@ class DebateContext(object):
         if len(self.user_utterances) > 0:
             self._evaluate_system_utterance(utterance=utterance)
             self.system_utterances.append(utterance)
+            if utterance:
+                self.conversation.append(utterance)
+
+    def to_dict(self) -> dict:
+        """The state of the debate as plain JSON types. Ratings that are still
+        pending, or whose evaluation failed, are stored as None."""
+        return {
+            "debate_id": str(self.debate_id),
+            "state": getattr(self, "state", None),
+            "topic": self.topic,
+            "user_utterances": list(self.user_utterances),
+            "system_utterances": list(self.system_utterances),
+            "user_ratings": [_rating_result(f) for f in self.user_ratings],
+            "system_ratings": [_rating_result(f) for f in self.system_ratings],
+            "current_turn": self.current_turn,
+            "max_turns": self.max_turns,
+            "conclusion_requested": self.conclusion_requested,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, **kwargs) -> "DebateContext":
+        """Rebuild a context from `to_dict`; keyword arguments such as `client`
+        are passed to the constructor."""
+        context = cls(
+            user_utterances=data["user_utterances"],
+            system_utterances=data["system_utterances"],
+            current_turn=data["current_turn"],
+            max_turns=data["max_turns"],
+            conclusion_requested=data["conclusion_requested"],
+            debate_id=uuid.UUID(data["debate_id"]),
+            topic=data.get("topic"),
+            **kwargs,
+        )
+        context.user_ratings = [_resolved_rating(r) for r in data["user_ratings"]]
+        context.system_ratings = [_resolved_rating(r) for r in data["system_ratings"]]
+        if data.get("state") is not None:
+            context.state = data["state"]
+        return context
+
+    def snapshot(self) -> ContextSnapshot:
+        return ContextSnapshot(
+            debate_id=self.debate_id,
+            user_claim=self.user_claim,
+            conversation=tuple(self.conversation_window()),
+        )
+
+    def pending_ratings(self) -> int:
+        """Number of evaluations that have not finished yet."""
+        return sum(
+            not future.done() for future in self.user_ratings + self.system_ratings
+        )
+
+    def wait_for_ratings(
+        self, timeout: Optional[float] = None
+    ) -> Tuple[List[object], List[object]]:
+        """Block until all submitted evaluations have finished.
+
+        Returns:
+            The user and system ratings, in utterance order
+
+        Raises:
+            TimeoutError: if evaluations are still running after `timeout` seconds
+        """
+        self.flush_evaluations()
+        futures = self.user_ratings + self.system_ratings
+        _, not_done = wait(futures, timeout=timeout)
+        if not_done:
+            raise TimeoutError(f"{len(not_done)} evaluations still pending")
+        return (
+            [future.result() for future in self.user_ratings],
+            [future.result() for future in self.system_ratings],
+        )
+
+    def _submit(
+        self,
+        ctx: ContextSnapshot,
+        utterances: Sequence[Tuple[str, str]],
+        futures: Sequence[Future],
+    ):
+        executor = self.executor or get_evaluation_executor()
+        executor.submit(_run_evaluations, self.client, ctx, utterances, futures)
+
+    def flush_evaluations(self):
+        """Submit a user utterance held back for a system reply, e.g. when the
+        debate moves to its conclusion instead."""
+        if self._unsubmitted is not None:
+            ctx, utterance, future = self._unsubmitted
+            self._unsubmitted = None
+            self._submit(ctx, [("user", utterance)], [future])
 
     def _evaluate_user_utterance(self, utterance: str):
-        score = self.client.evaluate(ctx=self, role="user", utterance=utterance)
-        self.user_ratings.append(score)
+        if self.client is None:
+            return
+        self.flush_evaluations()
+        future = Future()
+        self.user_ratings.append(future)
+        if _supports_batch(self.client):
+            self._unsubmitted = (self.snapshot(), utterance, future)
+        else:
+            self._submit(self.snapshot(), [("user", utterance)], [future])
 
     def _evaluate_system_utterance(self, utterance: str):
-        score = self.client.evaluate(ctx=self, role="system", utterance=utterance)
-        self.system_ratings.append(score)
+        if self.client is None:
+            return
+        future = Future()
+        self.system_ratings.append(future)
+        if self._unsubmitted is None:
+            self._submit(self.snapshot(), [("system", utterance)], [future])
+            return
+        ctx, user_utterance, user_future = self._unsubmitted
+        self._unsubmitted = None
+        self._submit(
+            ctx,
+            [("user", user_utterance), ("system", utterance)],
+            [user_future, future],
+        )
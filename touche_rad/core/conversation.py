@@ -0,0 +1,114 @@
+import math
+from typing import Callable, List, Optional
+
+# tokens of conversation sent to a model per request, well inside the context
+# window of the chat models behind TensorZero with room for prompt and evidence
+DEFAULT_TOKEN_BUDGET = 4096
+
+TokenCounter = Callable[[str], int]
+# (previous summary or None, utterances that just left the window) -> summary
+Summarizer = Callable[[Optional[str], List[str]], str]
+
+
+def approximate_token_count(text: Optional[str]) -> int:
+    """About four characters per token, which holds well enough for English
+    text with the tokenizers of the chat models behind TensorZero."""
+    return math.ceil(len(text) / 4) if text else 0
+
+
+class ConversationBuffer:
+    """
+    The transcript of a debate, appended to one utterance at a time, with the
+    token count of every utterance computed once when it is added.
+
+    `window()` bounds what is sent to a model: with a `token_budget`, it keeps
+    the claim and the most recent turns that fit, and puts a summary of the
+    turns in between in the slot after the claim. The summary comes from
+    `summarizer` and is rolled forward only with the utterances that newly
+    left the window, or is a one-line note of the omission without one. The
+    recent turns always start with a user utterance, so user messages stay
+    at even and system messages at odd indices.
+    """
+
+    def __init__(
+        self,
+        token_budget: Optional[int] = None,
+        token_counter: Optional[TokenCounter] = None,
+        summarizer: Optional[Summarizer] = None,
+    ):
+        self.token_budget = token_budget
+        self.token_counter = token_counter or approximate_token_count
+        self.summarizer = summarizer
+        self.utterances: List[str] = []
+        self.token_counts: List[int] = []
+        self.total_tokens = 0
+        self._summary: Optional[str] = None
+        # utterances[1:_summarized] are folded into _summary
+        self._summarized = 1
+
+    def __len__(self) -> int:
+        return len(self.utterances)
+
+    def append(self, utterance: str):
+        count = self.token_counter(utterance)
+        self.utterances.append(utterance)
+        self.token_counts.append(count)
+        self.total_tokens += count
+
+    def clear(self):
+        self.utterances = []
+        self.token_counts = []
+        self.total_tokens = 0
+        self._summary = None
+        self._summarized = 1
+
+    def _recent_start(self, budget: int, start: int) -> int:
+        """First index at or after `start` from which the remaining utterances
+        fit in `budget`, keeping at least the last turn."""
+        n = len(self.utterances)
+        start = max(start, 2)
+        used = 0
+        first = n
+        for i in range(n - 1, start - 1, -1):
+            used += self.token_counts[i]
+            if used > budget:
+                break
+            first = i
+        # begin on a user utterance, and never drop the latest one
+        first += first % 2
+        return min(first, n - 1 - (n - 1) % 2)
+
+    def _summary_for(self, start: int) -> str:
+        if self.summarizer is None:
+            return f"[{start - 1} earlier utterances omitted]"
+        if start > self._summarized:
+            dropped = self.utterances[self._summarized : start]
+            self._summary = self.summarizer(self._summary, dropped)
+            self._summarized = start
+        return self._summary
+
+    def window(self) -> List[str]:
+        """The claim, a summary of older turns and the recent turns that fit
+        in the token budget; the whole transcript if it fits."""
+        if (
+            self.token_budget is None
+            or self.total_tokens <= self.token_budget
+            or len(self.utterances) <= 2
+        ):
+            return list(self.utterances)
+
+        claim_tokens = self.token_counts[0]
+        start = self._summarized
+        while True:
+            summary = self._summary_for(start)
+            reserved = self.token_counter(summary) if summary else 0
+            budget = self.token_budget - claim_tokens - reserved
+            new_start = self._recent_start(budget, start)
+            if new_start == start:
+                break
+            start = new_start
+        return [
+            self.utterances[0],
+            self._summary_for(start),
+            *self.utterances[start:],
+        ]
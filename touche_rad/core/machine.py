@@ -1,4 +1,9 @@
+from typing import Dict, List, Tuple
+
 from transitions import Machine
+from transitions.core import MachineError
+
+from .context import DebateContext
 
 
 class DebateMachine(Machine):
@@ -54,3 +59,98 @@ class DebateMachine(Machine):
             auto_transitions=False,
             **kwargs,
         )
+
+
+def _callbacks(value) -> Tuple[str, ...]:
+    if value is None:
+        return ()
+    return (value,) if isinstance(value, str) else tuple(value)
+
+
+class CompiledDebateMachine:
+    """
+    The debate FSM compiled into a transition table, shared by any number
+    of models.
+
+    `DebateMachine` builds state objects, events and bound trigger methods
+    for every model it is given. Here `(trigger, state)` maps straight to the
+    destination and the `before`/`after` callbacks, the only per-model data
+    is the `state` attribute, and triggers are plain methods of the model
+    class (see `LightweightDebateContext`). Invalid triggers raise the same
+    errors as `transitions`.
+    """
+
+    def __init__(
+        self,
+        states: List[str] = DebateMachine.states,
+        transitions: List[dict] = DebateMachine.transitions,
+        initial: str = DebateMachine.initial,
+    ):
+        self.states = tuple(states)
+        self.initial = initial
+        self.table: Dict[Tuple[str, str], Tuple[str, tuple, tuple]] = {}
+        for t in transitions:
+            sources = [t["source"]] if isinstance(t["source"], str) else t["source"]
+            for source in sources:
+                self.table[(t["trigger"], source)] = (
+                    t["dest"],
+                    _callbacks(t.get("before")),
+                    _callbacks(t.get("after")),
+                )
+        self.triggers = tuple(dict.fromkeys(trigger for trigger, _ in self.table))
+
+    def add_model(self, model):
+        model.state = self.initial
+
+    def trigger(self, model, trigger: str, *args, **kwargs) -> bool:
+        state = model.state
+        transition = self.table.get((trigger, state))
+        if transition is None:
+            if state not in self.states:
+                raise ValueError(f"State '{state}' is not a registered state.")
+            raise MachineError(f"Can't trigger event {trigger} from state {state}!")
+        dest, before, after = transition
+        for name in before:
+            getattr(model, name)(*args, **kwargs)
+        model.state = dest
+        for name in after:
+            getattr(model, name)(*args, **kwargs)
+        return True
+
+    def get_triggers(self, state: str) -> List[str]:
+        return [trigger for trigger, source in self.table if source == state]
+
+
+def compiled_model(cls, machine: CompiledDebateMachine):
+    """Subclass of `cls` with the triggers and `is_<state>` checks of
+    `machine` as ordinary methods, all dispatched through the shared table."""
+
+    def make_trigger(name):
+        def trigger(self, *args, **kwargs):
+            return machine.trigger(self, name, *args, **kwargs)
+
+        trigger.__name__ = name
+        return trigger
+
+    def make_check(state):
+        def check(self):
+            return self.state == state
+
+        check.__name__ = f"is_{state}"
+        return check
+
+    namespace = {name: make_trigger(name) for name in machine.triggers}
+    namespace.update({f"is_{state}": make_check(state) for state in machine.states})
+    namespace["machine"] = machine
+    # instances start in the initial state without any per-instance setup
+    namespace["state"] = machine.initial
+    namespace["trigger"] = lambda self, name, *args, **kwargs: machine.trigger(
+        self, name, *args, **kwargs
+    )
+    return type(f"Lightweight{cls.__name__}", (cls,), namespace)
+
+
+compiled_debate_machine = CompiledDebateMachine()
+
+# a DebateContext whose state machine is `compiled_debate_machine`
+LightweightDebateContext = compiled_model(DebateContext, compiled_debate_machine)
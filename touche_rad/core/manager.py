@@ -1,28 +1,44 @@
-from .context import DebateContext
-from .machine import DebateMachine
-from .strategy import create_strategy
+from typing import Optional
 
-# --- RAG imports ---
-from touche_rad.ai.elasticsearch_retriever import ElasticsearchRetriever
-from touche_rad.core.rag_pipeline import RAGDebater
-from touche_rad.core.strategy.drivers.rag import RAGStrategy
+from .context import DebateContext
+from .conversation import DEFAULT_TOKEN_BUDGET
+from .machine import DebateMachine, LightweightDebateContext
+from .resources import DebateResources
 
 
 class DebateManager(object):
     def __init__(
-        self, client, strategy_name: str = "random", retrieval_mode: str = "text"
+        self,
+        client=None,
+        strategy_name: str = "random",
+        retrieval_mode: str = "text",
+        resources: Optional[DebateResources] = None,
+        context: Optional[DebateContext] = None,
+        lightweight: bool = False,
+        token_budget: Optional[int] = DEFAULT_TOKEN_BUDGET,
     ):
-        self.client = client
-        self.context = DebateContext(client=client)
-        self.machine = DebateMachine(model=self.context)
-        self.retrieval_mode = retrieval_mode
-
-        if strategy_name == "rag":
-            retriever = ElasticsearchRetriever()
-            rag_debater = RAGDebater(retriever, client)
-            self.strategy = RAGStrategy(rag_debater, retrieval_mode=retrieval_mode)
+        # retrievers and models come from `resources`, which can be shared by
+        # every manager in the process; `client` overrides its client
+        self.resources = resources or DebateResources(client=client)
+        self.client = client if client is not None else self.resources.client
+        if context is None:
+            # models see at most `token_budget` tokens of a new debate
+            context_cls = LightweightDebateContext if lightweight else DebateContext
+            context = context_cls(client=self.client, token_budget=token_budget)
+        self.context = context
+        if isinstance(context, LightweightDebateContext):
+            # one compiled transition table drives every lightweight context
+            self.machine = context.machine
         else:
-            self.strategy = create_strategy(strategy_name)
+            # a restored context resumes in its saved state
+            state = getattr(context, "state", None)
+            self.machine = DebateMachine(model=context)
+            if state is not None:
+                context.state = state
+        self.retrieval_mode = retrieval_mode
+        self.strategy = self.resources.create_strategy(
+            strategy_name, retrieval_mode=retrieval_mode, client=self.client
+        )
 
     def handle_user_message(self, message: str) -> str:
         """Main entry point for handling a user message."""
@@ -33,6 +49,8 @@ class DebateManager(object):
                 return "Okay, let's start a new debate. What's your claim?"
             if self.context.should_conclude():
                 self.context.request_conclusion()
+                # no reply follows to evaluate the last utterance with
+                self.context.flush_evaluations()
                 return "I think we've reached a good point to conclude. Do you agree?"
         elif self.context.is_conclusion():
             if message.lower() in ("yes", "y", "ok", "sure"):
@@ -1,4 +1,4 @@
-from typing import List
+from typing import Any, Dict, List, Optional
 
 
 class RAGDebater:
@@ -17,15 +17,17 @@ class RAGDebater:
         user_message: str,
         retrieval_mode: str = "text",
         include_evidence: bool = True,
+        filters: Optional[Dict[str, Any]] = None,
     ) -> str:
         """
         1. Retrieve evidence from retriever using the specified retrieval_mode.
         2. Construct a prompt using user message and evidence.
         3. Generate a response using the model client.
         retrieval_mode: 'text', 'support', or 'attack'
+        filters: optional metadata filters, e.g. {"topic": ...}, to restrict retrieval
         """
         evidence = self.retriever.retrieve(
-            user_message, mode=retrieval_mode, k=self.top_k
+            user_message, mode=retrieval_mode, k=self.top_k, filters=filters
         )
         evidence_texts = [item["text"] for item in evidence if "text" in item]
         prompt = self._build_prompt(user_message, evidence_texts, retrieval_mode)
@@ -0,0 +1,89 @@
+import functools
+import threading
+from typing import Any, Callable, Optional
+
+from touche_rad.ai.elasticsearch_retriever import (
+    DEFAULT_ES_URL,
+    DEFAULT_INDEX_NAME,
+    get_shared_retriever,
+)
+from touche_rad.ai.evidence_store import with_evidence_store
+from touche_rad.core.rag_pipeline import RAGDebater
+from touche_rad.core.strategy import BaseStrategy, create_strategy
+from touche_rad.core.strategy.drivers.rag import RAGStrategy
+
+
+@functools.lru_cache(maxsize=None)
+def _shared_retriever(es_url: str, index_name: str, evidence_store_path: Optional[str]):
+    # the evidence store is loaded into memory, so it is shared as well
+    return with_evidence_store(
+        get_shared_retriever(es_url, index_name), evidence_store_path
+    )
+
+
+class DebateResources:
+    """
+    Heavyweight objects shared by the `DebateManager`s of a process: the
+    model client, the retriever with its Elasticsearch clients and precomputed
+    evidence, and the stella query encoder behind it.
+
+    Everything is built lazily, once, under a lock, so concurrent sessions
+    can share one container; a manager only holds references to it. Call
+    `warm_up` at startup to load the encoder before the first session needs it.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        es_url: str = DEFAULT_ES_URL,
+        index_name: str = DEFAULT_INDEX_NAME,
+        evidence_store_path: Optional[str] = None,
+        retriever_factory: Optional[Callable[[], Any]] = None,
+    ):
+        """
+        Args:
+            client: Chat and evaluation client, e.g. a `TensorZeroClient`
+            es_url: URL of the Elasticsearch cluster
+            index_name: Name of the index holding the argument embeddings
+            evidence_store_path: Precomputed evidence, `$EVIDENCE_STORE_PATH` if unset
+            retriever_factory: Builds the retriever instead of the shared
+                Elasticsearch one
+        """
+        self.client = client
+        self.es_url = es_url
+        self.index_name = index_name
+        self.evidence_store_path = evidence_store_path
+        self._retriever_factory = retriever_factory or (
+            lambda: _shared_retriever(es_url, index_name, evidence_store_path)
+        )
+        self._lock = threading.Lock()
+        self._retriever = None
+
+    def get_retriever(self):
+        """The retriever, built on first use."""
+        with self._lock:
+            if self._retriever is None:
+                self._retriever = self._retriever_factory()
+            return self._retriever
+
+    def get_encoder(self):
+        """The query encoder of the retriever, loaded on first use."""
+        retriever = self.get_retriever()
+        # unwrap a PrecomputedRetriever
+        retriever = getattr(retriever, "retriever", retriever)
+        return getattr(retriever, "embedding_model", None)
+
+    def warm_up(self) -> "DebateResources":
+        """Build the retriever and load the encoder now rather than on the
+        first request."""
+        self.get_encoder()
+        return self
+
+    def create_strategy(
+        self, name: str, retrieval_mode: str = "text", client=None
+    ) -> BaseStrategy:
+        """A strategy by name; `rag` strategies share this container's retriever."""
+        if name == "rag":
+            rag_debater = RAGDebater(self.get_retriever(), client or self.client)
+            return RAGStrategy(rag_debater, retrieval_mode=retrieval_mode)
+        return create_strategy(name)
@@ -0,0 +1,348 @@
+import gzip
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import wait
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Tuple
+
+from .context import DebateContext
+from .conversation import DEFAULT_TOKEN_BUDGET
+from .machine import LightweightDebateContext
+from .manager import DebateManager
+from .resources import DebateResources
+
+# measured size of an idle DebateManager with its context and state machine,
+# with a transitions.Machine of its own and with the compiled one
+SESSION_OVERHEAD_BYTES = 16 * 1024
+LIGHTWEIGHT_SESSION_OVERHEAD_BYTES = 2 * 1024
+
+
+def estimate_session_bytes(manager: DebateManager) -> int:
+    """Approximate memory held by a session: a fixed overhead plus its text."""
+    context = manager.context
+    overhead = (
+        LIGHTWEIGHT_SESSION_OVERHEAD_BYTES
+        if isinstance(context, LightweightDebateContext)
+        else SESSION_OVERHEAD_BYTES
+    )
+    utterances = context.user_utterances + context.system_utterances
+    return overhead + sum(sys.getsizeof(u) for u in utterances)
+
+
+class SessionNotFound(KeyError):
+    """No session in memory or on disk has the requested id."""
+
+
+@dataclass
+class _Session:
+    manager: DebateManager
+    last_used: float
+    size: int
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    # claimed for eviction: locked, and its snapshot is being written
+    evicting: bool = False
+
+
+class SessionStore:
+    """
+    In-memory debate sessions in least-recently-used order, with bounded size.
+
+    A session is evicted when it has been idle for `idle_timeout` seconds,
+    when there are more than `max_sessions`, or when the estimated memory of
+    all sessions exceeds `max_memory_bytes`, least recently used first. With
+    a `snapshot_dir`, an evicted session is written there as gzipped JSON and
+    loaded again the next time it is requested; without one it is dropped.
+    Sessions whose utterances are still being evaluated are skipped until
+    their ratings are in, so limits can be exceeded briefly. Victims are
+    chosen under the store lock, but their snapshots are written after it is
+    released, so other sessions are not held up by the disk.
+
+    Sessions are keyed by the `debate_id` they were created with, which stays
+    their key when a new debate is started within the session. Use `session`
+    to handle a message, so that one session is never used by two requests
+    at once and is not evicted while in use.
+    """
+
+    def __init__(
+        self,
+        resources: Optional[DebateResources] = None,
+        strategy_name: str = "random",
+        retrieval_mode: str = "text",
+        max_sessions: int = 10_000,
+        idle_timeout: Optional[float] = 30 * 60,
+        max_memory_bytes: Optional[int] = None,
+        snapshot_dir: Optional[str] = None,
+        lightweight: bool = True,
+        token_budget: Optional[int] = DEFAULT_TOKEN_BUDGET,
+    ):
+        self.resources = resources or DebateResources()
+        self.strategy_name = strategy_name
+        self.retrieval_mode = retrieval_mode
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.max_memory_bytes = max_memory_bytes
+        self.snapshot_dir = snapshot_dir
+        self.lightweight = lightweight
+        self.token_budget = token_budget
+        if snapshot_dir:
+            os.makedirs(snapshot_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._memory_bytes = 0
+        # sessions claimed for eviction, which no longer count toward limits
+        self._evicting = 0
+        self.evicted = 0
+        self.rehydrated = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        if session_id in self._sessions:
+            return True
+        try:
+            path = self._snapshot_path(session_id)
+        except SessionNotFound:
+            return False
+        return path is not None and os.path.exists(path)
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._memory_bytes
+
+    def _new_manager(self, context: Optional[DebateContext] = None) -> DebateManager:
+        return DebateManager(
+            strategy_name=self.strategy_name,
+            retrieval_mode=self.retrieval_mode,
+            resources=self.resources,
+            context=context,
+            lightweight=self.lightweight,
+            token_budget=self.token_budget,
+        )
+
+    def _snapshot_path(self, session_id: str) -> Optional[str]:
+        if not self.snapshot_dir:
+            return None
+        # ids come from requests, so only the UUID characters may reach the path
+        if not session_id or any(c not in "0123456789abcdef-" for c in session_id):
+            raise SessionNotFound(session_id)
+        return os.path.join(self.snapshot_dir, f"{session_id}.json.gz")
+
+    def create(self, topic: Optional[str] = None) -> str:
+        """Start a session, optionally on a known topic, and return its id."""
+        manager = self._new_manager()
+        manager.context.topic = topic
+        session_id = str(manager.context.debate_id)
+        with self._lock:
+            self._insert(session_id, manager)
+            victims = self._claim_over_limits()
+        self._evict(victims)
+        return session_id
+
+    def _insert(self, session_id: str, manager: DebateManager):
+        size = estimate_session_bytes(manager)
+        self._sessions[session_id] = _Session(manager, time.monotonic(), size)
+        self._memory_bytes += size
+
+    def _remove(self, session_id: str) -> _Session:
+        session = self._sessions.pop(session_id)
+        if session.evicting:
+            self._evicting -= 1
+        else:
+            self._memory_bytes -= session.size
+        return session
+
+    def _rehydrate(self, session_id: str) -> _Session:
+        """Load an evicted session from its snapshot; called with the lock held."""
+        path = self._snapshot_path(session_id)
+        if path is None or not os.path.exists(path):
+            raise SessionNotFound(session_id)
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        context_cls = LightweightDebateContext if self.lightweight else DebateContext
+        context = context_cls.from_dict(
+            data, client=self.resources.client, token_budget=self.token_budget
+        )
+        self._insert(session_id, self._new_manager(context))
+        os.remove(path)
+        self.rehydrated += 1
+        return self._sessions[session_id]
+
+    def _write_snapshot(self, session_id: str, manager: DebateManager):
+        path = self._snapshot_path(session_id)
+        if path is None:
+            return
+        tmp_path = f"{path}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(manager.context.to_dict(), f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    def _remove_snapshot(self, session_id: str):
+        path = self._snapshot_path(session_id)
+        if path is not None and os.path.exists(path):
+            os.remove(path)
+
+    def _claim(
+        self, session_id: str, allow_pending: bool = False
+    ) -> Optional[_Session]:
+        """Lock a session for eviction unless it is in use or, without
+        `allow_pending`, still being evaluated, in which case it is retried on
+        a later eviction. Called with the store lock held."""
+        session = self._sessions[session_id]
+        if session.evicting or not session.lock.acquire(blocking=False):
+            return None
+        # a snapshot keeps only finished ratings, so let them finish first
+        context = session.manager.context
+        context.flush_evaluations()
+        if context.pending_ratings() and not allow_pending:
+            session.lock.release()
+            return None
+        session.evicting = True
+        self._evicting += 1
+        self._memory_bytes -= session.size
+        return session
+
+    def _unclaim(self, session_id: str, session: _Session):
+        """Keep a claimed session in memory after all; called with the lock held."""
+        if self._sessions.get(session_id) is session:
+            session.evicting = False
+            self._evicting -= 1
+            self._memory_bytes += session.size
+        session.lock.release()
+
+    def _evict(self, victims: List[Tuple[str, _Session]]) -> int:
+        """Write the snapshots of claimed sessions and drop them from memory.
+        Called without the store lock; returns the number evicted."""
+        for i, (session_id, session) in enumerate(victims):
+            try:
+                self._write_snapshot(session_id, session.manager)
+            except BaseException:
+                with self._lock:
+                    for claimed_id, claimed in victims[i:]:
+                        self._unclaim(claimed_id, claimed)
+                raise
+            with self._lock:
+                if self._sessions.get(session_id) is session:
+                    self._remove(session_id)
+                    self.evicted += 1
+                else:
+                    # deleted while its snapshot was written
+                    self._remove_snapshot(session_id)
+            session.lock.release()
+        return len(victims)
+
+    def _over_limits(self) -> bool:
+        return len(self._sessions) - self._evicting > self.max_sessions or (
+            self.max_memory_bytes is not None
+            and self._memory_bytes > self.max_memory_bytes
+        )
+
+    def _claim_over_limits(self) -> List[Tuple[str, _Session]]:
+        """Claim least recently used sessions until the rest fit the limits;
+        called with the lock held."""
+        victims = []
+        for session_id in list(self._sessions):
+            if not self._over_limits():
+                break
+            session = self._claim(session_id)
+            if session is not None:
+                victims.append((session_id, session))
+        return victims
+
+    def evict_idle(self) -> int:
+        """Evict every session idle for longer than `idle_timeout`; returns the count."""
+        if self.idle_timeout is None:
+            return 0
+        deadline = time.monotonic() - self.idle_timeout
+        victims = []
+        with self._lock:
+            # least recently used first, so stop at the first recent session
+            for session_id, session in list(self._sessions.items()):
+                if session.last_used > deadline:
+                    break
+                if self._claim(session_id) is not None:
+                    victims.append((session_id, session))
+        return self._evict(victims)
+
+    @contextmanager
+    def session(self, session_id: str) -> Iterator[DebateManager]:
+        """Lock a session, loading it from its snapshot if it was evicted, and
+        yield its manager.
+
+        Raises:
+            SessionNotFound: if there is no such session
+        """
+        while True:
+            with self._lock:
+                session = self._sessions.get(session_id) or self._rehydrate(session_id)
+                self._sessions.move_to_end(session_id)
+            # wait for other requests to this session without blocking the store
+            session.lock.acquire()
+            with self._lock:
+                if self._sessions.get(session_id) is session:
+                    break
+            # evicted or deleted in the meantime
+            session.lock.release()
+        try:
+            yield session.manager
+        finally:
+            with self._lock:
+                session.last_used = time.monotonic()
+                size = estimate_session_bytes(session.manager)
+                if self._sessions.get(session_id) is session:
+                    self._memory_bytes += size - session.size
+                session.size = size
+                session.lock.release()
+                victims = self._claim_over_limits()
+            self._evict(victims)
+
+    def delete(self, session_id: str) -> bool:
+        """Remove a session and its snapshot; returns whether it existed."""
+        with self._lock:
+            existed = session_id in self._sessions
+            if existed:
+                self._remove(session_id)
+            try:
+                path = self._snapshot_path(session_id)
+            except SessionNotFound:
+                path = None
+            if path is not None and os.path.exists(path):
+                os.remove(path)
+                existed = True
+        return existed
+
+    def snapshot_all(self, wait_timeout: float = 30.0) -> int:
+        """Move every session that is not in use to disk, e.g. at shutdown,
+        waiting up to `wait_timeout` seconds per session for running
+        evaluations, and return how many were written."""
+        if not self.snapshot_dir:
+            return 0
+        claimed = []
+        with self._lock:
+            for session_id in list(self._sessions):
+                session = self._claim(session_id, allow_pending=True)
+                if session is not None:
+                    claimed.append((session_id, session))
+        victims = []
+        for session_id, session in claimed:
+            context = session.manager.context
+            futures = context.user_ratings + context.system_ratings
+            if wait(futures, timeout=wait_timeout).not_done:
+                with self._lock:
+                    self._unclaim(session_id, session)
+            else:
+                victims.append((session_id, session))
+        return self._evict(victims)
+
+    def stats(self) -> dict:
+        return {
+            "sessions": len(self._sessions),
+            "memory_bytes": self._memory_bytes,
+            "evicted": self.evicted,
+            "rehydrated": self.rehydrated,
+        }
@@ -6,14 +6,21 @@ from touche_rad.core.rag_pipeline import RAGDebater
 class RAGStrategy(BaseStrategy):
     """
     Strategy that uses the RAGDebater pipeline to generate system responses
-    grounded in evidence retrieved from Elasticsearch.
+    grounded in evidence retrieved from Elasticsearch. When the debate has a
+    topic, retrieval is restricted to evidence whose `topic_field` matches it.
     """
 
     name = "rag"
 
-    def __init__(self, rag_debater: RAGDebater, retrieval_mode: str = "text"):
+    def __init__(
+        self,
+        rag_debater: RAGDebater,
+        retrieval_mode: str = "text",
+        topic_field: str = "topic",
+    ):
         self.rag_debater = rag_debater
         self.retrieval_mode = retrieval_mode
+        self.topic_field = topic_field
 
     def get_response_type(self, context: DebateContext):
         # For now, just return None or use context to determine type if needed
@@ -23,6 +30,10 @@ class RAGStrategy(BaseStrategy):
         user_message = context.last_user_message
         if not user_message:
             return "Please provide a claim to start the debate."
+        if context.topic and "filters" not in kwargs:
+            kwargs["filters"] = {self.topic_field: context.topic}
+        # the reply becomes a system utterance, so leave the evidence out
+        kwargs.setdefault("include_evidence", False)
         return self.rag_debater.generate_response(
             context, user_message, retrieval_mode=self.retrieval_mode, *args, **kwargs
         )
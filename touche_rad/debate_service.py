@@ -0,0 +1,170 @@
+"""HTTP debate service hosting many concurrent debates.
+
+Example:
+
+    SESSION_SNAPSHOT_DIR=sessions fastapi run touche_rad/debate_service.py --port 8600
+
+Configuration is read from the environment: DEBATE_STRATEGY and
+DEBATE_RETRIEVAL_MODE select the strategy, DEBATE_TOKEN_BUDGET bounds the
+conversation sent to models (0 for no bound), MAX_SESSIONS,
+SESSION_IDLE_SECONDS and SESSION_MEMORY_MB bound the in-memory sessions, and
+SESSION_SNAPSHOT_DIR is where evicted sessions are kept. A TensorZeroClient
+generates and evaluates when TENSORZERO_GATEWAY_URL is set.
+"""
+
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+from dotenv import load_dotenv
+from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+
+from touche_rad.core.conversation import DEFAULT_TOKEN_BUDGET
+from touche_rad.core.resources import DebateResources
+from touche_rad.core.sessions import SessionNotFound, SessionStore
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+EVICTION_INTERVAL_SECONDS = 60
+
+
+class CreateDebateRequest(BaseModel):
+    # restricts retrieval to evidence on this topic
+    topic: Optional[str] = None
+
+
+class MessageRequest(BaseModel):
+    content: str
+
+
+class MessageResponse(BaseModel):
+    debate_id: str
+    response: str
+    state: str
+    current_turn: int
+
+
+class DebateResponse(BaseModel):
+    debate_id: str
+    topic: Optional[str]
+    state: str
+    current_turn: int
+    max_turns: int
+    conversation: List[str]
+
+
+def create_store() -> SessionStore:
+    client = None
+    if os.environ.get("TENSORZERO_GATEWAY_URL"):
+        from touche_rad.ai.tensorzero import TensorZeroClient
+
+        client = TensorZeroClient(os.environ["TENSORZERO_GATEWAY_URL"])
+    memory_mb = os.environ.get("SESSION_MEMORY_MB")
+    token_budget = int(os.environ.get("DEBATE_TOKEN_BUDGET", DEFAULT_TOKEN_BUDGET))
+    return SessionStore(
+        resources=DebateResources(client=client),
+        strategy_name=os.environ.get("DEBATE_STRATEGY", "random"),
+        retrieval_mode=os.environ.get("DEBATE_RETRIEVAL_MODE", "text"),
+        max_sessions=int(os.environ.get("MAX_SESSIONS", 10_000)),
+        idle_timeout=float(os.environ.get("SESSION_IDLE_SECONDS", 30 * 60)),
+        max_memory_bytes=int(float(memory_mb) * 2**20) if memory_mb else None,
+        snapshot_dir=os.environ.get("SESSION_SNAPSHOT_DIR"),
+        token_budget=token_budget or None,
+    )
+
+
+store: Optional[SessionStore] = None
+
+
+def get_store() -> SessionStore:
+    global store
+    if store is None:
+        store = create_store()
+    return store
+
+
+async def evict_periodically(interval: float = EVICTION_INTERVAL_SECONDS):
+    while True:
+        await asyncio.sleep(interval)
+        evicted = await run_in_threadpool(get_store().evict_idle)
+        if evicted:
+            logger.info(f"Evicted {evicted} idle debate sessions")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if get_store().strategy_name == "rag":
+        await run_in_threadpool(get_store().resources.warm_up)
+    task = asyncio.create_task(evict_periodically())
+    yield
+    task.cancel()
+    # keep the open debates across restarts
+    await run_in_threadpool(get_store().snapshot_all)
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+def _debate_response(session_id: str, manager) -> DebateResponse:
+    context = manager.context
+    return DebateResponse(
+        debate_id=session_id,
+        topic=context.topic,
+        state=context.state,
+        current_turn=context.current_turn,
+        max_turns=context.max_turns,
+        conversation=[str(u) for u in context.get_conversation()],
+    )
+
+
+@app.post("/debates")
+def create_debate(request: Optional[CreateDebateRequest] = None) -> DebateResponse:
+    session_id = get_store().create(topic=request.topic if request else None)
+    with get_store().session(session_id) as manager:
+        return _debate_response(session_id, manager)
+
+
+@app.get("/debates/{debate_id}")
+def get_debate(debate_id: str) -> DebateResponse:
+    try:
+        with get_store().session(debate_id) as manager:
+            return _debate_response(debate_id, manager)
+    except SessionNotFound:
+        raise HTTPException(status_code=404, detail="Debate not found")
+
+
+@app.post("/debates/{debate_id}/messages")
+def post_message(debate_id: str, request: MessageRequest) -> MessageResponse:
+    try:
+        with get_store().session(debate_id) as manager:
+            response = manager.handle_user_message(request.content)
+            return MessageResponse(
+                debate_id=debate_id,
+                response=response,
+                state=manager.context.state,
+                current_turn=manager.context.current_turn,
+            )
+    except SessionNotFound:
+        raise HTTPException(status_code=404, detail="Debate not found")
+
+
+@app.delete("/debates/{debate_id}")
+def delete_debate(debate_id: str):
+    if not get_store().delete(debate_id):
+        raise HTTPException(status_code=404, detail="Debate not found")
+    return {"deleted": debate_id}
+
+
+@app.get("/stats")
+def stats():
+    return get_store().stats()
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
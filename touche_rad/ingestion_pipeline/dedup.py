@@ -0,0 +1,121 @@
+"""Near-duplicate detection with MinHash signatures and LSH banding."""
+
+import threading
+import zlib
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+_PRIME = (1 << 31) - 1
+_EMPTY = np.uint32(_PRIME)
+
+
+def shingle_hashes(text: str, size: int = 5) -> np.ndarray:
+    """Hashes of the distinct character shingles of the normalized text."""
+    text = " ".join(text.lower().split())
+    if len(text) <= size:
+        shingles = {text} if text else set()
+    else:
+        shingles = {text[i : i + size] for i in range(len(text) - size + 1)}
+    return np.fromiter(
+        (zlib.crc32(s.encode("utf-8")) & _PRIME for s in shingles),
+        dtype=np.uint64,
+        count=len(shingles),
+    )
+
+
+def lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """Bands and rows per band with the highest S-curve threshold (1/b)^(1/r)
+    that is not above `threshold`, so similar pairs are rarely missed and
+    candidates are verified against the signatures anyway."""
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if (1 / bands) ** (1 / rows) <= threshold:
+            best = (bands, rows)
+    return best
+
+
+class NearDuplicateFilter:
+    """
+    Drop near-duplicate texts, keeping the first text of every cluster.
+
+    Texts are compared by the Jaccard similarity of their character shingles,
+    estimated from MinHash signatures. LSH banding proposes candidate pairs
+    and a pair is merged when its estimated similarity reaches `threshold`;
+    clusters are the connected components of merged pairs.
+
+    Each call to `filter` deduplicates one list, such as the chunks of a
+    topic. Counts of seen and removed texts accumulate across calls.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        num_perm: int = 128,
+        shingle_size: int = 5,
+        seed: int = 1,
+    ):
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, size=(num_perm, 1), dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=(num_perm, 1), dtype=np.uint64)
+        self._lock = threading.Lock()
+        self.seen = 0
+        self.removed = 0
+
+    def signatures(self, texts: List[str]) -> np.ndarray:
+        """MinHash signature of every text, one row of `num_perm` values each."""
+        signatures = np.full((len(texts), self.num_perm), _EMPTY, dtype=np.uint32)
+        for i, text in enumerate(texts):
+            hashes = shingle_hashes(text, self.shingle_size)
+            if len(hashes):
+                signatures[i] = ((self._a * hashes + self._b) % _PRIME).min(axis=1)
+        return signatures
+
+    def clusters(self, texts: List[str]) -> np.ndarray:
+        """Cluster label of every text: the index of the first text of its cluster."""
+        signatures = self.signatures(texts)
+        parent = list(range(len(texts)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for band in range(self.bands):
+            columns = slice(band * self.rows, (band + 1) * self.rows)
+            buckets: Dict[bytes, int] = {}
+            for i, key in enumerate(signatures[:, columns]):
+                first = buckets.setdefault(key.tobytes(), i)
+                if first == i:
+                    continue
+                a, b = find(first), find(i)
+                if a == b:
+                    continue
+                similarity = np.mean(signatures[first] == signatures[i])
+                if similarity >= self.threshold:
+                    parent[max(a, b)] = min(a, b)
+        return np.array([find(i) for i in range(len(texts))], dtype=np.int64)
+
+    def filter(self, texts: List[str]) -> List[str]:
+        """Return the texts without near-duplicates, in their original order."""
+        labels = self.clusters(texts)
+        kept = [text for i, text in enumerate(texts) if labels[i] == i]
+        with self._lock:
+            self.seen += len(texts)
+            self.removed += len(texts) - len(kept)
+        return kept
+
+    def stats(self) -> dict:
+        return {
+            "seen": self.seen,
+            "removed": self.removed,
+            "removed_fraction": self.removed / self.seen if self.seen else 0.0,
+        }
@@ -1,21 +1,61 @@
 """Text preprocessing utilities for debate arguments."""
 
 import re
-from typing import List, Optional
-from transformers import AutoTokenizer
+from typing import Dict, List, Optional
+
+import pandas as pd
+from touche_rad.ai.registry import get_tokenizer, release, tokenizer_key
+
+TOKENIZER_NAME = "sentence-transformers/all-mpnet-base-v2"
+
+# Bump when a change to cleaning, sentence splitting or chunking changes the
+# chunks produced for the same input, so that they get embedded again.
+CHUNKING_VERSION = 1
 
 
 class TextPreprocessor:
     def __init__(self, max_tokens: int = 384):
         """Initialize preprocessor with token limit."""
         self.max_tokens = max_tokens
-        self.tokenizer = AutoTokenizer.from_pretrained(
-            "sentence-transformers/all-mpnet-base-v2"
-        )
+        self.tokenizer = get_tokenizer(TOKENIZER_NAME)
+        self._num_special_tokens = self.tokenizer.num_special_tokens_to_add()
+        self._token_lengths: Dict[str, int] = {}
+
+    def get_token_lengths(self, texts: List[str]) -> List[int]:
+        """Get number of tokens for each text, including special tokens.
+
+        Texts not seen before are tokenized in one batched call without building
+        special tokens, masks or tensors; lengths are memoized until
+        `clear_token_cache` is called.
+        """
+        # a concurrent clear_token_cache swaps the dict, so keep using this one
+        cache = self._token_lengths
+        missing = [t for t in dict.fromkeys(texts) if t not in cache]
+        if missing:
+            encoded = self.tokenizer(
+                missing,
+                add_special_tokens=False,
+                return_attention_mask=False,
+                return_token_type_ids=False,
+                verbose=False,
+            )["input_ids"]
+            for text, ids in zip(missing, encoded):
+                cache[text] = len(ids) + self._num_special_tokens
+        return [cache[t] for t in texts]
 
     def get_token_length(self, text: str) -> int:
         """Get number of tokens in text."""
-        return len(self.tokenizer.encode(text))
+        return self.get_token_lengths([text])[0]
+
+    def clear_token_cache(self) -> None:
+        """Forget memoized token lengths, e.g. at the end of an ingestion run."""
+        self._token_lengths = {}
+
+    def close(self) -> None:
+        """Give the tokenizer back to the registry, so it can be unloaded."""
+        if self.tokenizer is not None:
+            release(tokenizer_key(TOKENIZER_NAME))
+            self.tokenizer = None
 
     def clean_text(self, text: str) -> str:
         """Clean and normalize text."""
@@ -28,16 +68,20 @@ class TextPreprocessor:
         sentences = re.split(r"[.!?]\s+", text)
         return [self.clean_text(sent) for sent in sentences if sent.strip()]
 
-    def find_optimal_chunk_size(self, sentences: List[str]) -> int:
+    def find_optimal_chunk_size(
+        self, sentences: List[str], token_lengths: Optional[List[int]] = None
+    ) -> int:
         """Find optimal number of sentences per chunk based on token distribution.
 
         Args:
             sentences: List of sentences to analyze
+            token_lengths: Precomputed token length of each sentence
 
         Returns:
             Recommended number of sentences per chunk
         """
-        token_lengths = [self.get_token_length(sent) for sent in sentences]
+        if token_lengths is None:
+            token_lengths = self.get_token_lengths(sentences)
         avg_tokens = sum(token_lengths) / len(token_lengths) if token_lengths else 0
 
         # Calculate how many average-length sentences would fit within token limit
@@ -48,13 +92,17 @@ class TextPreprocessor:
         return max(1, min(recommended_size, 10))  # Cap between 1 and 10 sentences
 
     def chunk_sentences(
-        self, sentences: List[str], target_size: Optional[int] = None
+        self,
+        sentences: List[str],
+        target_size: Optional[int] = None,
+        token_lengths: Optional[List[int]] = None,
     ) -> List[str]:
         """Combine sentences into chunks while respecting token limit.
 
         Args:
             sentences: List of sentences to chunk
             target_size: Optional target chunk size (if None, will be calculated)
+            token_lengths: Precomputed token length of each sentence
 
         Returns:
             List of chunked text, each within token limit
@@ -62,17 +110,18 @@ class TextPreprocessor:
         if not sentences:
             return []
 
+        if token_lengths is None:
+            token_lengths = self.get_token_lengths(sentences)
+
         # Determine optimal chunk size if not provided
         if target_size is None:
-            target_size = self.find_optimal_chunk_size(sentences)
+            target_size = self.find_optimal_chunk_size(sentences, token_lengths)
 
         chunks = []
         current_chunk = []
         current_tokens = 0
 
-        for sentence in sentences:
-            sentence_tokens = self.get_token_length(sentence)
-
+        for sentence, sentence_tokens in zip(sentences, token_lengths):
             # If adding this sentence would exceed limit, save current chunk and start new one
             if current_tokens + sentence_tokens > self.max_tokens:
                 if current_chunk:
@@ -112,7 +161,7 @@ class TextPreprocessor:
         sentences = self.split_into_sentences(cleaned_text)
 
         # Collect stats on individual sentences
-        token_lengths = [self.get_token_length(sent) for sent in sentences]
+        token_lengths = self.get_token_lengths(sentences)
         stats = {
             "num_sentences": len(sentences),
             "avg_tokens_per_sentence": sum(token_lengths) / len(sentences)
@@ -126,8 +175,8 @@ class TextPreprocessor:
 
         # Chunk sentences if requested
         if chunk_size:
-            chunks = self.chunk_sentences(sentences, chunk_size)
-            chunk_tokens = [self.get_token_length(chunk) for chunk in chunks]
+            chunks = self.chunk_sentences(sentences, chunk_size, token_lengths)
+            chunk_tokens = self.get_token_lengths(chunks)
             stats.update(
                 {
                     "num_chunks": len(chunks),
@@ -148,3 +197,29 @@ class TextPreprocessor:
         if chunk_size:
             return self.chunk_sentences(sentences, chunk_size)
         return sentences
+
+
+def split_sentences(texts: pd.Series) -> pd.Series:
+    """Vectorized `TextPreprocessor.preprocess` without chunking.
+
+    Returns a list of cleaned sentences for every text, empty for missing
+    texts.
+    """
+    index = texts.index
+    cleaned = (
+        texts.reset_index(drop=True)
+        .fillna("")
+        .astype(str)
+        .str.split()
+        .str.join(" ")
+        .str.replace(r"[^a-zA-Z0-9\s.,!?]", "", regex=True)
+        .str.strip()
+    )
+    pieces = cleaned.str.split(r"[.!?]\s+", regex=True).explode()
+    # removed characters can leave runs of spaces, which each sentence collapses
+    pieces = pieces.str.split().str.join(" ")
+    pieces = pieces[pieces.notna() & (pieces != "")]
+    sentences = pieces.groupby(level=0).agg(list).reindex(cleaned.index)
+    sentences = sentences.map(lambda s: s if isinstance(s, list) else [])
+    sentences.index = index
+    return sentences
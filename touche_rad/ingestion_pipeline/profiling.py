@@ -0,0 +1,174 @@
+"""Whole-dataset profile of an ingestion input with DuckDB.
+
+Example:
+
+    python -m touche_rad.ingestion_pipeline.profiling data/data.csv --max-tokens 384
+
+Row counts and character lengths are aggregated by DuckDB in SQL. Sentences
+are then streamed out in Arrow batches, split with the same vectorized rules
+as the pipeline and tokenized in batches, so memory stays flat and the
+token statistics match what ingestion will see.
+"""
+
+import argparse
+import json
+import os
+from typing import Dict, List, Optional
+
+import duckdb
+import numpy as np
+
+from .preprocessing import TextPreprocessor, split_sentences
+from .sources import REQUIRED_COLUMNS, is_parquet
+
+
+def _source_sql(path: str) -> str:
+    quoted = path.replace("'", "''")
+    if os.path.isdir(path):
+        return f"read_parquet('{quoted.rstrip('/')}/**/*.parquet')"
+    if is_parquet(path):
+        return f"read_parquet('{quoted}')"
+    return f"read_csv('{quoted}', header = true, all_varchar = true)"
+
+
+def _add_counts(counts: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Add the histogram of the non-negative integers `values` to `counts`."""
+    if len(values) == 0:
+        return counts
+    new = np.bincount(values)
+    if len(new) > len(counts):
+        counts = np.pad(counts, (0, len(new) - len(counts)))
+    counts[: len(new)] += new
+    return counts
+
+
+def histogram_summary(counts: np.ndarray) -> Dict[str, float]:
+    """Mean, percentiles and max of the values whose frequencies are `counts`."""
+    total = counts.sum()
+    if total == 0:
+        return {"mean": 0.0, "p50": 0, "p90": 0, "p99": 0, "max": 0}
+    values = np.arange(len(counts))
+    cumulative = np.cumsum(counts)
+    percentile = {
+        f"p{q}": int(np.searchsorted(cumulative, total * q / 100)) for q in (50, 90, 99)
+    }
+    return {
+        "mean": float((values * counts).sum() / total),
+        **percentile,
+        "max": int(np.flatnonzero(counts)[-1]),
+    }
+
+
+def profile_dataset(
+    path: str,
+    max_tokens: int = 384,
+    preprocessor: Optional[TextPreprocessor] = None,
+    batch_rows: int = 50_000,
+) -> dict:
+    """Profile a CSV or Parquet input with `id`, `topic` and `sentence` columns.
+
+    Args:
+        path: CSV file or Parquet file or directory
+        max_tokens: Token limit used to count over-long sentences
+        preprocessor: Preprocessor whose tokenizer counts the tokens
+        batch_rows: Rows per Arrow batch streamed out of DuckDB
+
+    Returns:
+        Row, topic, sentence and token statistics for the whole input
+    """
+    preprocessor = preprocessor or TextPreprocessor(max_tokens=max_tokens)
+    source = _source_sql(path)
+    with duckdb.connect() as conn:
+        columns = [
+            row[0]
+            for row in conn.execute(f"DESCRIBE SELECT * FROM {source}").fetchall()
+        ]
+        missing_cols = [col for col in REQUIRED_COLUMNS if col not in columns]
+        if missing_cols:
+            raise ValueError(f"Missing required columns: {missing_cols}")
+
+        rows, empty_rows, topics, mean, p50, p90, p99, longest = conn.execute(
+            f"""
+            WITH src AS (SELECT id, length(CAST(sentence AS VARCHAR)) AS n FROM {source})
+            SELECT count(*), count(*) FILTER (WHERE n IS NULL), count(DISTINCT id),
+                   avg(n), quantile_disc(n, 0.5), quantile_disc(n, 0.9),
+                   quantile_disc(n, 0.99), max(n)
+            FROM src
+            """
+        ).fetchone()
+        chars_per_row = {
+            "mean": float(mean or 0),
+            "p50": int(p50 or 0),
+            "p90": int(p90 or 0),
+            "p99": int(p99 or 0),
+            "max": int(longest or 0),
+        }
+
+        sentence_counts = np.zeros(1, dtype=np.int64)
+        token_counts = np.zeros(max_tokens + 2, dtype=np.int64)
+        reader = conn.execute(
+            f"SELECT CAST(sentence AS VARCHAR) AS sentence FROM {source} "
+            "WHERE sentence IS NOT NULL"
+        ).to_arrow_reader(batch_rows)
+        for batch in reader:
+            split = split_sentences(batch.to_pandas()["sentence"])
+            sentence_counts = _add_counts(
+                sentence_counts, split.str.len().to_numpy(dtype=np.int64)
+            )
+            lengths = preprocessor.get_token_lengths(split.explode().dropna().tolist())
+            preprocessor.clear_token_cache()
+            token_counts = _add_counts(
+                token_counts, np.asarray(lengths, dtype=np.int64)
+            )
+
+    return {
+        "rows": int(rows),
+        "rows_without_sentence": int(empty_rows),
+        "topics": int(topics),
+        "chars_per_row": chars_per_row,
+        "total_sentences": int(token_counts.sum()),
+        "sentences_per_row": histogram_summary(sentence_counts),
+        "tokens_per_sentence": histogram_summary(token_counts),
+        "max_tokens": max_tokens,
+        "sentences_exceeding_limit": int(token_counts[max_tokens + 1 :].sum()),
+    }
+
+
+def format_profile(profile: dict) -> str:
+    lines = [
+        f"Rows: {profile['rows']} ({profile['rows_without_sentence']} without text)",
+        f"Topics: {profile['topics']}",
+        f"Sentences: {profile['total_sentences']} "
+        f"({profile['sentences_exceeding_limit']} over {profile['max_tokens']} tokens)",
+    ]
+    for key in ("chars_per_row", "sentences_per_row", "tokens_per_sentence"):
+        s = profile[key]
+        lines.append(
+            f"{key.replace('_', ' ').capitalize()}: mean {s['mean']:.1f}, "
+            f"p50 {s['p50']}, p90 {s['p90']}, p99 {s['p99']}, max {s['max']}"
+        )
+    return "\n".join(lines)
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="CSV or Parquet input with id, topic, sentence")
+    parser.add_argument("--max-tokens", type=int, default=384)
+    parser.add_argument("--batch-rows", type=int, default=50_000)
+    parser.add_argument("--output", help="also write the profile as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    profile = profile_dataset(
+        args.path, max_tokens=args.max_tokens, batch_rows=args.batch_rows
+    )
+    print(format_profile(profile))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(profile, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Streaming readers that yield the input one topic at a time."""
+
+import os
+from typing import Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+REQUIRED_COLUMNS = ["id", "topic", "sentence"]
+
+
+def _check_columns(path: str, columns) -> None:
+    missing_cols = [col for col in REQUIRED_COLUMNS if col not in columns]
+    if missing_cols:
+        raise ValueError(f"Missing required columns in {path}: {missing_cols}")
+
+
+def is_parquet(path: str) -> bool:
+    return os.path.isdir(path) or path.endswith((".parquet", ".pq"))
+
+
+def iter_record_batches(path: str, batch_rows: int = 50_000) -> Iterator[pd.DataFrame]:
+    """Read the id, topic and sentence columns of a CSV or Parquet input in batches."""
+    if is_parquet(path):
+        import pyarrow.dataset as ds
+
+        dataset = ds.dataset(path, format="parquet")
+        _check_columns(path, dataset.schema.names)
+        for batch in dataset.to_batches(
+            columns=REQUIRED_COLUMNS, batch_size=batch_rows
+        ):
+            yield batch.to_pandas()
+    else:
+        _check_columns(path, pd.read_csv(path, nrows=0).columns)
+        yield from pd.read_csv(
+            path, usecols=REQUIRED_COLUMNS, dtype={"id": str}, chunksize=batch_rows
+        )
+
+
+def iter_topics(
+    path: str, batch_rows: int = 50_000
+) -> Iterator[Tuple[str, str, List[str]]]:
+    """Yield `(topic_id, topic, sentences)` for each topic of a CSV or Parquet input.
+
+    Only `batch_rows` rows plus the sentences of the current topic are held in
+    memory. A topic is yielded as soon as the id changes, so the rows of each
+    topic must be contiguous; a topic that shows up again later raises a
+    `ValueError` instead of being split in two.
+    """
+    finished = set()
+    current_id, topic, sentences = None, None, []
+    for frame in iter_record_batches(path, batch_rows):
+        ids = frame["id"].astype(str).to_numpy()
+        boundaries = (np.flatnonzero(ids[1:] != ids[:-1]) + 1).tolist()
+        for start, end in zip([0] + boundaries, boundaries + [len(ids)]):
+            topic_id = ids[start]
+            if topic_id != current_id:
+                if current_id is not None:
+                    yield current_id, topic, sentences
+                    finished.add(current_id)
+                if topic_id in finished:
+                    raise ValueError(
+                        f"Rows of topic {topic_id} are not contiguous in {path}, "
+                        "sort the input by id before streaming it"
+                    )
+                current_id, topic, sentences = topic_id, frame["topic"].iloc[start], []
+            sentences.extend(frame["sentence"].iloc[start:end].dropna().astype(str))
+    if current_id is not None:
+        yield current_id, topic, sentences
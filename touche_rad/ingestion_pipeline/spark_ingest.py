@@ -0,0 +1,187 @@
+"""Distributed ingestion job on Spark.
+
+Example:
+
+    python -m touche_rad.ingestion_pipeline.spark_ingest data/data.csv embedded_data
+
+Sentences are cleaned and split with a pandas UDF, chunked per topic with
+`applyInPandas` and embedded with `mapInPandas`, where every Python worker
+loads the model once and reuses it for all of its tasks. The output is a
+directory of Parquet part files with the columns read by `load_embeddings`.
+Near-duplicate chunks are not removed, unlike with the `dedup_threshold` of
+`DebateIngestionPipeline`.
+"""
+
+import argparse
+import os
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+import torch
+
+from touche_rad.ingestion_pipeline.embeddings import ArgumentEmbedder
+from touche_rad.ingestion_pipeline.ingest import chunk_ids, content_hash
+from touche_rad.ingestion_pipeline.preprocessing import (
+    TextPreprocessor,
+    split_sentences,
+)
+from touche_rad.ingestion_pipeline.sources import REQUIRED_COLUMNS, is_parquet
+
+CHUNK_SCHEMA = (
+    "id string, text string, topic_id string, topic string, num_sentences int"
+)
+OUTPUT_SCHEMA = CHUNK_SCHEMA + ", embedding array<float>"
+
+_executor_preprocessors: Dict[int, TextPreprocessor] = {}
+_executor_embedders: Dict[str, ArgumentEmbedder] = {}
+
+
+def _executor_preprocessor(max_tokens: int) -> TextPreprocessor:
+    if max_tokens not in _executor_preprocessors:
+        _executor_preprocessors[max_tokens] = TextPreprocessor(max_tokens=max_tokens)
+    return _executor_preprocessors[max_tokens]
+
+
+def _executor_embedder(model_name: str, threads_per_task: int) -> ArgumentEmbedder:
+    # Python workers are reused across tasks, so this loads the model once per
+    # worker process; the thread cap keeps concurrent tasks from oversubscribing
+    if model_name not in _executor_embedders:
+        os.environ["TOKENIZERS_PARALLELISM"] = "false"
+        torch.set_num_threads(threads_per_task)
+        _executor_embedders[model_name] = ArgumentEmbedder(model_name)
+    return _executor_embedders[model_name]
+
+
+def chunk_topic(pdf: pd.DataFrame, model_name: str, max_tokens: int) -> pd.DataFrame:
+    """Chunk the sentences of one topic, in input order, into output rows.
+
+    `pdf` holds the `id`, `topic`, `row_order` and `sentences` columns of
+    every input row of the topic. Row ids match those of
+    `DebateIngestionPipeline.ingest_stream` for the same model and limit only
+    when that runs without `dedup_threshold`: this job does not drop
+    near-duplicate chunks, so it keeps chunks the pipeline would remove.
+    """
+    pdf = pdf.sort_values("row_order")
+    sentences = [s for row in pdf["sentences"] for s in row]
+    preprocessor = _executor_preprocessor(max_tokens)
+    chunks = preprocessor.chunk_sentences(sentences)
+    # the preprocessor lives as long as the worker, so keep its memo per topic
+    preprocessor.clear_token_cache()
+    topic_id = str(pdf["id"].iloc[0])
+    hashes = [content_hash(chunk, model_name, max_tokens) for chunk in chunks]
+    return pd.DataFrame(
+        {
+            "id": chunk_ids(topic_id, hashes),
+            "text": chunks,
+            "topic_id": topic_id,
+            "topic": pdf["topic"].iloc[0],
+            "num_sentences": [len(chunk.split(".")) for chunk in chunks],
+        },
+        columns=["id", "text", "topic_id", "topic", "num_sentences"],
+    )
+
+
+def embed_partitions(
+    batches: Iterator[pd.DataFrame], model_name: str, threads_per_task: int = 1
+) -> Iterator[pd.DataFrame]:
+    """Add an `embedding` column to every Arrow batch of chunks."""
+    embedder = _executor_embedder(model_name, threads_per_task)
+    for pdf in batches:
+        embeddings = embedder.embed_texts(pdf["text"].tolist(), show_progress=False)
+        yield pdf.assign(embedding=list(embeddings.astype(np.float32)))
+
+
+def run_spark_ingest(
+    spark,
+    input_path: str,
+    output_path: str,
+    model_name: str = "all-mpnet-base-v2",
+    max_tokens: int = 384,
+    embed_batch_rows: int = 512,
+    threads_per_task: int = 1,
+    num_output_files: Optional[int] = None,
+):
+    """Preprocess, chunk and embed a CSV or Parquet input into Parquet files.
+
+    Args:
+        spark: Spark session, e.g. from `touche_rad.spark.get_spark`
+        input_path: CSV file or Parquet file or directory with the
+            id, topic and sentence columns
+        output_path: Directory for the Parquet part files, overwritten
+        model_name: Name of the sentence-transformers model to use
+        max_tokens: Maximum number of tokens allowed per chunk
+        embed_batch_rows: Chunks per Arrow batch handed to the embedding stage
+        threads_per_task: Torch threads of each concurrent embedding task
+        num_output_files: If given, repartition by topic into this many files
+    """
+    from pyspark.sql import functions as F
+    from pyspark.sql.types import ArrayType, StringType
+
+    if is_parquet(input_path):
+        df = spark.read.parquet(input_path)
+    else:
+        df = spark.read.csv(input_path, header=True, multiLine=True, escape='"')
+    missing_cols = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing_cols:
+        raise ValueError(f"Missing required columns: {missing_cols}")
+
+    split_udf = F.pandas_udf(split_sentences, ArrayType(StringType()))
+    rows = df.select(
+        F.col("id").cast("string").alias("id"),
+        "topic",
+        F.monotonically_increasing_id().alias("row_order"),
+        split_udf("sentence").alias("sentences"),
+    )
+
+    def chunk(pdf: pd.DataFrame) -> pd.DataFrame:
+        return chunk_topic(pdf, model_name, max_tokens)
+
+    def embed(batches: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        return embed_partitions(batches, model_name, threads_per_task)
+
+    spark.conf.set("spark.sql.execution.arrow.maxRecordsPerBatch", embed_batch_rows)
+    chunks = rows.groupBy("id").applyInPandas(chunk, CHUNK_SCHEMA)
+    embedded = chunks.mapInPandas(embed, OUTPUT_SCHEMA)
+    if num_output_files:
+        embedded = embedded.repartition(num_output_files, "topic_id")
+    # topic_id stays a column because load_embeddings reads it from the files,
+    # so the output is split into part files rather than partitioned by topic
+    embedded.sortWithinPartitions("topic_id").write.mode("overwrite").parquet(
+        output_path
+    )
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="CSV or Parquet input with id, topic, sentence")
+    parser.add_argument("output", help="directory for the Parquet output")
+    parser.add_argument("--model", default="all-mpnet-base-v2")
+    parser.add_argument("--max-tokens", type=int, default=384)
+    parser.add_argument("--embed-batch-rows", type=int, default=512)
+    parser.add_argument("--threads-per-task", type=int, default=1)
+    parser.add_argument("--num-output-files", type=int)
+    parser.add_argument("--cores", type=int, default=os.cpu_count())
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    from touche_rad.spark import spark_resource
+
+    args = parse_args(argv)
+    with spark_resource(cores=args.cores, app_name="touche-ingest") as spark:
+        run_spark_ingest(
+            spark,
+            args.input,
+            args.output,
+            model_name=args.model,
+            max_tokens=args.max_tokens,
+            embed_batch_rows=args.embed_batch_rows,
+            threads_per_task=args.threads_per_task,
+            num_output_files=args.num_output_files,
+        )
+    print(f"Embeddings written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
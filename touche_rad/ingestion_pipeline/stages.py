@@ -0,0 +1,106 @@
+"""Threaded stage runner with bounded queues between stages."""
+
+import queue
+import threading
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+_DONE = object()
+
+StageFn = Callable[[Iterator], Iterable]
+
+
+class StagedPipeline:
+    """Run a chain of stages concurrently, connected by bounded queues.
+
+    Each stage is a function that takes an iterator of input items and yields
+    output items, so a stage can map, filter or batch. A stage may run on
+    several worker threads that share its input queue. Because the queues are
+    bounded, a slow stage blocks the stages upstream of it and memory stays
+    flat. The last stage is a sink and its outputs are discarded.
+
+    If a stage raises, every stage is stopped and `run` re-raises the error.
+    """
+
+    def __init__(self, maxsize: int = 8):
+        self.maxsize = maxsize
+        self.stages: List[Tuple[StageFn, int, str]] = []
+        self._abort = threading.Event()
+        self._error: Optional[BaseException] = None
+
+    def add_stage(
+        self, fn: StageFn, workers: int = 1, name: Optional[str] = None
+    ) -> "StagedPipeline":
+        self.stages.append((fn, workers, name or fn.__name__))
+        return self
+
+    def _put(self, q: queue.Queue, item) -> bool:
+        while not self._abort.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _iter(self, q: queue.Queue) -> Iterator:
+        while not self._abort.is_set():
+            try:
+                item = q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is _DONE:
+                # hand the sentinel on to the other workers of this stage
+                self._put(q, _DONE)
+                return
+            yield item
+
+    def _fail(self, error: BaseException) -> None:
+        if self._error is None:
+            self._error = error
+        self._abort.set()
+
+    def run(self, source: Iterable) -> None:
+        if not self.stages:
+            raise ValueError("The pipeline has no stages.")
+        self._abort.clear()
+        self._error = None
+        queues = [queue.Queue(self.maxsize) for _ in self.stages]
+        threads = []
+
+        for i, (fn, workers, name) in enumerate(self.stages):
+            q_in = queues[i]
+            q_out = queues[i + 1] if i + 1 < len(queues) else None
+            remaining = [workers]
+            lock = threading.Lock()
+
+            def work(fn=fn, q_in=q_in, q_out=q_out, remaining=remaining, lock=lock):
+                try:
+                    for item in fn(self._iter(q_in)):
+                        if q_out is not None and not self._put(q_out, item):
+                            return
+                except BaseException as e:
+                    self._fail(e)
+                finally:
+                    with lock:
+                        remaining[0] -= 1
+                        last = remaining[0] == 0
+                    if last and q_out is not None:
+                        self._put(q_out, _DONE)
+
+            for w in range(workers):
+                thread = threading.Thread(target=work, name=f"{name}-{w}", daemon=True)
+                thread.start()
+                threads.append(thread)
+
+        try:
+            for item in source:
+                if not self._put(queues[0], item):
+                    break
+            self._put(queues[0], _DONE)
+        except BaseException as e:
+            self._fail(e)
+
+        for thread in threads:
+            thread.join()
+        if self._error is not None:
+            raise self._error
@@ -0,0 +1,396 @@
+"""Bulk COPY writer for the embeddings table in PostgreSQL."""
+
+import io
+import struct
+import uuid
+from typing import Iterable, List, Optional, Sequence, Set
+
+import numpy as np
+from sqlalchemy import text
+
+# storage type for the embedding column -> (element OID, numpy big-endian dtype)
+VECTOR_TYPES = {
+    "float8[]": (701, ">f8"),
+    "float4[]": (700, ">f4"),
+    "vector": (None, ">f4"),
+}
+
+COLUMNS = ["id", "embedding", "text", "topic_id", "topic", "num_sentences", "is_chunk"]
+
+_BINARY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+_BINARY_TRAILER = struct.pack(">h", -1)
+
+
+def embeddings_table_ddl(
+    table: str = "embeddings", vector_type: str = "float8[]"
+) -> str:
+    if vector_type not in VECTOR_TYPES:
+        raise ValueError(
+            f"Unknown vector type {vector_type}, must be one of {list(VECTOR_TYPES)}"
+        )
+    return f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            id UUID PRIMARY KEY,
+            embedding {vector_type.upper()},
+            text TEXT,
+            topic_id TEXT,
+            topic TEXT,
+            num_sentences INTEGER,
+            is_chunk BOOLEAN
+        )
+    """
+
+
+def progress_table_ddl(table: str = "ingestion_progress") -> str:
+    return f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            source TEXT NOT NULL,
+            topic_id TEXT NOT NULL,
+            num_rows INTEGER,
+            committed_at TIMESTAMPTZ DEFAULT now(),
+            PRIMARY KEY (source, topic_id)
+        )
+    """
+
+
+def manifest_table_ddl(table: str = "embedding_manifest") -> List[str]:
+    return [
+        f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            id UUID PRIMARY KEY,
+            source TEXT NOT NULL,
+            topic_id TEXT NOT NULL,
+            content_hash TEXT NOT NULL
+        )
+        """,
+        f"CREATE INDEX IF NOT EXISTS {table}_topic_idx ON {table} (source, topic_id)",
+    ]
+
+
+def encode_vectors_binary(embeddings: np.ndarray, vector_type: str) -> List[bytes]:
+    """Encode each row of `embeddings` as a binary COPY field value.
+
+    Arrays use the PostgreSQL array wire format, with a length prefix on every
+    element; pgvector uses its own dimension header followed by float4 values.
+    """
+    oid, dtype = VECTOR_TYPES[vector_type]
+    n, dim = embeddings.shape
+    if oid is None:
+        header = struct.pack(">hh", dim, 0)
+        body = embeddings.astype(dtype)
+        return [header + row.tobytes() for row in body]
+
+    header = struct.pack(">iiiii", 1, 0, oid, dim, 1)
+    elements = np.empty((n, dim), dtype=[("len", ">i4"), ("value", dtype)])
+    elements["len"] = np.dtype(dtype).itemsize
+    elements["value"] = embeddings
+    return [header + row.tobytes() for row in elements]
+
+
+def _field(value: Optional[bytes]) -> bytes:
+    if value is None:
+        return struct.pack(">i", -1)
+    return struct.pack(">i", len(value)) + value
+
+
+def encode_rows_binary(
+    ids: Sequence[str],
+    embeddings: np.ndarray,
+    texts: Sequence[str],
+    topic_ids: Sequence[str],
+    topics: Sequence[str],
+    num_sentences: Sequence[int],
+    vector_type: str = "float8[]",
+) -> bytes:
+    """Encode rows in the PostgreSQL binary COPY format, header and trailer included."""
+    vectors = encode_vectors_binary(embeddings, vector_type)
+    out = io.BytesIO()
+    out.write(_BINARY_HEADER)
+    field_count = struct.pack(">h", len(COLUMNS))
+    for row_id, vector, chunk, topic_id, topic, count in zip(
+        ids, vectors, texts, topic_ids, topics, num_sentences
+    ):
+        out.write(field_count)
+        out.write(_field(uuid.UUID(str(row_id)).bytes))
+        out.write(_field(vector))
+        out.write(_field(chunk.encode("utf-8")))
+        out.write(_field(str(topic_id).encode("utf-8")))
+        out.write(_field(None if topic is None else str(topic).encode("utf-8")))
+        out.write(_field(struct.pack(">i", int(count))))
+        out.write(_field(b"\x01"))
+    out.write(_BINARY_TRAILER)
+    return out.getvalue()
+
+
+def _escape_text(value) -> str:
+    if value is None:
+        return "\\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def encode_rows_text(
+    ids: Sequence[str],
+    embeddings: np.ndarray,
+    texts: Sequence[str],
+    topic_ids: Sequence[str],
+    topics: Sequence[str],
+    num_sentences: Sequence[int],
+    vector_type: str = "float8[]",
+) -> bytes:
+    """Encode rows in the tab-separated text COPY format."""
+    open_, close = ("[", "]") if vector_type == "vector" else ("{", "}")
+    lines = []
+    for row_id, vector, chunk, topic_id, topic, count in zip(
+        ids, embeddings, texts, topic_ids, topics, num_sentences
+    ):
+        values = open_ + ",".join(repr(float(x)) for x in vector) + close
+        lines.append(
+            "\t".join(
+                [
+                    str(row_id),
+                    values,
+                    _escape_text(chunk),
+                    _escape_text(topic_id),
+                    _escape_text(topic),
+                    str(int(count)),
+                    "t",
+                ]
+            )
+        )
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class PostgresCopyWriter:
+    """Stream embedding rows into PostgreSQL with `COPY ... FROM STDIN`.
+
+    Rows are sent in binary format by default and committed in transactions
+    of `batch_rows` rows. Works with both psycopg2 and psycopg 3.
+
+    `write_topic` instead commits all rows of a topic together with a marker
+    in `progress_table`, so an interrupted ingestion can resume from the last
+    committed topic. It also records the content hash of every row in
+    `manifest_table`, which lets a later run embed only new or changed chunks
+    and delete stale ones.
+    """
+
+    def __init__(
+        self,
+        engine,
+        table: str = "embeddings",
+        vector_type: str = "float8[]",
+        copy_format: str = "binary",
+        batch_rows: int = 5000,
+        progress_table: str = "ingestion_progress",
+        manifest_table: str = "embedding_manifest",
+    ):
+        if vector_type not in VECTOR_TYPES:
+            raise ValueError(f"Unknown vector type: {vector_type}")
+        if copy_format not in ("binary", "text"):
+            raise ValueError(f"Unknown COPY format: {copy_format}")
+        self.engine = engine
+        self.table = table
+        self.vector_type = vector_type
+        self.copy_format = copy_format
+        self.batch_rows = batch_rows
+        self.progress_table = progress_table
+        self.manifest_table = manifest_table
+
+    def create_table(self) -> None:
+        with self.engine.begin() as connection:
+            if self.vector_type == "vector":
+                connection.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+            connection.execute(text(embeddings_table_ddl(self.table, self.vector_type)))
+
+    def create_progress_table(self) -> None:
+        with self.engine.begin() as connection:
+            connection.execute(text(progress_table_ddl(self.progress_table)))
+
+    def create_manifest_table(self) -> None:
+        with self.engine.begin() as connection:
+            for statement in manifest_table_ddl(self.manifest_table):
+                connection.execute(text(statement))
+
+    def manifest_ids(self, source: str, topic_id: str) -> Set[str]:
+        """Ids of the rows recorded in the manifest for one topic of `source`."""
+        with self.engine.connect() as connection:
+            rows = connection.execute(
+                text(
+                    f"SELECT id FROM {self.manifest_table} "
+                    "WHERE source = :source AND topic_id = :topic_id"
+                ),
+                {"source": source, "topic_id": topic_id},
+            )
+            return {str(row[0]) for row in rows}
+
+    def delete_other_topics(self, source: str, keep: Iterable[str]) -> int:
+        """Delete the rows, manifest entries and progress of topics of `source`
+        that are not in `keep`, and return the number of deleted rows."""
+        params = {"source": source, "keep": list(keep)}
+        with self.engine.begin() as connection:
+            result = connection.execute(
+                text(
+                    f"DELETE FROM {self.table} WHERE id IN ("
+                    f"SELECT id FROM {self.manifest_table} WHERE source = :source "
+                    "AND NOT (topic_id = ANY(:keep)))"
+                ),
+                params,
+            )
+            for table in (self.manifest_table, self.progress_table):
+                connection.execute(
+                    text(
+                        f"DELETE FROM {table} WHERE source = :source "
+                        "AND NOT (topic_id = ANY(:keep))"
+                    ),
+                    params,
+                )
+            return result.rowcount
+
+    def completed_topics(self, source: str) -> Set[str]:
+        """Topic ids of `source` whose rows have been committed."""
+        with self.engine.connect() as connection:
+            rows = connection.execute(
+                text(
+                    f"SELECT topic_id FROM {self.progress_table} WHERE source = :source"
+                ),
+                {"source": source},
+            )
+            return {row[0] for row in rows}
+
+    def reset_progress(self, source: str) -> None:
+        with self.engine.begin() as connection:
+            connection.execute(
+                text(f"DELETE FROM {self.progress_table} WHERE source = :source"),
+                {"source": source},
+            )
+
+    @property
+    def copy_sql(self) -> str:
+        return (
+            f"COPY {self.table} ({', '.join(COLUMNS)}) FROM STDIN "
+            f"WITH (FORMAT {self.copy_format})"
+        )
+
+    def encode(self, ids, embeddings, texts, topic_ids, topics, num_sentences) -> bytes:
+        encode = (
+            encode_rows_binary if self.copy_format == "binary" else encode_rows_text
+        )
+        return encode(
+            ids, embeddings, texts, topic_ids, topics, num_sentences, self.vector_type
+        )
+
+    def copy(self, cursor, ids, embeddings, texts, topic_ids, topics, num_sentences):
+        """Send one COPY on an open DB-API cursor, inside the caller's transaction."""
+        payload = self.encode(ids, embeddings, texts, topic_ids, topics, num_sentences)
+        if hasattr(cursor, "copy_expert"):
+            # psycopg2
+            cursor.copy_expert(self.copy_sql, io.BytesIO(payload))
+        else:
+            # psycopg 3
+            with cursor.copy(self.copy_sql) as copy:
+                copy.write(payload)
+
+    def write(
+        self,
+        ids: Sequence[str],
+        embeddings: np.ndarray,
+        texts: Sequence[str],
+        topic_ids: Iterable[str],
+        topics: Iterable[str],
+        num_sentences: Sequence[int],
+    ) -> int:
+        """Write the rows, committing every `batch_rows` rows, and return the count."""
+        topic_ids, topics = list(topic_ids), list(topics)
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            for i in range(0, len(ids), self.batch_rows):
+                batch = slice(i, i + self.batch_rows)
+                self.copy(
+                    cursor,
+                    ids[batch],
+                    embeddings[batch],
+                    texts[batch],
+                    topic_ids[batch],
+                    topics[batch],
+                    num_sentences[batch],
+                )
+                connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+        return len(ids)
+
+    def write_topic(
+        self,
+        source: str,
+        topic_id: str,
+        topic: str,
+        ids: Sequence[str],
+        embeddings: np.ndarray,
+        texts: Sequence[str],
+        num_sentences: Sequence[int],
+        hashes: Optional[Sequence[str]] = None,
+        stale_ids: Iterable[str] = (),
+        num_rows: Optional[int] = None,
+    ) -> int:
+        """Write the rows of one topic and its progress marker in one transaction.
+
+        Rows with the same ids are replaced, so writing a topic again after
+        its progress was reset does not create duplicates. Rows in `stale_ids`
+        are deleted, and when `hashes` are given the written rows are recorded
+        in the manifest. `num_rows` is the size of the topic stored in the
+        progress marker and defaults to the number of written rows.
+
+        Returns:
+            Number of written rows
+        """
+        replaced = list(ids) + list(stale_ids)
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            if replaced:
+                for table in (self.table, self.manifest_table):
+                    cursor.execute(
+                        f"DELETE FROM {table} WHERE id = ANY(%s::uuid[])",
+                        (replaced,),
+                    )
+            for i in range(0, len(ids), self.batch_rows):
+                batch = slice(i, i + self.batch_rows)
+                count = len(ids[batch])
+                self.copy(
+                    cursor,
+                    ids[batch],
+                    embeddings[batch],
+                    texts[batch],
+                    [topic_id] * count,
+                    [topic] * count,
+                    num_sentences[batch],
+                )
+            if hashes is not None and ids:
+                cursor.execute(
+                    f"INSERT INTO {self.manifest_table} "
+                    "(id, source, topic_id, content_hash) "
+                    "SELECT unnest(%s::uuid[]), %s, %s, unnest(%s::text[])",
+                    (list(ids), source, topic_id, list(hashes)),
+                )
+            cursor.execute(
+                f"INSERT INTO {self.progress_table} (source, topic_id, num_rows) "
+                "VALUES (%s, %s, %s) ON CONFLICT (source, topic_id) "
+                "DO UPDATE SET num_rows = EXCLUDED.num_rows, committed_at = now()",
+                (source, topic_id, len(ids) if num_rows is None else num_rows),
+            )
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+        return len(ids)
@@ -4,9 +4,14 @@ from ingestion_pipeline.ingest import DebateIngestionPipeline
 pipeline = DebateIngestionPipeline()
 
 # 1. Basic ingestion with automatic chunking and stats
-# Step 1: Generate and save embeddings to PostgreSQL
+# Step 1: Generate and save embeddings to PostgreSQL; running it again after
+# editing the data only embeds new or changed chunks
 pipeline.ingest_csv("../data/data.csv", debug=False)
 
+# # Streaming ingestion of a large CSV or Parquet input that resumes after an
+# # interruption (rows must be sorted by topic id)
+# pipeline.ingest_stream("../data/data.parquet")
+
 # # 2. Only analyze data without ingesting
 # pipeline.ingest_csv(
 #     "data.csv",
@@ -29,3 +34,6 @@ pipeline.ingest_csv("../data/data.csv", debug=False)
 # for dataset in ["train.csv", "test.csv", "val.csv"]:
 #     print(f"\nAnalyzing {dataset}:")
 #     pipeline.ingest_csv(dataset, analyze_only=True)
+
+# Stop embedding workers and let the model be unloaded
+pipeline.close()
@@ -1,68 +1,148 @@
-import pandas as pd
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from tqdm import tqdm
+from typing import Iterator, List, Optional, Tuple
+
 import chromadb
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from tqdm import tqdm
 
+COLUMNS = ["id", "embedding", "text", "topic_id", "topic", "num_sentences"]
 
-def test_embeddings(
-    parquet_dir: str, chroma_client: chromadb.Client, collection_name: str
-):
+
+def read_embedding_file(path: Path) -> pa.Table:
+    return pq.read_table(path, columns=COLUMNS)
+
+
+def iter_tables(
+    paths: List[Path], read_workers: int = 4
+) -> Iterator[Tuple[Path, pa.Table]]:
+    """Read Parquet files on a thread pool, in order, with at most `read_workers`
+    files in flight so that memory stays bounded."""
+    with ThreadPoolExecutor(max_workers=read_workers) as executor:
+        pending = deque()
+        for path in paths:
+            pending.append((path, executor.submit(read_embedding_file, path)))
+            if len(pending) >= read_workers:
+                path, future = pending.popleft()
+                yield path, future.result()
+        while pending:
+            path, future = pending.popleft()
+            yield path, future.result()
+
+
+def embeddings_to_numpy(column: pa.ChunkedArray) -> np.ndarray:
+    """Convert a list column of equal-length vectors into a 2-D float32 array
+    without building a Python list per row."""
+    array = column.combine_chunks()
+    if len(array) == 0:
+        return np.empty((0, 0), dtype=np.float32)
+    if pa.types.is_fixed_size_list(array.type):
+        dim = array.type.list_size
+    else:
+        lengths = np.diff(array.offsets.to_numpy())
+        dim = int(lengths[0])
+        if (lengths != dim).any():
+            raise ValueError("Embeddings must all have the same dimension")
+    values = array.flatten().to_numpy(zero_copy_only=False)
+    return values.astype(np.float32, copy=False).reshape(len(array), dim)
+
+
+def build_metadatas(table: pa.Table) -> List[dict]:
+    """Chroma metadata for every row, built from whole columns."""
+    return [
+        {
+            "topic_id": topic_id,
+            "topic": topic,
+            "is_chunk": True,
+            "num_sentences": num_sentences,
+        }
+        for topic_id, topic, num_sentences in zip(
+            table["topic_id"].to_pylist(),
+            table["topic"].to_pylist(),
+            table["num_sentences"].to_pylist(),
+        )
+    ]
+
+
+def add_table(collection, table: pa.Table, batch_size: int) -> int:
+    """Add the rows of a table whose ids are not in the collection yet, in
+    batches of at most `batch_size`, and return how many were added."""
+    ids = table["id"].cast(pa.string()).to_pylist()
+    embeddings = embeddings_to_numpy(table["embedding"])
+    documents = table["text"].to_pylist()
+    metadatas = build_metadatas(table)
+
+    added = 0
+    for start in range(0, len(ids), batch_size):
+        batch_ids = ids[start : start + batch_size]
+        existing = set(collection.get(ids=batch_ids, include=[])["ids"])
+        keep = [
+            i for i, row_id in enumerate(batch_ids, start) if row_id not in existing
+        ]
+        if not keep:
+            continue
+        collection.add(
+            ids=[ids[i] for i in keep],
+            embeddings=embeddings[keep],
+            documents=[documents[i] for i in keep],
+            metadatas=[metadatas[i] for i in keep],
+        )
+        added += len(keep)
+    return added
+
+
+def load_embeddings(
+    parquet_dir: str,
+    chroma_client: chromadb.Client,
+    collection_name: str,
+    read_workers: int = 4,
+    batch_size: Optional[int] = None,
+) -> int:
     """Load embeddings from parquet files into ChromaDB.
 
+    Files are read in parallel, and rows whose id is already in the
+    collection are skipped, so an interrupted load can simply be run again.
+
     Args:
         parquet_dir: Directory containing parquet files
         chroma_client: ChromaDB client instance
         collection_name: Name of the collection to store embeddings
+        read_workers: Number of files read concurrently
+        batch_size: Rows per `collection.add`, capped at the client's maximum
+
+    Returns:
+        Number of added embeddings
     """
-    parquet_files = list(Path(parquet_dir).glob("*.parquet"))
+    parquet_files = sorted(Path(parquet_dir).glob("*.parquet"))
     print(f"Found {len(parquet_files)} parquet files")
 
     collection = chroma_client.get_or_create_collection(
         name=collection_name,
         metadata={"description": "Debate arguments and their embeddings"},
     )
+    max_batch_size = chroma_client.get_max_batch_size()
+    batch_size = min(batch_size or max_batch_size, max_batch_size)
 
-    for parquet_path in tqdm(parquet_files, desc="Loading embeddings"):
-        df = pd.read_parquet(parquet_path)
-
-        if df.empty:
-            print(f"Skipping empty file: {parquet_path.name}")
-            continue
+    added = 0
+    with tqdm(total=len(parquet_files), desc="Loading embeddings") as pbar:
+        for _, table in iter_tables(parquet_files, read_workers):
+            added += add_table(collection, table, batch_size)
+            pbar.update(1)
+            pbar.set_postfix(added=added)
+    print(f"Loaded {added} embeddings into {collection_name}")
+    return added
 
-        # Print the DataFrame structure for debugging
-        print(f"\nDataFrame from {parquet_path.name}:")
-        print(df.head())  # Check the first few rows
-
-        # Print first few embeddings for debugging
-        print(f"\nFirst few embeddings from {parquet_path.name}:")
-        for i, embedding in enumerate(df["embedding"].head(5)):
-            print(f"Embedding {i + 1}: {embedding[:5]}")  # Print first 5 dimensions
-
-        # Ensure embeddings are in the correct format
-        embeddings = [list(embedding) for embedding in df["embedding"]]
-        print(f"Type of embeddings: {type(embeddings)}")
-        print(
-            f"First embedding: {embeddings[0][:5]}"
-        )  # Print first 5 dimensions of the first embedding
-
-        collection.add(
-            documents=df["text"].tolist(),
-            embeddings=embeddings,  # Ensure this is a list of lists
-            ids=df["id"].tolist(),
-            metadatas=[
-                {
-                    "topic_id": row["topic_id"],
-                    "topic": row["topic"],
-                    "is_chunk": True,
-                    "num_sentences": row["num_sentences"],
-                }
-                for _, row in df.iterrows()
-            ],
-        )
-        print(f"Loaded {len(df)} embeddings from {parquet_path.name}")
 
+def test_embeddings(
+    parquet_dir: str, chroma_client: chromadb.Client, collection_name: str
+):
+    """Deprecated alias of `load_embeddings`."""
+    return load_embeddings(parquet_dir, chroma_client, collection_name)
 
-chroma_client = chromadb.PersistentClient(path="../chroma_db")
 
 if __name__ == "__main__":
-    test_embeddings("../embedded_data", chroma_client, "debate_arguments")
+    chroma_client = chromadb.PersistentClient(path="../chroma_db")
+    load_embeddings("../embedded_data", chroma_client, "debate_arguments")